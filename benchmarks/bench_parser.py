@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""Throughput and latency benchmarks for the METAR parser.
+
+Reports are grouped by style, so that a change to one family of handlers
+shows up in the matching row.  Results can be written as JSON and compared
+with the results from another commit using --compare.  The metar package
+in the enclosing source tree is benchmarked, not an installed copy.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from metar import Cache, Metar, Synthetic, __version__  # noqa: E402
+
+# a fixed reference time keeps the date resolution identical between runs
+NOW = datetime.datetime(2005, 1, 31, 12, 0)
+
+CORPUS = {
+    # US reports following FMH-1, with remarks
+    "us": [
+        "METAR KEWR 111851Z VRB03G19KT 2SM R04R/3000VP6000FT TSRA BR FEW015 "
+        "BKN040CB BKN065 OVC200 22/22 A2987 RMK AO2 PK WND 29028/1817 WSHFT "
+        "1812 TSB05RAB22 SLP114 FRQ LTGICCCCG TS OHD AND NW-N-E MOV NE "
+        "P0013 T02270215",
+        "KABI 031752Z 30010KT 6SM BR FEW009 OVC036 02/01 A3003 RMK AO2 "
+        "SLP176 60001 I1003 T00170006 10017 21006 56017",
+        "METAR KPIT 091955Z COR 22015G25KT 3/4SM R28L/2600FT TSRA OVC010CB "
+        "18/16 A2992 RMK SLP045 T01820159",
+        "KDSM 101654Z 31012G20KT 10SM -SN SCT025 BKN045 M05/M11 A3012 RMK AO2 "
+        "SLP214 P0000 4/002 T10501106 400281072",
+    ],
+    # international reports with trend groups
+    "wmo": [
+        "METAR WSSS 280900Z 26009KT 180V350 0600 R20R/1900D R20C/1600D +TSRA "
+        "FEW008 SCT013CB FEW015TCU 24/23 Q1010 BECMG FM0920 TL0930 3000 TSRA "
+        "BECMG FM1000 TL1020 6000 NSW",
+        "METAR LOXZ 141420Z 08006KT 20KM VCSH FEW025SC SCT040SC BKN090AC "
+        "21/14 Q1015 BECMG SCT090",
+        "EGLL 101650Z 24015KT 9999 FEW030 12/05 Q1018 NOSIG",
+        "EDDF 101650Z 27008KT 4000 -RA BR BKN008 OVC015 08/07 Q1006 "
+        "TEMPO 2500 RA BKN005",
+    ],
+    # automated and missing reports
+    "auto_nil": [
+        "METAR FSIA 220100Z AUTO 14014KT 120V180 9999 ///////// 27/23 Q1010",
+        "KEWR 101651Z NIL",
+        "METAR EKRK 101650Z AUTO 24010KT 9999NDV NCD 11/04 Q1017",
+        "KIWI 101656Z AUTO 00000KT 10SM CLR 05/M01 A3021 RMK AO2",
+    ],
+    # reports with many groups that can't be decoded
+    "unparsed": [
+        "KEWR 101651Z 00000KT 10SM FOO BAR CLR 10/M02 A3002 BAZ QUX",
+        "METAR EGLL 101650Z 24015KT XXXX 9999 ???? FEW030 YYYY 12/05 Q1018",
+        "KDSM 101654Z 31012KT ZZZ 10SM WWW SCT025 VVV M05/M11 UUU A3012",
+        "LFPG 101650Z 1234 ABCD 27008KT 4000 EFGH BKN008 IJKL 08/07 Q1006",
+    ],
+    # a seeded mix of generated reports of all styles
+    "synthetic": Synthetic.generate(1000, seed=0),
+}
+
+
+def percentile(values, pct):
+    """Return the given percentile of a sorted list of values."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def parse(code):
+    Metar.Metar(code, strict=False, now=NOW)
+
+
+parse_reused = Metar.MetarParser(strict=False, now=NOW).parse
+
+CACHE = Cache.GroupCache()
+parse_cached = Metar.MetarParser(strict=False, now=NOW, cache=CACHE).parse
+
+
+def run(reports, count, repeat, func=parse, setup=None):
+    """
+    Parse count reports (cycling through the list) repeat times, calling
+    setup (if given) before each repetition.
+    """
+    best = None
+    latencies = []
+    clock = time.perf_counter
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        timings = []
+        start = clock()
+        for i in range(count):
+            code = reports[i % len(reports)]
+            t0 = clock()
+            func(code)
+            timings.append(clock() - t0)
+        elapsed = clock() - start
+        if best is None or elapsed < best:
+            best = elapsed
+            latencies = timings
+    latencies.sort()
+    return {
+        "reports": count,
+        "seconds": best,
+        "reports_per_second": count / best,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p90_us": percentile(latencies, 90) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+    }
+
+
+def git_commit():
+    """Return the current git commit, if available."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(results, baseline):
+    """Print the change in throughput relative to a baseline run."""
+    print("%-10s %12s %12s %8s" % ("style", "baseline/s", "current/s", "change"))
+    for style, result in results["styles"].items():
+        if style not in baseline["styles"]:
+            continue
+        old = baseline["styles"][style]["reports_per_second"]
+        new = result["reports_per_second"]
+        print("%-10s %12.0f %12.0f %+7.1f%%" % (style, old, new, 100 * (new / old - 1)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--reports", type=int, default=5000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--style", action="append", choices=sorted(CORPUS))
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a baseline run")
+    parser.add_argument(
+        "--header",
+        action="store_true",
+        help="benchmark the header-only scan (Metar.scan_header)",
+    )
+    parser.add_argument(
+        "--parser",
+        action="store_true",
+        help="benchmark a reused Metar.MetarParser instead of the constructor",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="benchmark a MetarParser with a group cache (Cache.GroupCache), "
+        "emptied before each repetition",
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "metar_version": __version__,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "styles": {},
+    }
+    if args.header:
+        func = Metar.scan_header
+        results["function"] = "scan_header"
+    elif args.cache:
+        func = parse_cached
+        results["function"] = "GroupCache"
+    elif args.parser:
+        func = parse_reused
+        results["function"] = "MetarParser"
+    else:
+        func = parse
+        results["function"] = "Metar"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for style in args.style or CORPUS:
+            setup = CACHE.clear if args.cache else None
+            result = run(CORPUS[style], args.reports, args.repeat, func, setup)
+            results["styles"][style] = result
+            line = "%-10s %8.0f reports/s  p50 %6.1fus  p90 %6.1fus  p99 %6.1fus" % (
+                style,
+                result["reports_per_second"],
+                result["p50_us"],
+                result["p90_us"],
+                result["p99_us"],
+            )
+            if args.cache:
+                # counts of the last repetition
+                snapshot = CACHE.snapshot()
+                result["cache"] = snapshot
+                total = snapshot["hits"] + snapshot["misses"]
+                line += "  hits %5.1f%%" % (100.0 * snapshot["hits"] / (total or 1))
+            print(line)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,6 @@ from __future__ import print_function
 import os
 import sys
 import getopt
-import string
 
 try:
     from urllib2 import urlopen
@@ -60,7 +59,7 @@ for name in stations:
             print("No data for ", name, "\n\n")
     except Metar.ParserError as exc:
         print("METAR code: ", line)
-        print(string.join(exc.args, ", "), "\n")
+        print(", ".join(exc.args), "\n")
     except:
         import traceback
 
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+#
+# command-line tool to index METAR archive files and read from them
+#
+import sys
+import os
+import getopt
+
+from metar import Archive
+
+
+def usage():
+    program = os.path.basename(sys.argv[0])
+    print("Usage: ", program, "[-i <index>] [-q] <archive> [<station> ...]")
+    print(
+        """Options:
+    <archive> ... a file containing METAR reports, one per line
+    <station> ... print the reports from this station
+    -i <index> .. path of the index file (default: <archive>.idx)
+    -q .......... run quietly - don't report the number of reports indexed.
+  This program creates or updates the sidecar index of an archive of
+  METAR reports, indexing only the lines appended since the last run,
+  and then prints the reports from the given stations by reading them
+  directly from the archive.
+  """
+    )
+    sys.exit(1)
+
+
+index_path = None
+quiet = False
+
+try:
+    opts, args = getopt.getopt(sys.argv[1:], "i:q")
+    for opt in opts:
+        if opt[0] == "-i":
+            index_path = opt[1]
+        elif opt[0] == "-q":
+            quiet = True
+except getopt.GetoptError:
+    usage()
+
+if not args:
+    usage()
+
+index = Archive.ArchiveIndex(args[0], index_path)
+count = index.update()
+if not quiet:
+    print(
+        "%s: %d new reports indexed, %d reports from %d stations"
+        % (index.index_path, count, len(index), len(index.stations())),
+        file=sys.stderr,
+    )
+for station_id in args[1:]:
+    for line in index.lines(station_id.upper()):
+        print(line)
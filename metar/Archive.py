@@ -0,0 +1,324 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Sidecar indexes of large METAR archive files.
+
+An archive is a text file with one METAR report per line (other lines, such
+as date headers, are ignored).  An ArchiveIndex scans it once and writes a
+sidecar index that maps each report's station id and observation time (day,
+hour and minute, from the header groups) to the byte offset of its line.
+The reports of one station can then be read by seeking straight to them,
+without scanning the archive or reading the entries of other stations.
+
+When the archive grows by appending, update() indexes only the new lines and
+appends their entries to the sidecar; the index is only rebuilt from the
+start if the archive has been truncated or rewritten.
+
+    >>> from metar import Archive
+    >>> index = Archive.ArchiveIndex("reports.txt")  # doctest: +SKIP
+    >>> index.update()  # doctest: +SKIP
+    1204
+    >>> for report in index.reports("KEWR"):  # doctest: +SKIP
+    ...     print(report.time, report.temp)
+
+The sidecar is made of two files.  The entries are appended, in the order of
+the archive, to a binary file (the path of the index with ".dat" appended).
+Each entry holds the observation time (an integer DDHHMM, or -1 if it is
+missing), the byte offset of the report and the number of the previous entry
+of the same station (or -1), as three little-endian 64-bit integers, so
+that the entries of a station form a chain that is followed backwards from
+the latest one.  Reading the reports of a station costs a seek per report,
+in the entries and in the archive.
+
+The index itself is a small text file, with one line per station: the id,
+the number of its latest entry and the number of its entries.  Its first
+line holds the format version, the number of bytes of the archive and of
+entries that have been indexed, and a fingerprint of the indexed part of
+the archive (a hash of its first 4096 bytes and of its last line) that is
+checked before each update.  The index is replaced as a whole, after the
+entries it covers are on disk, so an interrupted update leaves the previous
+index in place.
+"""
+import hashlib
+import os
+import sys
+from array import array
+
+from metar import Metar
+
+INDEX_SUFFIX = ".idx"
+ENTRIES_SUFFIX = ".dat"
+INDEX_VERSION = 2
+
+_HEADER_TAG = "metar-index"
+_NO_TIME = -1
+_NO_ENTRY = -1
+_ENTRY_SIZE = array("q").itemsize * 3  # time, offset, previous entry
+_BATCH_SIZE = 4096  # entries written to the sidecar at a time
+_HEAD_SIZE = 4096  # bytes at the start of the archive in the fingerprint
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _time_key(header):
+    """Return the observation time of a Header as an integer DDHHMM."""
+    if header.day is None:
+        return _NO_TIME
+    return header.day * 10000 + header.hour * 100 + header.minute
+
+
+def _time_tuple(key):
+    """Return an integer DDHHMM as a (day, hour, minute) tuple, or None."""
+    if key == _NO_TIME:
+        return None
+    return (key // 10000, key // 100 % 100, key % 100)
+
+
+def _fingerprint(fh, size, tail):
+    """
+    Return the fingerprint of the first size bytes of an archive, whose last
+    line starts at the offset tail.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    fh.seek(0)
+    digest.update(fh.read(min(size, _HEAD_SIZE)))
+    fh.seek(tail)
+    digest.update(fh.read(size - tail))
+    return digest.hexdigest()
+
+
+def _write_entries(entries, fh):
+    """Write an array of entries, as little-endian integers."""
+    if _BIG_ENDIAN:
+        entries.byteswap()
+    entries.tofile(fh)
+
+
+def _read_entry(fh):
+    """Read the time, offset and previous entry of an entry."""
+    fields = array("q")
+    fields.frombytes(fh.read(_ENTRY_SIZE))
+    if _BIG_ENDIAN:
+        fields.byteswap()
+    return fields
+
+
+class ArchiveIndex(object):
+    """A sidecar index of the reports in a METAR archive file."""
+
+    def __init__(self, path, index_path=None):
+        """
+        Parameters
+        ----------
+        path : str
+          Path of the archive file.
+        index_path : str, optional
+          Path of the sidecar index file.  By default, the path of the
+          archive with ".idx" appended.  The entries are stored next to it,
+          with ".dat" appended.
+        """
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self.entries_path = self.index_path + ENTRIES_SUFFIX
+        self._reset()
+        self._loaded = False
+
+    def _reset(self):
+        self.size = 0  # number of bytes of the archive indexed
+        self._count = 0  # number of entries
+        self._tail = 0  # offset of the last line indexed
+        self._fingerprint = None
+        self._stations = {}  # station id -> [latest entry, number of entries]
+
+    def load(self):
+        """
+        Read the sidecar index, if it exists.  Only the station directory is
+        read; the entries of a station are read when they're used.  An index
+        that was never completely written is ignored, and rebuilt by the next
+        update.
+        """
+        self._reset()
+        self._loaded = True
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as fh:
+            data = fh.read()
+        if not data.endswith(b"\n"):
+            return
+        lines = data.decode("ascii", "replace").split("\n")
+        header = lines[0].split()
+        if len(header) < 2 or header[0] != _HEADER_TAG:
+            raise ValueError("not a METAR archive index: '" + self.index_path + "'")
+        if header[1] != str(INDEX_VERSION) or len(header) != 6:
+            # an index in an earlier format is rebuilt
+            return
+        stations = {}
+        for line in lines[1:-1]:
+            station_id, latest, count = line.split()
+            stations[station_id] = [int(latest), int(count)]
+        if sum(count for latest, count in stations.values()) != int(header[3]):
+            # not the complete directory
+            return
+        self.size = int(header[2])
+        self._count = int(header[3])
+        self._tail = int(header[4])
+        self._fingerprint = header[5]
+        self._stations = stations
+
+    def _is_valid(self):
+        """Return True if the archive still starts with the indexed lines."""
+        if not self.size:
+            return True
+        if os.path.getsize(self.path) < self.size:
+            return False
+        if os.path.getsize(self.entries_path) < self._count * _ENTRY_SIZE:
+            return False
+        with open(self.path, "rb") as fh:
+            return _fingerprint(fh, self.size, self._tail) == self._fingerprint
+
+    def _write_index(self):
+        """Replace the index file with the current directory of stations."""
+        lines = [
+            "%s %d %d %d %d %s\n"
+            % (
+                _HEADER_TAG,
+                INDEX_VERSION,
+                self.size,
+                self._count,
+                self._tail,
+                self._fingerprint,
+            )
+        ]
+        for station_id in sorted(self._stations):
+            latest, count = self._stations[station_id]
+            lines.append("%s %d %d\n" % (station_id, latest, count))
+        temporary = self.index_path + ".tmp"
+        with open(temporary, "wb") as fh:
+            fh.write("".join(lines).encode("ascii"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(temporary, self.index_path)
+
+    def update(self):
+        """
+        Index the lines appended to the archive since the last update, and
+        return the number of reports added to the index.
+
+        Only complete lines are indexed, so a line that is still being
+        written is picked up by a later update.  The whole archive is
+        reindexed if it has shrunk, or if the start of the archive or the
+        last line indexed have changed.
+        """
+        if not self._loaded:
+            self.load()
+        if not os.path.exists(self.entries_path) or not self._is_valid():
+            self._reset()
+            if os.path.exists(self.index_path):
+                # the entries are about to be rewritten
+                os.remove(self.index_path)
+        position = self.size
+        tail = self._tail
+        added = 0
+        stations = self._stations
+        mode = "r+b" if os.path.exists(self.entries_path) else "wb"
+        try:
+            with open(self.path, "rb") as fh, open(self.entries_path, mode) as out:
+                # drop the entries of an interrupted update
+                out.truncate(self._count * _ENTRY_SIZE)
+                out.seek(self._count * _ENTRY_SIZE)
+                entry = self._count
+                buffer = array("q")
+                fh.seek(position)
+                for line in fh:
+                    if not line.endswith(b"\n"):
+                        break
+                    header = Metar.scan_header(line.decode("latin-1"))
+                    station_id = header.station_id
+                    if station_id is not None:
+                        latest = stations.get(station_id)
+                        if latest is None:
+                            latest = stations[station_id] = [_NO_ENTRY, 0]
+                        buffer.extend((_time_key(header), position, latest[0]))
+                        latest[0] = entry
+                        latest[1] += 1
+                        entry += 1
+                        added += 1
+                        if len(buffer) >= 3 * _BATCH_SIZE:
+                            _write_entries(buffer, out)
+                            buffer = array("q")
+                    tail = position
+                    position += len(line)
+                _write_entries(buffer, out)
+                # the entries must be on disk before the index that covers them
+                out.flush()
+                os.fsync(out.fileno())
+                if position != self.size or self._fingerprint is None:
+                    self._fingerprint = _fingerprint(fh, position, tail)
+            self.size = position
+            self._count = entry
+            self._tail = tail
+            self._write_index()
+        except BaseException:
+            # the directory held in memory may not match the sidecar
+            self._loaded = False
+            raise
+        return added
+
+    def stations(self):
+        """Return the station ids in the index, sorted."""
+        return sorted(self._stations)
+
+    def __contains__(self, station_id):
+        return station_id in self._stations
+
+    def __len__(self):
+        """Return the number of reports in the index."""
+        return self._count
+
+    def _offsets(self, station_id):
+        """
+        Return the times and offsets of the reports from a station, in the
+        order of the archive, read from its chain of entries.
+        """
+        times = array("q")
+        offsets = array("q")
+        if station_id not in self._stations:
+            return times, offsets
+        entry = self._stations[station_id][0]
+        # unbuffered, since each entry is read after a seek
+        with open(self.entries_path, "rb", buffering=0) as fh:
+            while entry != _NO_ENTRY:
+                fh.seek(entry * _ENTRY_SIZE)
+                fields = _read_entry(fh)
+                times.append(fields[0])
+                offsets.append(fields[1])
+                entry = fields[2]
+        times.reverse()
+        offsets.reverse()
+        return times, offsets
+
+    def entries(self, station_id):
+        """
+        Return the (time, offset) pairs of the reports from a station, in
+        the order of the archive.  Times are (day, hour, minute) tuples, or
+        None if the report has no time group.
+        """
+        times, offsets = self._offsets(station_id)
+        return [(_time_tuple(time), offset) for time, offset in zip(times, offsets)]
+
+    def lines(self, station_id):
+        """Iterate over the raw reports from a station, read by seeking."""
+        offsets = self._offsets(station_id)[1]
+        if not offsets:
+            return
+        with open(self.path, "rb") as fh:
+            for offset in offsets:
+                fh.seek(offset)
+                yield fh.readline().decode("latin-1").rstrip("\r\n")
+
+    def reports(self, station_id, **kwargs):
+        """
+        Iterate over the decoded reports from a station.  The keyword
+        arguments are passed to the Metar constructor.
+        """
+        for line in self.lines(station_id):
+            yield Metar.Metar(line, **kwargs)
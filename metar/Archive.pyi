@@ -0,0 +1,41 @@
+from array import array
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from metar.Metar import Header, Metar
+
+INDEX_SUFFIX: str
+ENTRIES_SUFFIX: str
+INDEX_VERSION: int
+
+Time = Tuple[int, int, int]
+
+def _time_key(header: Header) -> int: ...
+def _time_tuple(key: int) -> Optional[Time]: ...
+def _fingerprint(fh: IO[bytes], size: int, tail: int) -> str: ...
+def _write_entries(entries: array, fh: IO[bytes]) -> None: ...
+def _read_entry(fh: IO[bytes]) -> array: ...
+
+class ArchiveIndex:
+    path: str
+    index_path: str
+    entries_path: str
+    size: int
+    _count: int
+    _tail: int
+    _fingerprint: Optional[str]
+    _stations: Dict[str, List[int]]
+    _loaded: bool
+
+    def __init__(self, path: str, index_path: Optional[str] = ...) -> None: ...
+    def _reset(self) -> None: ...
+    def load(self) -> None: ...
+    def _is_valid(self) -> bool: ...
+    def _write_index(self) -> None: ...
+    def update(self) -> int: ...
+    def stations(self) -> List[str]: ...
+    def __contains__(self, station_id: object) -> bool: ...
+    def __len__(self) -> int: ...
+    def _offsets(self, station_id: str) -> Tuple[array, array]: ...
+    def entries(self, station_id: str) -> List[Tuple[Optional[Time], int]]: ...
+    def lines(self, station_id: str) -> Iterator[str]: ...
+    def reports(self, station_id: str, **kwargs: Any) -> Iterator[Metar]: ...
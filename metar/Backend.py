@@ -0,0 +1,23 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Choice between the pure-python and NumPy implementations.
+
+The batch functions of Geodesy, Derived and FlightCategory have a pure-python
+implementation, and a vectorized one that is used when NumPy is installed.
+Each takes a use_numpy argument: None (the default) uses NumPy if it is
+available, False never uses it, and True requires it.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _use_numpy(use_numpy):
+    """Decide whether to use the NumPy implementation."""
+    if use_numpy is None:
+        return np is not None
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not available")
+    return use_numpy
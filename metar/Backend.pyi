@@ -0,0 +1,5 @@
+from typing import Any, Optional
+
+np: Any
+
+def _use_numpy(use_numpy: Optional[bool]) -> bool: ...
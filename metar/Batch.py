@@ -0,0 +1,122 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Parse batches of METAR reports in a pool of threads.
+
+The parser keeps no shared mutable state, so reports can be parsed in
+several threads at once.  On a free-threaded build of python (3.13t and
+later) the threads run in parallel, and parsing scales with the number of
+cores without the memory and serialization costs of a process pool.  On
+other builds the threads take turns, and a batch runs at about the speed of
+a single thread.
+
+    >>> from metar import Batch
+    >>> lines = ["METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    ...          "METAR KJFK 111851Z 29028KT 10SM 21/20 A2987"]
+    >>> [obs.temp.value() for obs in Batch.parse_many(lines, workers=2)]
+    [22.0, 21.0]
+
+Reports are returned in the order of the input lines.
+"""
+import datetime
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metar import Metar
+from metar.Stats import ParserStats
+
+
+def free_threaded():
+    """Return True if python is running without the global interpreter lock."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _parse_chunk(lines, kwargs, with_stats):
+    """Parse a chunk of reports, with its own ParserStats if needed."""
+    stats = None
+    if with_stats:
+        stats = ParserStats()
+        kwargs = dict(kwargs, stats=stats)
+    parse = Metar.MetarParser(**kwargs).parse
+    return [parse(line) for line in lines], stats
+
+
+def _chunks(lines, chunk_size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_parse(lines, workers=None, chunk_size=64, executor=None, **kwargs):
+    """
+    Parse raw reports in a pool of threads, and iterate over the Metar
+    objects in the order of the input.
+
+    Parameters
+    ----------
+    lines : iterable of str
+      Raw METAR reports.  They are read as they are needed, so that at most
+      a few chunks per worker are held in memory.
+    workers : int, optional
+      Number of threads.  By default, the number of CPUs.
+    chunk_size : int, optional
+      Number of reports parsed by each task.
+    executor : concurrent.futures.Executor, optional
+      An executor to use instead of a new pool of threads.
+    **kwargs
+      Arguments passed to the Metar constructor, such as strict,
+      diagnostics and the size and time limits.  The reference time (now)
+      defaults to the time when the batch starts, for all of the reports.
+      A ParserStats object given as stats collects the counts of the whole
+      batch; each task collects its own, which are merged in this thread.
+
+    An exception raised while parsing a report (such as a ParserError, when
+    strict is True) is raised when its chunk is reached.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk size must be positive")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if kwargs.get("now") is None:
+        kwargs["now"] = datetime.datetime.now(datetime.timezone.utc)
+    stats = kwargs.pop("stats", None)
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(
+                executor.submit(_parse_chunk, chunk, kwargs, stats is not None)
+            )
+            if len(pending) >= 2 * workers:
+                reports, chunk_stats = pending.popleft().result()
+                if stats is not None:
+                    stats.merge(chunk_stats)
+                yield from reports
+        while pending:
+            reports, chunk_stats = pending.popleft().result()
+            if stats is not None:
+                stats.merge(chunk_stats)
+            yield from reports
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
+
+
+def parse_many(lines, workers=None, chunk_size=64, executor=None, **kwargs):
+    """
+    Parse raw reports in a pool of threads, and return a list of Metar
+    objects in the order of the input.  See iter_parse() for the arguments.
+    """
+    return list(iter_parse(lines, workers, chunk_size, executor, **kwargs))
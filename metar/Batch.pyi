@@ -0,0 +1,25 @@
+from concurrent.futures import Executor
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from metar.Metar import Metar
+from metar.Stats import ParserStats
+
+def free_threaded() -> bool: ...
+def _parse_chunk(
+    lines: List[str], kwargs: dict, with_stats: bool
+) -> Tuple[List[Metar], Optional[ParserStats]]: ...
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]: ...
+def iter_parse(
+    lines: Iterable[str],
+    workers: Optional[int] = ...,
+    chunk_size: int = ...,
+    executor: Optional[Executor] = ...,
+    **kwargs: Any,
+) -> Iterator[Metar]: ...
+def parse_many(
+    lines: Iterable[str],
+    workers: Optional[int] = ...,
+    chunk_size: int = ...,
+    executor: Optional[Executor] = ...,
+    **kwargs: Any,
+) -> List[Metar]: ...
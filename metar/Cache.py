@@ -0,0 +1,240 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Caching of the decoded values of individual groups.
+
+The groups of METAR reports repeat enormously from one report to the next:
+00000KT, 10SM, 9999, CLR, A3002, SLP114, 15/M02.  A GroupCache passed to the
+Metar constructor (or to a MetarParser) keeps, for each of the handlers that
+decode such groups, the fields that the handler set for the text of a group.
+When the same group is found again, the fields are copied from the cache,
+without building the dictionary of the match or the Datatypes objects.
+
+    >>> from metar import Cache, Metar
+    >>> cache = Cache.GroupCache()
+    >>> parser = Metar.MetarParser(cache=cache)
+    >>> for station_id in ["KEWR", "KJFK", "KLGA", "KTEB"]:
+    ...     obs = parser.parse(station_id + " 111851Z 00000KT 10SM CLR 22/12 A3002")
+    >>> cache.hit_rates()["_handleSky"]
+    0.5
+
+Only the handlers whose result depends on nothing but the group, or on a
+known part of the report decoded before it (the station id, for a wind
+group without units, and whether a visibility has already been found), are
+cached.  The cached values are shared by the reports that contain the group;
+they are the same immutable Datatypes objects and tuples that the handlers
+would have built.
+
+A group is cached the second time it's seen, so that the many groups that
+occur only once (most temperatures and pressures) aren't copied into it.  The
+size of the cache is bounded: each handler holds at most maxsize groups, and
+the oldest ones are dropped first.  A GroupCache can be shared between
+threads; its counts may then be slightly low.  When the parser is also
+instrumented with a ParserStats object, the handlers of the groups found in
+the cache aren't called, and aren't counted as matches.
+"""
+from metar import Metar
+
+
+def _wind_key(report, match):
+    # the units of a wind speed without them depend on the station id
+    if match.group("units") is None:
+        return match.group(), report.station_id
+    return match.group()
+
+
+def _visibility_key(report, match):
+    # the first visibility group is the minimum, and a second the maximum
+    return match.group(), report.vis is None
+
+
+# handlers that can be cached, with the function that returns the cache key
+# of a group (by default, its text) and the attributes of the report that the
+# handler reads
+HANDLERS = {
+    "_handleWind": (_wind_key, ("station_id",)),
+    "_handleVisibility": (_visibility_key, ("vis",)),
+    "_handleWeather": (None, ()),
+    "_handleSky": (None, ()),
+    "_handleTemp": (None, ()),
+    "_handlePressure": (None, ()),
+    "_handleRecent": (None, ()),
+    "_handleWindShear": (None, ()),
+    "_handleSealvlPressRemark": (None, ()),
+    "_handleAutoRemark": (None, ()),
+    "_handlePrecip1hrRemark": (None, ()),
+    "_handleTemp1hrRemark": (None, ()),
+    "_handleTemp6hrRemark": (None, ()),
+    "_handleTemp24hrRemark": (None, ()),
+    "_handlePress3hrRemark": (None, ()),
+    "_handleSnowDepthRemark": (None, ()),
+    "_handleIceAccretionRemark": (None, ()),
+    "_handleLightningRemark": (None, ()),
+    "_handleTSLocRemark": (None, ()),
+}
+
+
+def _effect(scratch, context):
+    """
+    Return the fields set on a scratch report by a handler, and the items
+    it appended to the report's lists.
+    """
+    values = {}
+    items = []
+    for name, value in vars(scratch).items():
+        if name in context and value is context[name]:
+            continue
+        if type(value) is list:
+            items.append((name, tuple(value)))
+        else:
+            values[name] = value
+    return values, tuple(items)
+
+
+def _replay(report, effect):
+    values, items = effect
+    report.__dict__.update(values)
+    for name, appended in items:
+        getattr(report, name).extend(appended)
+
+
+class _Entries(object):
+    """The cached groups of one handler, and its counts."""
+
+    __slots__ = ("key", "context", "groups", "seen", "hits", "misses")
+
+    def __init__(self, key, context):
+        self.key = key
+        self.context = context
+        self.groups = {}  # cache key -> effect, in the order of insertion
+        self.seen = set()  # keys of the groups seen once
+        self.hits = 0
+        self.misses = 0
+
+
+class GroupCache(object):
+    """A bounded cache of the decoded values of METAR groups."""
+
+    def __init__(self, maxsize=2048, handlers=None):
+        """
+        Parameters
+        ----------
+        maxsize : int, optional
+          Maximum number of groups held for each handler.
+        handlers : iterable of str, optional
+          Names of the handlers to cache.  By default, all of those in
+          HANDLERS.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        if handlers is None:
+            handlers = HANDLERS
+        self.maxsize = maxsize
+        self._entries = {}  # handler name -> _Entries
+        for name in handlers:
+            if name not in HANDLERS:
+                raise ValueError("handler can't be cached: '" + name + "'")
+            self._entries[name] = _Entries(*HANDLERS[name])
+
+    def __len__(self):
+        """Return the number of groups held."""
+        return sum(len(entries.groups) for entries in self._entries.values())
+
+    def apply(self, report, handler, match):
+        """
+        Decode a matched group into a report, with the values in the cache
+        if the group has been seen before.
+
+        This is called by the parser for each group that matches.
+        """
+        # instrumented handlers, from metar.Stats, have the name of the original
+        entries = self._entries.get(handler.__name__)
+        if entries is None:
+            handler(report, match.groupdict())
+            return
+        if entries.key is None:
+            key = match.group()
+        else:
+            key = entries.key(report, match)
+        groups = entries.groups
+        effect = groups.get(key)
+        if effect is not None:
+            entries.hits += 1
+            values, items = effect
+            report.__dict__.update(values)
+            for name, appended in items:
+                getattr(report, name).extend(appended)
+            return
+        entries.misses += 1
+        seen = entries.seen
+        if key not in seen:
+            # a group is only cached when it's seen again, so that the many
+            # groups that occur once cost little more than without the cache
+            if len(seen) >= self.maxsize:
+                seen.clear()
+            seen.add(key)
+            handler(report, match.groupdict())
+            return
+        seen.discard(key)
+        scratch = Metar.Metar.__new__(Metar.Metar)
+        context = {}
+        for name in entries.context:
+            context[name] = getattr(report, name)
+            setattr(scratch, name, context[name])
+        try:
+            handler(scratch, match.groupdict())
+        except Exception:
+            # decode as much of the group as the handler did
+            _replay(report, _effect(scratch, context))
+            raise
+        effect = _effect(scratch, context)
+        if len(groups) >= self.maxsize:
+            try:
+                del groups[next(iter(groups))]
+            except (KeyError, RuntimeError, StopIteration):
+                # changed by another thread
+                pass
+        groups[key] = effect
+        _replay(report, effect)
+
+    def hit_rates(self):
+        """Return the fraction of the groups found in the cache, by handler."""
+        rates = {}
+        for name, entries in self._entries.items():
+            total = entries.hits + entries.misses
+            rates[name] = entries.hits / total if total else 0.0
+        return rates
+
+    def clear(self):
+        """Drop the cached groups and reset the counts."""
+        for entries in self._entries.values():
+            entries.groups = {}
+            entries.seen = set()
+            entries.hits = 0
+            entries.misses = 0
+
+    def snapshot(self):
+        """
+        Return the total "hits", "misses" and cached "groups", and a
+        "handlers" list with the same three counts for each cached handler.
+        """
+        handlers = []
+        hits = 0
+        misses = 0
+        for name, entries in self._entries.items():
+            handlers.append(
+                {
+                    "handler": name,
+                    "hits": entries.hits,
+                    "misses": entries.misses,
+                    "groups": len(entries.groups),
+                }
+            )
+            hits += entries.hits
+            misses += entries.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "groups": len(self),
+            "handlers": handlers,
+        }
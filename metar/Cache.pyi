@@ -0,0 +1,45 @@
+from re import Match
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from metar.Metar import Metar
+
+_Effect = Tuple[Dict[str, Any], Tuple[Tuple[str, tuple], ...]]
+
+def _wind_key(report: Metar, match: Match) -> Hashable: ...
+def _visibility_key(report: Metar, match: Match) -> Hashable: ...
+
+HANDLERS: Dict[
+    str, Tuple[Optional[Callable[[Metar, Match], Hashable]], Tuple[str, ...]]
+]
+
+def _effect(scratch: Metar, context: Dict[str, Any]) -> _Effect: ...
+def _replay(report: Metar, effect: _Effect) -> None: ...
+
+class _Entries:
+    key: Optional[Callable[[Metar, Match], Hashable]]
+    context: Tuple[str, ...]
+    groups: Dict[Hashable, _Effect]
+    seen: Set[Hashable]
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        key: Optional[Callable[[Metar, Match], Hashable]],
+        context: Tuple[str, ...],
+    ) -> None: ...
+
+class GroupCache:
+    maxsize: int
+    _entries: Dict[str, _Entries]
+
+    def __init__(
+        self, maxsize: int = ..., handlers: Optional[Iterable[str]] = ...
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def apply(
+        self, report: Metar, handler: Callable[[Metar, dict], None], match: Match
+    ) -> None: ...
+    def hit_rates(self) -> Dict[str, float]: ...
+    def clear(self) -> None: ...
+    def snapshot(self) -> Dict[str, Any]: ...
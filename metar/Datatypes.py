@@ -3,7 +3,7 @@
 # SPDX-License-Identifier: BSD-2-Clause
 """Python classes to represent dimensioned quantities used in weather reports."""
 import re
-from math import pi, sin, cos, atan2
+from math import pi, sin, cos, atan2, asin, sqrt
 
 # exceptions
 
@@ -19,6 +19,10 @@ class UnitsError(Exception):
 
 FRACTION_RE = re.compile(r"^((?P<int>\d+)\s*)?(?P<num>\d)/(?P<den>\d+)$")
 
+# mean radius of the earth, in meters (used by position class)
+
+EARTH_RADIUS = 6371008.8
+
 # classes representing dimensioned values in METAR reports
 
 
@@ -209,7 +213,7 @@ class speed(object):
 class distance(object):
     """A class representing a distance value."""
 
-    legal_units = ["SM", "MI", "M", "KM", "FT", "IN"]
+    legal_units = ["SM", "MI", "M", "KM", "FT", "IN", "CM"]
     legal_gtlt = [">", "<"]
 
     def __init__(self, value, units=None, gtlt=None):
@@ -268,6 +272,8 @@ class distance(object):
             m_value = self._value / 3.28084
         elif self._units == "IN":
             m_value = self._value / 39.3701
+        elif self._units == "CM":
+            m_value = self._value / 100
         elif self._units == "KM":
             m_value = self._value * 1000
         else:
@@ -278,6 +284,8 @@ class distance(object):
             return m_value * 3.28084
         elif units == "IN":
             return m_value * 39.3701
+        elif units == "CM":
+            return m_value * 100
         elif units == "KM":
             return m_value / 1000
         elif units == "M":
@@ -312,6 +320,8 @@ class distance(object):
             text += " feet"
         elif units == "IN":
             text += " inches"
+        elif units == "CM":
+            text += " cm"
         if self._gtlt == ">":
             text = "greater than " + text
         elif self._gtlt == "<":
@@ -484,3 +494,19 @@ class position(object):
         if d < 0.0:
             d += 360.0
         return direction(d)
+
+    def getdistance(self, position2):
+        """
+        Calculate the great-circle distance to another location, using the
+        haversine formula.
+        See <http://www.movable-type.co.uk/scripts/LatLong.html>.
+        """
+        lat1 = self.latitude
+        long1 = self.longitude
+        lat2 = position2.latitude
+        long2 = position2.longitude
+        a = sin((lat2 - lat1) / 2.0) ** 2 + cos(lat1) * cos(lat2) * sin(
+            (long2 - long1) / 2.0
+        ) ** 2
+        d = 2.0 * EARTH_RADIUS * asin(min(1.0, sqrt(a)))
+        return distance(d, "M")
@@ -1,5 +1,7 @@
 from typing import Literal, Optional, Union
 
+EARTH_RADIUS: float
+
 GreaterOrLess = Literal[">", "<"]
 Value = Union[str, float]
 
@@ -123,3 +125,4 @@ class position:
     ): ...
     def __str__(self) -> str: ...
     def getdirection(self, position2: "position") -> direction: ...
+    def getdistance(self, position2: "position") -> distance: ...
@@ -0,0 +1,215 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Streaming removal of duplicate raw METAR reports.
+
+Feeds often deliver the same report many times.  A Deduplicator recognizes
+repeats from a fingerprint of the raw line, so that they can be dropped
+before they are decoded.  The fingerprint is taken from the station id,
+observation time, report type, correction and modifier groups and the rest
+of the report, with the whitespace and any trailing "=" normalized, so that
+"METAR KEWR 111851Z ..." and "KEWR  111851Z ...=" are the same report.
+
+    >>> from metar import Dedup
+    >>> dedup = Dedup.Deduplicator()
+    >>> lines = ["METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    ...          "KEWR 111851Z 29028KT  10SM 22/22 A2987=",
+    ...          "KEWR 111851Z COR 29028KT 10SM 22/21 A2987"]
+    >>> len(list(dedup.filter(lines)))
+    2
+    >>> dedup.duplicate_rate
+    0.3333333333333333
+
+Memory is bounded.  Fingerprints are held exactly for a window of time
+after they were last seen, up to a maximum number; older ones can also be
+remembered, over a much longer horizon, by an optional Bloom filter.  A
+Bloom filter can mistake a new report for a duplicate, with a small
+probability that is set by its error rate.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+
+from metar.Metar import HEADER_RE
+
+
+def fingerprint(line):
+    """Return the fingerprint (a 16-byte digest) of a raw report."""
+    code = " ".join(line.strip().rstrip("=").split()) + " "
+    m = HEADER_RE.match(code)
+    rtype, cor, station, day, hour, minute, mod = m.group(
+        "type", "cor", "station", "day", "hour", "min", "mod"
+    )
+    if mod == "CORR":
+        mod = "COR"
+    key = "%s|%s%s%s|%s|%s|%s|%s" % (
+        station,
+        day,
+        hour,
+        minute,
+        rtype or "METAR",
+        cor,
+        mod,
+        code[m.end() :].rstrip(),
+    )
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter of fingerprints, which forgets old entries.
+
+    Two generations of the filter are kept.  When the current one holds its
+    capacity of entries, it becomes the previous generation and a new one is
+    started, so that each entry is remembered for between one and two
+    capacities' worth of later entries.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Parameters
+        ----------
+        capacity : int
+          Number of entries held by each generation.
+        error_rate : float, optional
+          Probability that an entry that hasn't been added is reported as
+          present, when a generation is full.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError("error rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        nbits = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.nbits = max(8, nbits)
+        self.nhashes = max(1, int(round(self.nbits / capacity * math.log(2))))
+        self._current = bytearray((self.nbits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+
+    def _indexes(self, digest):
+        """Return the bit indexes of a fingerprint, by double hashing."""
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        nbits = self.nbits
+        return [(h1 + i * h2) % nbits for i in range(self.nhashes)]
+
+    def __contains__(self, digest):
+        indexes = self._indexes(digest)
+        for bits in (self._current, self._previous):
+            for i in indexes:
+                if not bits[i >> 3] & (1 << (i & 7)):
+                    break
+            else:
+                return True
+        return False
+
+    def add(self, digest):
+        """Add a fingerprint to the filter."""
+        if self._count >= self.capacity:
+            self._previous = self._current
+            self._current = bytearray(len(self._previous))
+            self._count = 0
+        bits = self._current
+        for i in self._indexes(digest):
+            bits[i >> 3] |= 1 << (i & 7)
+        self._count += 1
+
+
+class Deduplicator(object):
+    """A streaming filter that drops repeated raw reports."""
+
+    def __init__(
+        self,
+        window=6 * 3600,
+        max_entries=100000,
+        bloom_capacity=None,
+        bloom_error_rate=0.001,
+        clock=time.monotonic,
+    ):
+        """
+        Parameters
+        ----------
+        window : float, optional
+          Time (in seconds) for which a fingerprint is held exactly after it
+          was last seen.
+        max_entries : int, optional
+          Maximum number of fingerprints held exactly; the least recently
+          seen are forgotten first.
+        bloom_capacity : int, optional
+          If given, fingerprints are also added to a BloomFilter with this
+          capacity (per generation), to recognize repeats beyond the window.
+        bloom_error_rate : float, optional
+          Error rate of the Bloom filter.
+        clock : callable, optional
+          Function returning the current time in seconds.
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.bloom = None
+        if bloom_capacity is not None:
+            self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._clock = clock
+        self._recent = OrderedDict()  # fingerprint -> time last seen
+        self.seen = 0
+        self.duplicates = 0
+        self.bloom_duplicates = 0  # duplicates found by the Bloom filter
+
+    @property
+    def duplicate_rate(self):
+        """Return the fraction of the reports seen that were duplicates."""
+        if not self.seen:
+            return 0.0
+        return self.duplicates / self.seen
+
+    def __len__(self):
+        """Return the number of fingerprints held exactly."""
+        return len(self._recent)
+
+    def _expire(self, now):
+        recent = self._recent
+        cutoff = now - self.window
+        while recent and (
+            len(recent) > self.max_entries or next(iter(recent.values())) < cutoff
+        ):
+            recent.popitem(last=False)
+
+    def check(self, line):
+        """
+        Record a raw report, and return True if it is new or False if it is
+        a duplicate.
+        """
+        digest = fingerprint(line)
+        now = self._clock()
+        recent = self._recent
+        self.seen += 1
+        if digest in recent:
+            recent.move_to_end(digest)
+            recent[digest] = now
+            self.duplicates += 1
+            return False
+        recent[digest] = now
+        self._expire(now)
+        bloom = self.bloom
+        if bloom is not None:
+            if digest in bloom:
+                self.duplicates += 1
+                self.bloom_duplicates += 1
+                return False
+            bloom.add(digest)
+        return True
+
+    def filter(self, lines):
+        """Iterate over the raw reports that aren't duplicates."""
+        check = self.check
+        for line in lines:
+            if check(line):
+                yield line
+
+    def reset_counts(self):
+        """Reset the counts of reports seen and duplicates."""
+        self.seen = 0
+        self.duplicates = 0
+        self.bloom_duplicates = 0
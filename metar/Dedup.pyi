@@ -0,0 +1,41 @@
+from typing import Callable, Iterable, Iterator, List, Optional
+
+def fingerprint(line: str) -> bytes: ...
+
+class BloomFilter:
+    capacity: int
+    error_rate: float
+    nbits: int
+    nhashes: int
+    _current: bytearray
+    _previous: bytearray
+    _count: int
+
+    def __init__(self, capacity: int, error_rate: float = ...) -> None: ...
+    def _indexes(self, digest: bytes) -> List[int]: ...
+    def __contains__(self, digest: bytes) -> bool: ...
+    def add(self, digest: bytes) -> None: ...
+
+class Deduplicator:
+    window: float
+    max_entries: int
+    bloom: Optional[BloomFilter]
+    seen: int
+    duplicates: int
+    bloom_duplicates: int
+
+    def __init__(
+        self,
+        window: float = ...,
+        max_entries: int = ...,
+        bloom_capacity: Optional[int] = ...,
+        bloom_error_rate: float = ...,
+        clock: Callable[[], float] = ...,
+    ) -> None: ...
+    @property
+    def duplicate_rate(self) -> float: ...
+    def __len__(self) -> int: ...
+    def _expire(self, now: float) -> None: ...
+    def check(self, line: str) -> bool: ...
+    def filter(self, lines: Iterable[str]) -> Iterator[str]: ...
+    def reset_counts(self) -> None: ...
@@ -0,0 +1,298 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Batch calculation of derived meteorological quantities.
+
+These functions compute quantities derived from the decoded fields of many
+reports at once, working on whole columns of values rather than on single
+reports.  Temperatures are in degrees Celsius, wind speeds in knots and wind
+directions in degrees; columns for a list of reports are built by columns().
+
+When NumPy is installed, the calculations are vectorized and NumPy masked
+arrays are returned, with missing inputs masked.  Otherwise a pure-python
+implementation is used, which returns lists with None for missing values.
+Either implementation accepts None or NaN for a missing input.
+
+    >>> from metar import Metar, Derived
+    >>> reports = [Metar.Metar("KEWR 111851Z 27010KT 10SM 30/20 A2987"),
+    ...            Metar.Metar("KEWR 111951Z VRB03KT 10SM 29/M01 A2987")]
+    >>> data = Derived.columns(reports, use_numpy=False)
+    >>> [round(rh) for rh in Derived.relative_humidity(
+    ...     data["temp"], data["dewpt"], use_numpy=False)]
+    [55, 14]
+    >>> u, v = Derived.wind_components(
+    ...     data["wind_speed"], data["wind_dir"], use_numpy=False)
+    >>> round(u[0], 6), round(v[0], 6), u[1]
+    (10.0, 0.0, None)
+"""
+from math import exp, radians, sin, cos, sqrt
+
+from metar.Backend import np, _use_numpy
+
+# coefficients of the Magnus formula for saturation vapor pressure over water
+# (Alduchov and Eskridge, 1996)
+_MAGNUS_A = 17.625
+_MAGNUS_B = 243.04
+
+_MPH_PER_KT = 1.150779
+
+# fields of a report used as inputs, and the units of their columns
+INPUT_FIELDS = {
+    "temp": "C",
+    "dewpt": "C",
+    "wind_speed": "KT",
+    "wind_dir": None,  # degrees
+}
+
+
+# pure-python implementations
+
+
+def _py_relative_humidity(temp, dewpt):
+    return 100.0 * exp(
+        _MAGNUS_A * dewpt / (_MAGNUS_B + dewpt) - _MAGNUS_A * temp / (_MAGNUS_B + temp)
+    )
+
+
+def _py_dewpoint_depression(temp, dewpt):
+    return temp - dewpt
+
+
+def _py_heat_index(temp, rh):
+    """Return the NWS heat index (C) for a temperature (C) and humidity (%)."""
+    t = temp * 1.8 + 32.0
+    hi = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    if (hi + t) / 2.0 >= 80.0:
+        hi = (
+            -42.379
+            + 2.04901523 * t
+            + 10.14333127 * rh
+            - 0.22475541 * t * rh
+            - 0.00683783 * t * t
+            - 0.05481717 * rh * rh
+            + 0.00122874 * t * t * rh
+            + 0.00085282 * t * rh * rh
+            - 0.00000199 * t * t * rh * rh
+        )
+        if rh < 13.0 and 80.0 <= t <= 112.0:
+            hi -= (13.0 - rh) / 4.0 * sqrt((17.0 - abs(t - 95.0)) / 17.0)
+        elif rh > 85.0 and 80.0 <= t <= 87.0:
+            hi += (rh - 85.0) / 10.0 * (87.0 - t) / 5.0
+    return (hi - 32.0) / 1.8
+
+
+def _py_wind_chill(temp, speed):
+    """Return the NWS wind chill (C) for a temperature (C) and speed (KT)."""
+    t = temp * 1.8 + 32.0
+    v = speed * _MPH_PER_KT
+    if t > 50.0 or v <= 3.0:
+        return temp
+    v = v**0.16
+    return (35.74 + 0.6215 * t - 35.75 * v + 0.4275 * t * v - 32.0) / 1.8
+
+
+def _py_u(speed, direction):
+    return -speed * sin(radians(direction))
+
+
+def _py_v(speed, direction):
+    return -speed * cos(radians(direction))
+
+
+def _missing(value):
+    return value is None or value != value
+
+
+def _py_apply(func, *columns):
+    """Apply func to corresponding elements of the columns."""
+    return [
+        None if any(_missing(value) for value in values) else func(*values)
+        for values in zip(*columns)
+    ]
+
+
+# NumPy implementations
+
+
+def _np_relative_humidity(temp, dewpt):
+    return 100.0 * np.ma.exp(
+        _MAGNUS_A * dewpt / (_MAGNUS_B + dewpt) - _MAGNUS_A * temp / (_MAGNUS_B + temp)
+    )
+
+
+def _np_dewpoint_depression(temp, dewpt):
+    return temp - dewpt
+
+
+def _np_heat_index(temp, rh):
+    t = temp * 1.8 + 32.0
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    hi = (
+        -42.379
+        + 2.04901523 * t
+        + 10.14333127 * rh
+        - 0.22475541 * t * rh
+        - 0.00683783 * t * t
+        - 0.05481717 * rh * rh
+        + 0.00122874 * t * t * rh
+        + 0.00085282 * t * rh * rh
+        - 0.00000199 * t * t * rh * rh
+    )
+    dry = (rh < 13.0) & (t >= 80.0) & (t <= 112.0)
+    humid = (rh > 85.0) & (t >= 80.0) & (t <= 87.0)
+    hi = np.ma.where(
+        dry,
+        hi - (13.0 - rh) / 4.0 * np.ma.sqrt((17.0 - abs(t - 95.0)) / 17.0),
+        np.ma.where(humid, hi + (rh - 85.0) / 10.0 * (87.0 - t) / 5.0, hi),
+    )
+    hi = np.ma.where((simple + t) / 2.0 >= 80.0, hi, simple)
+    return (hi - 32.0) / 1.8
+
+
+def _np_wind_chill(temp, speed):
+    t = temp * 1.8 + 32.0
+    v = speed * _MPH_PER_KT
+    p = v**0.16
+    wc = (35.74 + 0.6215 * t - 35.75 * p + 0.4275 * t * p - 32.0) / 1.8
+    return np.ma.where((t > 50.0) | (v <= 3.0), temp, wc)
+
+
+def _np_u(speed, direction):
+    return -speed * np.ma.sin(np.radians(direction))
+
+
+def _np_v(speed, direction):
+    return -speed * np.ma.cos(np.radians(direction))
+
+
+def _np_column(values):
+    """Return a column as a float masked array, with NaN values masked."""
+    return np.ma.masked_invalid(np.ma.asarray(values, dtype=float))
+
+
+def _np_apply(func, *columns):
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        return func(*[_np_column(column) for column in columns])
+
+
+def _apply(use_numpy, py_func, np_func, *columns):
+    """Apply the chosen implementation of a calculation to the columns."""
+    if _use_numpy(use_numpy):
+        return _np_apply(np_func, *columns)
+    return _py_apply(py_func, *columns)
+
+
+# public interface
+
+
+def columns(reports, use_numpy=None):
+    """
+    Return the input columns (see INPUT_FIELDS) for a sequence of reports.
+
+    The result is a dictionary that maps each field name to a NumPy array
+    (with missing values as NaN) or a list (with missing values as None).
+    """
+    reports = list(reports)
+    data = {}
+    for field, units in INPUT_FIELDS.items():
+        column = []
+        append = column.append
+        for report in reports:
+            value = getattr(report, field)
+            if value is None:
+                append(None)
+            elif units is None:
+                append(value.value())
+            else:
+                append(value.value(units))
+        data[field] = column
+    if _use_numpy(use_numpy):
+        for field, column in data.items():
+            data[field] = np.array(column, dtype=float)
+    return data
+
+
+def relative_humidity(temps, dewpts, use_numpy=None):
+    """
+    Return the relative humidities (%) for columns of temperature and dew
+    point (C).
+
+    Parameters
+    ----------
+    temps, dewpts : sequence of float
+      Temperatures and dew points (degrees C).  Missing values may be given
+      as None or NaN.
+    use_numpy : bool, optional
+      Force (True) or prevent (False) use of NumPy.  By default NumPy is
+      used if it is installed.
+    """
+    return _apply(
+        use_numpy, _py_relative_humidity, _np_relative_humidity, temps, dewpts
+    )
+
+
+def dewpoint_depression(temps, dewpts, use_numpy=None):
+    """
+    Return the dew point depressions (C) for columns of temperature and dew
+    point (C).
+    """
+    return _apply(
+        use_numpy, _py_dewpoint_depression, _np_dewpoint_depression, temps, dewpts
+    )
+
+
+def heat_index(temps, dewpts, use_numpy=None):
+    """
+    Return the heat indexes (C) for columns of temperature and dew point (C),
+    using the algorithm of the US National Weather Service.
+    """
+    humidities = relative_humidity(temps, dewpts, use_numpy)
+    return _apply(use_numpy, _py_heat_index, _np_heat_index, temps, humidities)
+
+
+def wind_chill(temps, speeds, use_numpy=None):
+    """
+    Return the wind chill temperatures (C) for columns of temperature (C) and
+    wind speed (KT).
+
+    Outside the range in which wind chill is defined (above 50 F, or with
+    winds of 3 mph or less) the air temperature is returned.
+    """
+    return _apply(use_numpy, _py_wind_chill, _np_wind_chill, temps, speeds)
+
+
+def wind_components(speeds, directions, use_numpy=None):
+    """
+    Return the eastward (u) and northward (v) wind components (KT) for
+    columns of wind speed (KT) and direction (degrees), as a tuple (u, v).
+
+    Variable winds, which have no direction, are missing.
+    """
+    return (
+        _apply(use_numpy, _py_u, _np_u, speeds, directions),
+        _apply(use_numpy, _py_v, _np_v, speeds, directions),
+    )
+
+
+def derive(reports, use_numpy=None):
+    """
+    Return all of the derived quantities for a sequence of reports.
+
+    The result is a dictionary that maps "relative_humidity",
+    "dewpoint_depression", "heat_index", "wind_chill", "wind_u" and "wind_v"
+    to columns, with one value for each report.
+    """
+    data = columns(reports, use_numpy)
+    temps = data["temp"]
+    dewpts = data["dewpt"]
+    humidities = relative_humidity(temps, dewpts, use_numpy)
+    heat = _apply(use_numpy, _py_heat_index, _np_heat_index, temps, humidities)
+    u, v = wind_components(data["wind_speed"], data["wind_dir"], use_numpy)
+    return {
+        "relative_humidity": humidities,
+        "dewpoint_depression": dewpoint_depression(temps, dewpts, use_numpy),
+        "heat_index": heat,
+        "wind_chill": wind_chill(temps, data["wind_speed"], use_numpy),
+        "wind_u": u,
+        "wind_v": v,
+    }
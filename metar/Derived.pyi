@@ -0,0 +1,25 @@
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from metar.Metar import Metar
+
+Column = Sequence[Optional[float]]
+
+INPUT_FIELDS: Dict[str, Optional[str]]
+
+def columns(reports: Iterable[Metar], use_numpy: Optional[bool] = None) -> Dict[str, Any]: ...
+def relative_humidity(
+    temps: Column, dewpts: Column, use_numpy: Optional[bool] = None
+) -> Any: ...
+def dewpoint_depression(
+    temps: Column, dewpts: Column, use_numpy: Optional[bool] = None
+) -> Any: ...
+def heat_index(
+    temps: Column, dewpts: Column, use_numpy: Optional[bool] = None
+) -> Any: ...
+def wind_chill(
+    temps: Column, speeds: Column, use_numpy: Optional[bool] = None
+) -> Any: ...
+def wind_components(
+    speeds: Column, directions: Column, use_numpy: Optional[bool] = None
+) -> Tuple[Any, Any]: ...
+def derive(reports: Iterable[Metar], use_numpy: Optional[bool] = None) -> Dict[str, Any]: ...
@@ -0,0 +1,104 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Structured diagnostics for METAR reports that could not be fully decoded.
+
+When a Metar object is created with ``diagnostics=True``, problems found
+while parsing are neither raised as a ParserError nor issued as warnings.
+Instead, each one is recorded in the ``diagnostics`` list of the report as a
+Diagnostic, which gives the kind of problem, the handler involved, the
+offset of the offending text in the original code and the text itself.
+
+    >>> from metar import Metar
+    >>> obs = Metar.Metar("METAR KEWR 111851Z 29028KT FOO 10SM", diagnostics=True)
+    >>> obs.diagnostics[0].kind, obs.diagnostics[0].offset, obs.diagnostics[0].text
+    ('unparsed_group', 27, 'FOO')
+
+A DiagnosticCounts object tallies the diagnostics of many reports, for
+quality control of whole feeds.
+"""
+from collections import namedtuple
+
+# kinds of diagnostic
+UNPARSED_GROUP = "unparsed_group"  # body group that no handler matched
+UNPARSED_REMARK = "unparsed_remark"  # remark that no handler matched
+HANDLER_ERROR = "handler_error"  # exception raised while decoding a group
+LIMIT_EXCEEDED = "limit_exceeded"  # report too long, or too slow to parse
+
+
+class Diagnostic(namedtuple("Diagnostic", "kind handler offset text error")):
+    """
+    A problem found while parsing a report.
+
+    kind is one of UNPARSED_GROUP, UNPARSED_REMARK, HANDLER_ERROR or
+    LIMIT_EXCEEDED.  handler is the name of the handler that raised the error
+    or, for an unparsed body group, of the first handler that failed to match
+    it (None for other kinds).  offset is the position of text in the
+    original METAR code; for LIMIT_EXCEEDED, it is the position at which
+    parsing stopped and text is the name of the limit ("max_length",
+    "max_groups" or "time_budget").  error is the exception raised by the
+    handler, if any.
+    """
+
+    __slots__ = ()
+
+
+class DiagnosticCounts(object):
+    """Counts of the diagnostics recorded for a collection of reports."""
+
+    def __init__(self):
+        self.reports = 0
+        self.failed_reports = 0
+        self._counts = {}
+
+    def add(self, report):
+        """Count the diagnostics of a Metar object parsed with diagnostics=True."""
+        self.reports += 1
+        diagnostics = report.diagnostics
+        if diagnostics:
+            self.failed_reports += 1
+            counts = self._counts
+            for diagnostic in diagnostics:
+                key = (diagnostic.kind, diagnostic.handler)
+                counts[key] = counts.get(key, 0) + 1
+
+    def merge(self, other):
+        """Add the counts collected by another DiagnosticCounts object."""
+        self.reports += other.reports
+        self.failed_reports += other.failed_reports
+        for key, count in other._counts.items():
+            self._counts[key] = self._counts.get(key, 0) + count
+
+    def reset(self):
+        """Clear all of the counts."""
+        self.reports = 0
+        self.failed_reports = 0
+        self._counts.clear()
+
+    def count(self, kind, handler=None):
+        """
+        Return the number of diagnostics of the given kind, optionally only
+        those for the given handler.
+        """
+        if handler is not None:
+            return self._counts.get((kind, handler), 0)
+        return sum(n for (k, h), n in self._counts.items() if k == kind)
+
+    def snapshot(self):
+        """
+        Return the counts: the number of "reports" and "failed_reports", the
+        diagnostics of each kind ("kinds", by kind), and a "handlers" list
+        with the count of each kind for each handler.
+        """
+        kinds = {}
+        for (kind, handler), count in self._counts.items():
+            kinds[kind] = kinds.get(kind, 0) + count
+        return {
+            "reports": self.reports,
+            "failed_reports": self.failed_reports,
+            "kinds": kinds,
+            "handlers": [
+                {"kind": kind, "handler": handler, "count": count}
+                for (kind, handler), count in self._counts.items()
+            ],
+        }
@@ -0,0 +1,25 @@
+from typing import Any, Dict, NamedTuple, Optional
+
+UNPARSED_GROUP: str
+UNPARSED_REMARK: str
+HANDLER_ERROR: str
+LIMIT_EXCEEDED: str
+
+class Diagnostic(NamedTuple):
+    kind: str
+    handler: Optional[str]
+    offset: int
+    text: Optional[str]
+    error: Optional[Exception]
+
+class DiagnosticCounts:
+    reports: int
+    failed_reports: int
+    _counts: Dict[tuple, int]
+
+    def __init__(self) -> None: ...
+    def add(self, report: Any) -> None: ...
+    def merge(self, other: "DiagnosticCounts") -> None: ...
+    def reset(self) -> None: ...
+    def count(self, kind: str, handler: Optional[str] = ...) -> int: ...
+    def snapshot(self) -> Dict[str, Any]: ...
@@ -0,0 +1,147 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Cheap filtering of raw METAR lines before they are parsed.
+
+A ReportFilter reads only the header of each line (the report type, station
+id and observation time groups) and selects the lines from a wanted set of
+stations, of the wanted report types, and observed within a time window.
+The header is read by slicing at fixed offsets where the line has the usual
+layout, and by Metar.scan_header() otherwise, so that the lines that aren't
+wanted are skipped without running the parser.
+
+    >>> from metar import Filter
+    >>> wanted = Filter.ReportFilter(stations=["KEWR"], types=["SPECI"])
+    >>> lines = ["SPECI KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    ...          "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    ...          "SPECI KJFK 111851Z 29028KT 10SM 22/22 A2987"]
+    >>> [line[:10] for line in wanted.filter(lines)]
+    ['SPECI KEWR']
+    >>> wanted.skip_rate
+    0.6666666666666666
+
+The filter accepts and yields raw lines, so it can be put in front of
+anything that reads them, such as Store.ObservationStore.update_many().
+"""
+from metar import Metar
+
+_MINUTES_PER_DAY = 1440
+
+
+def _minute(value):
+    """
+    Return the minute of the month of a datetime or of a (day, hour, minute)
+    tuple.
+    """
+    if isinstance(value, tuple):
+        day, hour, minute = value
+    else:
+        day, hour, minute = value.day, value.hour, value.minute
+    return day * _MINUTES_PER_DAY + hour * 60 + minute
+
+
+def read_header(line):
+    """
+    Return the report type, station id and observation time (as a (day,
+    hour, minute) tuple, or None) read from the header of a raw report.
+
+    Returns None if the line doesn't start with a station id.
+    """
+    # fast path: "KEWR 111851Z" or "METAR KEWR 111851Z"
+    offset = 0
+    rtype = "METAR"
+    if line[:6] in ("METAR ", "SPECI "):
+        rtype = line[:5]
+        offset = 6
+    station = line[offset : offset + 4]
+    time = line[offset + 5 : offset + 11]
+    if (
+        line[offset + 4 : offset + 5] == " "
+        and station[:1].isalpha()
+        and station.isalnum()
+        and station.isupper()
+        and time.isdigit()
+        and line[offset + 11 : offset + 12] in ("Z", " ", "")
+    ):
+        return rtype, station, (int(time[:2]), int(time[2:4]), int(time[4:]))
+    header = Metar.scan_header(line)
+    if header.station_id is None:
+        return None
+    time = None
+    if header.day is not None:
+        time = (header.day, header.hour, header.minute)
+    return header.type, header.station_id, time
+
+
+class ReportFilter(object):
+    """A filter for raw METAR lines, by station, report type and time."""
+
+    def __init__(self, stations=None, types=None, start=None, end=None):
+        """
+        Parameters
+        ----------
+        stations : iterable of str, optional
+          Station ids of the wanted reports.  By default, all stations.
+        types : iterable of str, optional
+          Wanted report types ("METAR" and/or "SPECI").  By default, both.
+        start, end : datetime.datetime or tuple, optional
+          Start and end (inclusive) of the window of wanted observation
+          times, given as datetimes or as (day, hour, minute) tuples.  Only
+          the day of the month and the time of day are compared, since the
+          header gives no month; a window whose start is after its end wraps
+          around the end of the month.
+        """
+        self.stations = None if stations is None else frozenset(stations)
+        self.types = None if types is None else frozenset(types)
+        self.start = None if start is None else _minute(start)
+        self.end = None if end is None else _minute(end)
+        self.seen = 0
+        self.passed = 0
+
+    @property
+    def skip_rate(self):
+        """Return the fraction of the lines seen that were skipped."""
+        if not self.seen:
+            return 0.0
+        return (self.seen - self.passed) / self.seen
+
+    def reset(self):
+        """Reset the counts of lines seen and passed."""
+        self.seen = 0
+        self.passed = 0
+
+    def _in_window(self, time):
+        minute = _minute(time)
+        start = self.start
+        end = self.end
+        if start is None:
+            return end is None or minute <= end
+        if end is None:
+            return minute >= start
+        if start <= end:
+            return start <= minute <= end
+        return minute >= start or minute <= end
+
+    def match(self, line):
+        """Return True if a raw report is wanted.  The counts aren't updated."""
+        header = read_header(line)
+        if header is None:
+            return False
+        rtype, station, time = header
+        if self.stations is not None and station not in self.stations:
+            return False
+        if self.types is not None and rtype not in self.types:
+            return False
+        if self.start is not None or self.end is not None:
+            if time is None or not self._in_window(time):
+                return False
+        return True
+
+    def filter(self, lines):
+        """Iterate over the wanted lines, counting the lines seen and passed."""
+        match = self.match
+        for line in lines:
+            self.seen += 1
+            if match(line):
+                self.passed += 1
+                yield line
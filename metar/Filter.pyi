@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import FrozenSet, Iterable, Iterator, Optional, Tuple, Union
+
+Time = Tuple[int, int, int]
+
+def _minute(value: Union[datetime, Time]) -> int: ...
+def read_header(line: str) -> Optional[Tuple[str, str, Optional[Time]]]: ...
+
+class ReportFilter:
+    stations: Optional[FrozenSet[str]]
+    types: Optional[FrozenSet[str]]
+    start: Optional[int]
+    end: Optional[int]
+    seen: int
+    passed: int
+
+    def __init__(
+        self,
+        stations: Optional[Iterable[str]] = ...,
+        types: Optional[Iterable[str]] = ...,
+        start: Union[datetime, Time, None] = ...,
+        end: Union[datetime, Time, None] = ...,
+    ) -> None: ...
+    @property
+    def skip_rate(self) -> float: ...
+    def reset(self) -> None: ...
+    def _in_window(self, time: Time) -> bool: ...
+    def match(self, line: str) -> bool: ...
+    def filter(self, lines: Iterable[str]) -> Iterator[str]: ...
@@ -0,0 +1,182 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""FAA flight categories (VFR, MVFR, IFR and LIFR) of METAR reports.
+
+The category of a report is the worse of the categories of its ceiling (the
+lowest broken or overcast layer, or vertical visibility) and its prevailing
+visibility:
+
+    ======  ======================  ======================
+    LIFR    ceiling below 500 ft    visibility below 1 SM
+    IFR     500 to below 1000 ft    1 to below 3 SM
+    MVFR    1000 to 3000 ft         3 to 5 SM
+    VFR     above 3000 ft           above 5 SM
+    ======  ======================  ======================
+
+A report with no ceiling is classified by its visibility alone.  A report
+without a visibility is classified by its ceiling, if that is 3000 ft or
+below, since the ceiling then sets the category unless a low visibility
+would have made it worse; otherwise it isn't classified (its category is
+None).
+
+    >>> from metar import Metar, FlightCategory
+    >>> obs = Metar.Metar("KEWR 111851Z 29028KT 4SM BR SCT005 OVC020 22/22 A2987")
+    >>> FlightCategory.ceiling(obs)
+    2000.0
+    >>> FlightCategory.category(obs)
+    'MVFR'
+
+The batch functions classify columns of ceilings and visibilities; they are
+vectorized when NumPy is installed.
+"""
+from metar.Backend import np, _use_numpy
+
+LIFR = "LIFR"
+IFR = "IFR"
+MVFR = "MVFR"
+VFR = "VFR"
+
+# from the worst category to the best
+CATEGORIES = (LIFR, IFR, MVFR, VFR)
+
+# sky covers that form a ceiling
+CEILING_COVERS = frozenset(["BKN", "OVC", "VV"])
+
+# lower limits (ft) of the ceilings, and (SM) of the visibilities, of IFR and
+# MVFR; the upper limit of MVFR is inclusive
+_CEILING_LIMITS = (500.0, 1000.0, 3000.0)
+_VISIBILITY_LIMITS = (1.0, 3.0, 5.0)
+_VFR_RANK = CATEGORIES.index(VFR)
+
+
+def _in_units(value, units):
+    """Return a distance in the given units, avoiding conversion if possible."""
+    if value._units == units:
+        return value._value
+    return value.value(units)
+
+
+def _rank(value, limits):
+    """Return the index in CATEGORIES of a ceiling or visibility."""
+    low, middle, high = limits
+    if value < low:
+        return 0
+    if value < middle:
+        return 1
+    if value <= high:
+        return 2
+    return 3
+
+
+def ceiling(report):
+    """
+    Return the ceiling (ft) of a report, or None if it has no ceiling.
+
+    Layers whose height isn't reported are ignored.
+    """
+    lowest = None
+    for cover, height, cloud in report.sky:
+        if height is not None and cover in CEILING_COVERS:
+            height = _in_units(height, "FT")
+            if lowest is None or height < lowest:
+                lowest = height
+    return lowest
+
+
+def visibility(report):
+    """Return the prevailing visibility (SM) of a report, or None."""
+    if report.vis is None:
+        return None
+    return _in_units(report.vis, "SM")
+
+
+def classify(ceiling, visibility):
+    """
+    Return the flight category for a ceiling (ft, or None if there is no
+    ceiling) and a visibility (SM, or None if it is missing).
+    """
+    rank = _VFR_RANK
+    if ceiling is not None:
+        rank = _rank(ceiling, _CEILING_LIMITS)
+    if visibility is None:
+        if rank == _VFR_RANK:
+            return None
+        return CATEGORIES[rank]
+    return CATEGORIES[min(rank, _rank(visibility, _VISIBILITY_LIMITS))]
+
+
+def category(report):
+    """Return the flight category of a report (or None)."""
+    return classify(ceiling(report), visibility(report))
+
+
+def columns(reports, use_numpy=None):
+    """
+    Return the ceilings (ft) and visibilities (SM) of a sequence of reports,
+    as a tuple of two columns.
+
+    The columns are NumPy arrays (with missing values as NaN) or lists (with
+    missing values as None).
+    """
+    ceilings = []
+    visibilities = []
+    for report in reports:
+        ceilings.append(ceiling(report))
+        visibilities.append(visibility(report))
+    if _use_numpy(use_numpy):
+        return np.array(ceilings, dtype=float), np.array(visibilities, dtype=float)
+    return ceilings, visibilities
+
+
+def _np_rank(values, limits):
+    low, middle, high = limits
+    return np.select(
+        [values < low, values < middle, values <= high], [0, 1, 2], default=3
+    )
+
+
+def classify_columns(ceilings, visibilities, use_numpy=None):
+    """
+    Return the flight categories for columns of ceilings and visibilities.
+
+    Parameters
+    ----------
+    ceilings : sequence of float
+      Ceilings (ft), with None or NaN where there is no ceiling.
+    visibilities : sequence of float
+      Visibilities (SM), with None or NaN where the visibility is missing.
+    use_numpy : bool, optional
+      Force (True) or prevent (False) use of NumPy.  By default NumPy is
+      used if it is installed, and a masked array of category names is
+      returned, with unclassified reports (those without a visibility or a
+      ceiling of 3000 ft or below) masked.  Otherwise a list is returned,
+      with None for unclassified reports.
+    """
+    if _use_numpy(use_numpy):
+        ceilings = np.asarray(ceilings, dtype=float)
+        visibilities = np.asarray(visibilities, dtype=float)
+        with np.errstate(invalid="ignore"):
+            ceiling_ranks = _np_rank(
+                np.nan_to_num(ceilings, nan=np.inf), _CEILING_LIMITS
+            )
+            # a missing visibility is ranked as VFR
+            ranks = np.minimum(
+                _np_rank(visibilities, _VISIBILITY_LIMITS), ceiling_ranks
+            )
+        missing = np.isnan(visibilities) & (ceiling_ranks == _VFR_RANK)
+        return np.ma.masked_array(np.array(CATEGORIES)[ranks], mask=missing)
+    result = []
+    for ceiling, visibility in zip(ceilings, visibilities):
+        if ceiling is not None and ceiling != ceiling:
+            ceiling = None
+        if visibility is not None and visibility != visibility:
+            visibility = None
+        result.append(classify(ceiling, visibility))
+    return result
+
+
+def categories(reports, use_numpy=None):
+    """Return the flight categories of a sequence of reports."""
+    ceilings, visibilities = columns(reports, use_numpy)
+    return classify_columns(ceilings, visibilities, use_numpy)
@@ -0,0 +1,27 @@
+from typing import Any, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from metar.Datatypes import distance
+from metar.Metar import Metar
+
+LIFR: str
+IFR: str
+MVFR: str
+VFR: str
+CATEGORIES: Tuple[str, ...]
+CEILING_COVERS: FrozenSet[str]
+
+def _in_units(value: distance, units: str) -> float: ...
+def _rank(value: float, limits: Tuple[float, float, float]) -> int: ...
+def ceiling(report: Metar) -> Optional[float]: ...
+def visibility(report: Metar) -> Optional[float]: ...
+def classify(ceiling: Optional[float], visibility: Optional[float]) -> Optional[str]: ...
+def category(report: Metar) -> Optional[str]: ...
+def columns(
+    reports: Iterable[Metar], use_numpy: Optional[bool] = None
+) -> Tuple[Any, Any]: ...
+def classify_columns(
+    ceilings: Sequence[Optional[float]],
+    visibilities: Sequence[Optional[float]],
+    use_numpy: Optional[bool] = None,
+) -> Any: ...
+def categories(reports: Iterable[Metar], use_numpy: Optional[bool] = None) -> Any: ...
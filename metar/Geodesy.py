@@ -0,0 +1,196 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Batch great-circle distance and bearing calculations.
+
+These functions apply the haversine distance and initial bearing formulas
+used by the metar.Datatypes.position class to whole arrays of positions at
+once.  Latitudes and longitudes are given in degrees; distances are returned
+in meters and bearings in degrees (0..360, clockwise from north).
+
+When NumPy is installed, the calculations are vectorized and NumPy arrays
+are returned.  Otherwise a pure-python implementation is used, which returns
+lists (or lists of lists, for the matrix functions).
+"""
+from math import radians, degrees, sin, cos, atan2, asin, sqrt
+
+from metar.Backend import np, _use_numpy
+from metar.Datatypes import EARTH_RADIUS
+
+
+# pure-python implementations
+
+
+def _py_distance(lat1, long1, lat2, long2):
+    """Return the haversine distance (m) between two points given in radians."""
+    a = sin((lat2 - lat1) / 2.0) ** 2 + cos(lat1) * cos(lat2) * sin(
+        (long2 - long1) / 2.0
+    ) ** 2
+    return 2.0 * EARTH_RADIUS * asin(min(1.0, sqrt(a)))
+
+
+def _py_bearing(lat1, long1, lat2, long2):
+    """Return the initial bearing (degrees) between two points given in radians."""
+    s = -sin(long1 - long2) * cos(lat2)
+    c = cos(lat1) * sin(lat2) - sin(lat1) * cos(lat2) * cos(long1 - long2)
+    d = degrees(atan2(s, c))
+    if d < 0.0:
+        d += 360.0
+    return d
+
+
+def _py_pairs(func, lats1, longs1, lats2, longs2):
+    """Apply func to corresponding elements of the given sequences."""
+    return [
+        func(radians(lat1), radians(long1), radians(lat2), radians(long2))
+        for lat1, long1, lat2, long2 in zip(lats1, longs1, lats2, longs2)
+    ]
+
+
+def _py_from(func, lat, long, lats, longs):
+    """Apply func from a single origin to each element of the given sequences."""
+    lat = radians(lat)
+    long = radians(long)
+    return [
+        func(lat, long, radians(lat2), radians(long2))
+        for lat2, long2 in zip(lats, longs)
+    ]
+
+
+def _py_matrix(func, lats, longs):
+    """Apply func to every pair of positions in the given sequences."""
+    lats = [radians(lat) for lat in lats]
+    longs = [radians(long) for long in longs]
+    points = list(zip(lats, longs))
+    return [
+        [func(lat1, long1, lat2, long2) for lat2, long2 in points]
+        for lat1, long1 in points
+    ]
+
+
+# NumPy implementations
+
+
+def _np_distance(lat1, long1, lat2, long2):
+    """Return haversine distances (m) between arrays of points in radians."""
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(
+        (long2 - long1) / 2.0
+    ) ** 2
+    return 2.0 * EARTH_RADIUS * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def _np_bearing(lat1, long1, lat2, long2):
+    """Return initial bearings (degrees) between arrays of points in radians."""
+    s = -np.sin(long1 - long2) * np.cos(lat2)
+    c = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(
+        long1 - long2
+    )
+    return np.degrees(np.arctan2(s, c)) % 360.0
+
+
+def _np_radians(values):
+    return np.radians(np.asarray(values, dtype=float))
+
+
+def _np_pairs(func, lats1, longs1, lats2, longs2):
+    return func(
+        _np_radians(lats1), _np_radians(longs1), _np_radians(lats2), _np_radians(longs2)
+    )
+
+
+def _np_from(func, lat, long, lats, longs):
+    return func(
+        _np_radians(lat), _np_radians(long), _np_radians(lats), _np_radians(longs)
+    )
+
+
+def _np_matrix(func, lats, longs):
+    lats = _np_radians(lats)
+    longs = _np_radians(longs)
+    return func(lats[:, np.newaxis], longs[:, np.newaxis], lats, longs)
+
+
+# public interface
+
+
+def distances(lats1, longs1, lats2, longs2, use_numpy=None):
+    """
+    Return the great-circle distances (m) between corresponding positions.
+
+    Parameters
+    ----------
+    lats1, longs1 : sequence of float
+      Latitudes and longitudes (degrees) of the starting positions.
+    lats2, longs2 : sequence of float
+      Latitudes and longitudes (degrees) of the end positions.
+    use_numpy : bool, optional
+      Force (True) or prevent (False) use of NumPy.  By default NumPy is
+      used if it is installed.
+    """
+    if _use_numpy(use_numpy):
+        return _np_pairs(_np_distance, lats1, longs1, lats2, longs2)
+    return _py_pairs(_py_distance, lats1, longs1, lats2, longs2)
+
+
+def bearings(lats1, longs1, lats2, longs2, use_numpy=None):
+    """
+    Return the initial bearings (degrees) between corresponding positions.
+
+    See distances() for a description of the parameters.
+    """
+    if _use_numpy(use_numpy):
+        return _np_pairs(_np_bearing, lats1, longs1, lats2, longs2)
+    return _py_pairs(_py_bearing, lats1, longs1, lats2, longs2)
+
+
+def distances_from(lat, long, lats, longs, use_numpy=None):
+    """
+    Return the great-circle distances (m) from one position to many others.
+
+    Parameters
+    ----------
+    lat, long : float
+      Latitude and longitude (degrees) of the origin.
+    lats, longs : sequence of float
+      Latitudes and longitudes (degrees) of the other positions.
+    use_numpy : bool, optional
+      Force (True) or prevent (False) use of NumPy.
+    """
+    if _use_numpy(use_numpy):
+        return _np_from(_np_distance, lat, long, lats, longs)
+    return _py_from(_py_distance, lat, long, lats, longs)
+
+
+def bearings_from(lat, long, lats, longs, use_numpy=None):
+    """
+    Return the initial bearings (degrees) from one position to many others.
+
+    See distances_from() for a description of the parameters.
+    """
+    if _use_numpy(use_numpy):
+        return _np_from(_np_bearing, lat, long, lats, longs)
+    return _py_from(_py_bearing, lat, long, lats, longs)
+
+
+def distance_matrix(lats, longs, use_numpy=None):
+    """
+    Return the great-circle distances (m) between every pair of positions.
+
+    Element [i][j] of the result is the distance from position i to
+    position j.
+    """
+    if _use_numpy(use_numpy):
+        return _np_matrix(_np_distance, lats, longs)
+    return _py_matrix(_py_distance, lats, longs)
+
+
+def bearing_matrix(lats, longs, use_numpy=None):
+    """
+    Return the initial bearings (degrees) between every pair of positions.
+
+    Element [i][j] of the result is the bearing from position i to
+    position j.
+    """
+    if _use_numpy(use_numpy):
+        return _np_matrix(_np_bearing, lats, longs)
+    return _py_matrix(_py_bearing, lats, longs)
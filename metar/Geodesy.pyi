@@ -0,0 +1,38 @@
+from typing import Any, List, Optional, Sequence
+
+Coordinates = Sequence[float]
+
+def distances(
+    lats1: Coordinates,
+    longs1: Coordinates,
+    lats2: Coordinates,
+    longs2: Coordinates,
+    use_numpy: Optional[bool] = None,
+) -> Any: ...
+def bearings(
+    lats1: Coordinates,
+    longs1: Coordinates,
+    lats2: Coordinates,
+    longs2: Coordinates,
+    use_numpy: Optional[bool] = None,
+) -> Any: ...
+def distances_from(
+    lat: float,
+    long: float,
+    lats: Coordinates,
+    longs: Coordinates,
+    use_numpy: Optional[bool] = None,
+) -> Any: ...
+def bearings_from(
+    lat: float,
+    long: float,
+    lats: Coordinates,
+    longs: Coordinates,
+    use_numpy: Optional[bool] = None,
+) -> Any: ...
+def distance_matrix(
+    lats: Coordinates, longs: Coordinates, use_numpy: Optional[bool] = None
+) -> Any: ...
+def bearing_matrix(
+    lats: Coordinates, longs: Coordinates, use_numpy: Optional[bool] = None
+) -> Any: ...
@@ -7,10 +7,14 @@ A Metar object represents the weather report encoded by a single METAR code.
 """
 import re
 import datetime
+import functools
+import itertools
 import warnings
 import logging
+from collections import namedtuple
+from time import perf_counter
 
-from metar import __version__, __author__, __email__, __LICENSE__
+from metar import __author__, __email__, __LICENSE__
 from metar.Datatypes import (
     temperature,
     pressure,
@@ -19,33 +23,100 @@ from metar.Datatypes import (
     direction,
     precipitation,
 )
+from metar.Diagnostics import (
+    Diagnostic,
+    UNPARSED_GROUP,
+    UNPARSED_REMARK,
+    HANDLER_ERROR,
+    LIMIT_EXCEEDED,
+)
+from metar.Render import Renderer
 
 # logger
 _logger = logging.getLogger(__name__)
 
 
+def __getattr__(name):
+    # the package version is only looked up when it's needed
+    if name == "__version__":
+        import metar
+
+        return metar.__version__
+    if name in _PUBLIC_PATTERNS:
+        return _public_pattern(name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 # Exceptions
 class ParserError(Exception):
     """Exception raised when an unparseable group is found in body of the report."""
 
+
+class _TimeBudgetExceeded(Exception):
+    """Raised internally when the time budget for parsing a report runs out."""
+
     pass
 
 
-# regular expressions to decode various groups of the METAR code
-MISSING_RE = re.compile(r"^[M/]+$")
+class _LazyPattern(object):
+    """
+    A regular expression that is compiled the first time it is used.
+
+    Importing the module doesn't pay for compiling every pattern, and the
+    patterns of groups that never occur are never compiled.  After the first
+    use, match() and the other methods are those of the compiled pattern.
+    The pattern and flags attributes are available without compiling.
+    """
 
-TYPE_RE = re.compile(r"^(?P<type>METAR|SPECI)\s+")
-COR_RE = re.compile(r"^(?P<cor>COR)\s+")
-STATION_RE = re.compile(r"^(?P<station>[A-Z][A-Z0-9]{3})\s+")
-TIME_RE = re.compile(
-    r"""^(?P<day>\d\d)
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags | re.UNICODE
+        self._flags = flags
+        self._compiled = None
+
+    def _compile(self):
+        compiled = self._compiled
+        if compiled is None:
+            compiled = self._compiled = re.compile(self.pattern, self._flags)
+            self.match = compiled.match
+        return compiled
+
+    def match(self, *args):
+        return self._compile().match(*args)
+
+    def __getattr__(self, name):
+        # other methods and attributes of the compiled pattern, which are
+        # then held by this object
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = getattr(self._compile(), name)
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self):
+        return "_LazyPattern(%r)" % (self.pattern,)
+
+
+# regular expressions to decode various groups of the METAR code.  The parser
+# matches them at a position within the report, so they aren't anchored; the
+# public names (without the leading underscore) are the anchored patterns,
+# compiled when they're first used (see __getattr__).
+_MISSING_RE = _LazyPattern(r"^[M/]+$")
+
+_TYPE_RE = _LazyPattern(r"(?P<type>METAR|SPECI)\s+")
+_COR_RE = _LazyPattern(r"(?P<cor>COR)\s+")
+_STATION_RE = _LazyPattern(r"(?P<station>[A-Z][A-Z0-9]{3})\s+")
+_TIME_RE = _LazyPattern(
+    r"""(?P<day>\d\d)
         (?P<hour>\d\d)
         (?P<min>\d\d)Z?\s+""",
     re.VERBOSE,
 )
-MODIFIER_RE = re.compile(r"^(?P<mod>AUTO|COR AUTO|FINO|NIL|TEST|CORR?|RTD|CC[A-G])\s+")
-WIND_RE = re.compile(
-    r"""^(?P<dir>[\dO]{3}|[0O]|///|MMM|VRB)
+_MODIFIER_RE = _LazyPattern(
+    r"(?P<mod>AUTO|COR AUTO|FINO|NIL|TEST|CORR?|RTD|CC[A-G])\s+"
+)
+_WIND_RE = _LazyPattern(
+    r"""(?P<dir>[\dO]{3}|[0O]|///|MMM|VRB)
         (?P<speed>P?[\dO]{2,3}|[/M]{2,3})
         (G(?P<gust>P?(\d{1,3}|[/M]{1,3})))?
         (?P<units>KTS?|LT|K|T|KMH|MPS)?
@@ -53,62 +124,62 @@ WIND_RE = re.compile(
         (?P<varto>\d\d\d))?\s+""",
     re.VERBOSE,
 )
-VISIBILITY_RE = re.compile(
-    r"""^(?P<vis>(?P<dist>(M|P)?\d\d\d\d|////)
+_VISIBILITY_RE = _LazyPattern(
+    r"""(?P<vis>(?P<dist>(M|P)?\d\d\d\d|////)
         (?P<dir>[NSEW][EW]? | NDV)? |
         (?P<distu>(M|P)?(\d+|\d\d?/\d\d?|\d+\s+\d/\d))
         (?P<units>SM|KM|M|U) |
         CAVOK )\s+""",
     re.VERBOSE,
 )
-RUNWAY_RE = re.compile(
-    r"""^(RVRNO |
+_RUNWAY_RE = _LazyPattern(
+    r"""(RVRNO |
         R(?P<name>\d\d(RR?|LL?|C)?)/
         (?P<low>(M|P)?(\d\d\d\d|/{4}))
         (V(?P<high>(M|P)?\d\d\d\d))?
         (?P<unit>FT)?[/NDU]*)\s+""",
     re.VERBOSE,
 )
-WEATHER_RE = re.compile(
-    r"""^(?P<int>(-|\+|VC)*)
+_WEATHER_RE = _LazyPattern(
+    r"""(?P<int>(-|\+|VC)*)
         (?P<desc>(MI|PR|BC|DR|BL|SH|TS|FZ)+)?
-        (?P<prec>(DZ|RA|SN|SG|IC|PL|GR|GS|UP|/)*)
+        (?P<prec>(DZ|RA|SN|SG|IC|PL|GR|GS|UP|/+(?!/))*)
         (?P<obsc>BR|FG|FU|VA|DU|SA|HZ|PY)?
         (?P<other>PO|SQ|FC|SS|DS|NSW|/+)?
         (?P<int2>[-+])?\s+""",
     re.VERBOSE,
 )
-SKY_RE = re.compile(
-    r"""^(?P<cover>VV|CLR|SKC|SCK|NSC|NCD|BKN|SCT|FEW|[O0]VC|///)
+_SKY_RE = _LazyPattern(
+    r"""(?P<cover>VV|CLR|SKC|SCK|NSC|NCD|BKN|SCT|FEW|[O0]VC|///)
         (?P<height>[\dO]{2,4}|///)?
         (?P<cloud>([A-Z][A-Z]+|///))?\s+""",
     re.VERBOSE,
 )
-TEMP_RE = re.compile(
-    r"""^(?P<temp>(M|-)?\d{1,2}|//|XX|MM)/
+_TEMP_RE = _LazyPattern(
+    r"""(?P<temp>(M|-)?\d{1,2}|//|XX|MM)/
         (?P<dewpt>(M|-)?\d{1,2}|//|XX|MM)?\s+""",
     re.VERBOSE,
 )
-PRESS_RE = re.compile(
-    r"""^(?P<unit>A|Q|QNH)?
+_PRESS_RE = _LazyPattern(
+    r"""(?P<unit>A|Q|QNH)?
         (?P<press>[\dO]{3,4}|////)
         (?P<unit2>INS)?\s+""",
     re.VERBOSE,
 )
-RECENT_RE = re.compile(
-    r"""^RE(?P<desc>MI|PR|BC|DR|BL|SH|TS|FZ)?
+_RECENT_RE = _LazyPattern(
+    r"""RE(?P<desc>MI|PR|BC|DR|BL|SH|TS|FZ)?
         (?P<prec>(DZ|RA|SN|SG|IC|PL|GR|GS|UP)*)?
         (?P<obsc>BR|FG|FU|VA|DU|SA|HZ|PY)?
         (?P<other>PO|SQ|FC|SS|DS)?\s+""",
     re.VERBOSE,
 )
-WINDSHEAR_RE = re.compile(r"^(WS\s+)?(ALL\s+RWY|R(WY)?(?P<name>\d\d(RR?|L?|C)?))\s+")
-COLOR_RE = re.compile(
-    r"""^(BLACK)?(BLU|GRN|WHT|RED)\+?
+_WINDSHEAR_RE = _LazyPattern(r"(WS\s+)?(ALL\s+RWY|R(WY)?(?P<name>\d\d(RR?|L?|C)?))\s+")
+_COLOR_RE = _LazyPattern(
+    r"""(BLACK)?(BLU|GRN|WHT|RED)\+?
                         (/?(BLACK)?(BLU|GRN|WHT|RED)\+?)*\s*""",
     re.VERBOSE,
 )
-RUNWAYSTATE_RE = re.compile(
+_RUNWAYSTATE_RE = _LazyPattern(
     r"""((?P<snoclo>R/SNOCLO) |
         ((?P<name>\d\d) | R(?P<namenew>\d\d)(RR?|LL?|C)?/?)
         ((?P<special> SNOCLO|CLRD(\d\d|//)) |
@@ -118,82 +189,158 @@ RUNWAYSTATE_RE = re.compile(
         (?P<friction>(\d\d|//))))\s+""",
     re.VERBOSE,
 )
-TREND_RE = re.compile(r"^(?P<trend>TEMPO|BECMG|FCST|NOSIG)\s+")
+_TREND_RE = _LazyPattern(r"(?P<trend>TEMPO|BECMG|FCST|NOSIG)\s+")
 
-TRENDTIME_RE = re.compile(r"(?P<when>(FM|TL|AT))(?P<hour>\d\d)(?P<min>\d\d)\s+")
+_TRENDTIME_RE = _LazyPattern(r"(?P<when>(FM|TL|AT))(?P<hour>\d\d)(?P<min>\d\d)\s+")
 
-REMARK_RE = re.compile(r"^(RMKS?|NOSPECI|NOSIG)\s+")
+_REMARK_RE = _LazyPattern(r"(RMKS?|NOSPECI|NOSIG)\s+")
 
 # regular expressions for remark groups
-AUTO_RE = re.compile(r"^AO(?P<type>\d)\s+")
-SEALVL_PRESS_RE = re.compile(r"^SLP(?P<press>\d\d\d)\s+")
-PEAK_WIND_RE = re.compile(
-    r"""^P[A-Z]\s+WND\s+
+_AUTO_RE = _LazyPattern(r"AO(?P<type>\d)\s+")
+_SEALVL_PRESS_RE = _LazyPattern(r"SLP(?P<press>\d\d\d)\s+")
+_PEAK_WIND_RE = _LazyPattern(
+    r"""P[A-Z]\s+WND\s+
         (?P<dir>\d\d\d)
         (?P<speed>P?\d\d\d?)/
         (?P<hour>\d\d)?
         (?P<min>\d\d)\s+""",
     re.VERBOSE,
 )
-WIND_SHIFT_RE = re.compile(
-    r"""^WSHFT\s+
+_WIND_SHIFT_RE = _LazyPattern(
+    r"""WSHFT\s+
         (?P<hour>\d\d)?
         (?P<min>\d\d)
         (\s+(?P<front>FROPA))?\s+""",
     re.VERBOSE,
 )
-PRECIP_1HR_RE = re.compile(r"^P(?P<precip>\d\d\d\d)\s+")
-PRECIP_24HR_RE = re.compile(
-    r"""^(?P<type>6|7)
+_PRECIP_1HR_RE = _LazyPattern(r"P(?P<precip>\d\d\d\d)\s+")
+_PRECIP_24HR_RE = _LazyPattern(
+    r"""(?P<type>6|7)
         (?P<precip>\d\d\d\d)\s+""",
     re.VERBOSE,
 )
-PRESS_3HR_RE = re.compile(
-    r"""^5(?P<tend>[0-8])
+_PRESS_3HR_RE = _LazyPattern(
+    r"""5(?P<tend>[0-8])
 (?P<press>\d\d\d)\s+""",
     re.VERBOSE,
 )
-TEMP_1HR_RE = re.compile(
-    r"""^T(?P<tsign>0|1)
+_TEMP_1HR_RE = _LazyPattern(
+    r"""T(?P<tsign>0|1)
         (?P<temp>\d\d\d)
         ((?P<dsign>0|1)
         (?P<dewpt>\d\d\d))?\s+""",
     re.VERBOSE,
 )
-TEMP_6HR_RE = re.compile(
-    r"""^(?P<type>1|2)
+_TEMP_6HR_RE = _LazyPattern(
+    r"""(?P<type>1|2)
         (?P<sign>0|1)
         (?P<temp>\d\d\d)\s+""",
     re.VERBOSE,
 )
-TEMP_24HR_RE = re.compile(
-    r"""^4(?P<smaxt>0|1)
+_TEMP_24HR_RE = _LazyPattern(
+    r"""4(?P<smaxt>0|1)
         (?P<maxt>\d\d\d)
         (?P<smint>0|1)
         (?P<mint>\d\d\d)\s+""",
     re.VERBOSE,
 )
-UNPARSED_RE = re.compile(r"(?P<group>\S+)\s+")
+_UNPARSED_RE = _LazyPattern(r"(?P<group>\S+)\s+")
+
+# Location of lightning or thunderstorms, e.g. "OHD", "VC NE-S", "DSNT N AND W".
+# Each whitespace-separated word must parse in only one way, so that a
+# remark that fails to match is rejected in linear time: compass points are
+# taken as a single run ("NNE-SW") rather than as a sequence of one- or
+# two-letter directions, and each run of whitespace is consumed by exactly
+# one part of the pattern.  A word ending in DSNT, and the word AND, must be
+# followed by whitespace.
+_LOC_ITEM = r"(?:OHD|VC|[NSEW]+(?:-[NSEW]+)*(?![NSEW]))"
+_LOC_WORD = r"(?:%s)+" % _LOC_ITEM
+_LOC_DSNT = r"(?:%s)*DSNT" % _LOC_ITEM
+_LOC = r"""(?:(?:\sAND|%(dsnt)s|%(word)s\s+AND)
+              (?:\s+%(dsnt)s|\s+%(word)s\s+AND|\s\s+AND)*
+              (?:\s+%(word)s|\s+(?=\s))
+           |%(word)s)""" % {
+    "word": _LOC_WORD,
+    "dsnt": _LOC_DSNT,
+}
 
-LIGHTNING_RE = re.compile(
-    r"""^((?P<freq>OCNL|FRQ|CONS)\s+)?
+_LIGHTNING_RE = _LazyPattern(
+    r"""((?P<freq>OCNL|FRQ|CONS)\s+)?
         LTG(?P<type>(IC|CC|CG|CA)*)
-        ( \s+(?P<loc>( OHD | VC | DSNT\s+ | \s+AND\s+ |
-        [NSEW][EW]? (-[NSEW][EW]?)* )+) )?\s+""",
+        ( \s+(?P<loc>%s) )?\s+"""
+    % _LOC,
     re.VERBOSE,
 )
 
-TS_LOC_RE = re.compile(
-    r"""TS(\s+(?P<loc>( OHD | VC | DSNT\s+ | \s+AND\s+ |
-        [NSEW][EW]? (-[NSEW][EW]?)* )+))?
-        ( \s+MOV\s+(?P<dir>[NSEW][EW]?) )?\s+""",
+_TS_LOC_RE = _LazyPattern(
+    r"""TS(\s+(?P<loc>%s))?
+        ( \s+MOV\s+(?P<dir>[NSEW][EW]?) )?\s+"""
+    % _LOC,
     re.VERBOSE,
 )
-SNOWDEPTH_RE = re.compile(r"""^4/(?P<snowdepth>\d\d\d)\s+""")
-ICE_ACCRETION_RE = re.compile(
-    r"^I(?P<ice_accretion_hours>[136])(?P<ice_accretion_depth>\d\d\d)\s+"
+_SNOWDEPTH_RE = _LazyPattern(r"""4/(?P<snowdepth>\d\d\d)\s+""")
+_ICE_ACCRETION_RE = _LazyPattern(
+    r"I(?P<ice_accretion_hours>[136])(?P<ice_accretion_depth>\d\d\d)\s+"
 )
 
+_PUBLIC_PATTERNS = frozenset(
+    (
+        "MISSING_RE",
+        "TYPE_RE",
+        "COR_RE",
+        "STATION_RE",
+        "TIME_RE",
+        "MODIFIER_RE",
+        "WIND_RE",
+        "VISIBILITY_RE",
+        "RUNWAY_RE",
+        "WEATHER_RE",
+        "SKY_RE",
+        "TEMP_RE",
+        "PRESS_RE",
+        "RECENT_RE",
+        "WINDSHEAR_RE",
+        "COLOR_RE",
+        "RUNWAYSTATE_RE",
+        "TREND_RE",
+        "TRENDTIME_RE",
+        "REMARK_RE",
+        "AUTO_RE",
+        "SEALVL_PRESS_RE",
+        "PEAK_WIND_RE",
+        "WIND_SHIFT_RE",
+        "PRECIP_1HR_RE",
+        "PRECIP_24HR_RE",
+        "PRESS_3HR_RE",
+        "TEMP_1HR_RE",
+        "TEMP_6HR_RE",
+        "TEMP_24HR_RE",
+        "UNPARSED_RE",
+        "LIGHTNING_RE",
+        "TS_LOC_RE",
+        "SNOWDEPTH_RE",
+        "ICE_ACCRETION_RE",
+        "HEADER_RE",
+    )
+)
+# public patterns that have never been anchored at the start of the string
+_UNANCHORED_PATTERNS = frozenset(
+    ("RUNWAYSTATE_RE", "TRENDTIME_RE", "UNPARSED_RE", "TS_LOC_RE")
+)
+
+
+def _public_pattern(name):
+    """
+    Compile the public pattern of the given name, from the parser's copy, and
+    keep it as a module attribute.
+    """
+    pattern = globals()["_" + name]
+    source = pattern.pattern
+    if name not in _UNANCHORED_PATTERNS and not source.startswith("^"):
+        source = "^" + source
+    compiled = globals()[name] = re.compile(source, pattern.flags)
+    return compiled
+
 
 # translation of weather location codes
 loc_terms = [("OHD", "overhead"), ("DSNT", "distant"), ("AND", "and"), ("VC", "nearby")]
@@ -330,6 +477,47 @@ def _sanitize(code):
     return "%s " % (code.strip().rstrip("="),)
 
 
+@functools.lru_cache(maxsize=4096)
+def _resolve_time(day, hour, minute, month, year, ref_year, ref_month, ref_day):
+    """
+    Resolve the observation time of a report relative to a reference date.
+
+    If the month or year aren't given, they are taken from the reference
+    date, rolling back to the previous month (or year) when the day of the
+    report is later than the reference day.  Returns the observation time,
+    month and year.
+    """
+    if not month:
+        month = ref_month
+        if day > ref_day:
+            if month == 1:
+                month = 12
+            else:
+                month = month - 1
+    if not year:
+        year = ref_year
+        if month > ref_month:
+            year = year - 1
+        elif month == ref_month and day > ref_day:
+            year = year - 1
+    return datetime.datetime(year, month, day, hour, minute), month, year
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_remark_time(time, hour, minute):
+    """
+    Resolve the time of a remark (e.g., a peak wind or wind shift) given as
+    hour and minute, which must not be later than the observation time.
+    """
+    remark_time = time.replace(hour=hour, minute=minute)
+    if remark_time > time:
+        if hour > time.hour:
+            remark_time -= datetime.timedelta(hours=24)
+        else:
+            remark_time -= datetime.timedelta(hours=1)
+    return remark_time
+
+
 def _report_match(handler, match):
     """Report success or failure of the given handler function. (DEBUG)"""
     if match:
@@ -345,14 +533,355 @@ def _unparsedGroup(self, d):
     self._unparsed_groups.append(d["group"])
 
 
+_UNPARSED_GROUP = (_UNPARSED_RE, _unparsedGroup)
+
+_GROUP_RE = _LazyPattern(r"\S+")
+
+
+def _truncate_length(code, max_length):
+    """
+    Return the length of the part of the (sanitized) code made up of the
+    groups that lie entirely within its first max_length characters.
+    """
+    head = code[: max_length + 1]
+    if head[-1:].isspace():
+        return len(head)
+    parts = head.rsplit(None, 1)
+    if len(parts) < 2:
+        return 0
+    return len(head) - len(parts[1])
+
+
+def _truncate_groups(code, max_groups):
+    """
+    Return the length of the part of the code made up of its first max_groups
+    groups, or None if the code doesn't have more groups than that.
+    """
+    m = next(itertools.islice(_GROUP_RE.finditer(code), max_groups, None), None)
+    if m is None:
+        return None
+    return m.start()
+
+
+_GROUP_NAME_RE = _LazyPattern(r"\(\?P<\w+>")
+
+
+def _recovery_pattern(handlers, start):
+    """
+    Return a single pattern that matches wherever any of the handler patterns
+    from handlers[start:] would match.
+
+    After an unparsed group, the parser uses this to skip over further
+    unparseable groups with one match attempt each, instead of retrying every
+    remaining handler on every group.
+    """
+    return _compile_recovery(
+        tuple((entry[0].pattern, entry[0].flags) for entry in handlers[start:])
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_recovery(patterns):
+    """
+    Compile the recovery pattern of a sequence of (source, flags) pairs.  It
+    is cached on the sources, so that tables that wrap the same patterns
+    (such as those of ParserStats) share it.
+    """
+    sources = []
+    for pattern, flags in patterns:
+        source = _GROUP_NAME_RE.sub("(?:", pattern)
+        if flags & re.VERBOSE:
+            source = "(?x:%s)" % source
+        else:
+            source = "(?:%s)" % source
+        if source not in sources:
+            sources.append(source)
+    return re.compile("|".join(sources))
+
+
+# Header-only scanning.  The header is the part of the report decoded by the
+# first entries of the handler table; scanning it doesn't construct a Metar
+# object or any Datatypes objects.
+
+
+class Header(namedtuple("Header", "type correction station_id day hour minute mod")):
+    """
+    The header groups of a METAR report, as returned by scan_header().
+
+    The fields have the same values as the matching attributes of a Metar
+    object; the day, hour and minute of the observation time are integers,
+    or None if the time group is missing.
+    """
+
+    __slots__ = ()
+
+
+def _optional_sequence(*patterns):
+    """
+    Return a single pattern that matches each of the given patterns in turn,
+    where it matches, just as a series of separate attempts would.
+    """
+    sources = []
+    for pattern in patterns:
+        if pattern.flags & re.VERBOSE:
+            sources.append("(?x:%s)?" % pattern.pattern)
+        else:
+            sources.append("(?:%s)?" % pattern.pattern)
+    return _LazyPattern("".join(sources))
+
+
+_HEADER_RE = _optional_sequence(_TYPE_RE, _COR_RE, _STATION_RE, _TIME_RE, _MODIFIER_RE)
+
+
+def scan_header(metarcode):
+    """
+    Return the Header of a METAR report, without decoding the rest of it.
+
+    The header groups are matched in order from the start of the report, as
+    by the parser, and any that are missing get the default values of a
+    Metar object.  A header that only follows unparseable groups isn't
+    found.
+    """
+    m = _HEADER_RE.match(_sanitize(metarcode))
+    day = hour = minute = None
+    if m.group("day") is not None:
+        day = int(m.group("day"))
+        hour = int(m.group("hour"))
+        minute = int(m.group("min"))
+    mod = m.group("mod")
+    if mod is None:
+        mod = "AUTO"
+    elif mod == "CORR":
+        mod = "COR"
+    elif mod == "NIL" or mod == "FINO":
+        mod = "NO DATA"
+    return Header(
+        m.group("type") or "METAR",
+        m.group("cor"),
+        m.group("station"),
+        day,
+        hour,
+        minute,
+        mod,
+    )
+
+
+# Rendering of the weather and sky condition groups.  The vocabulary is small
+# and very repetitive, so the phrases are cached and shared by all reports.
+
+
+@functools.lru_cache(maxsize=1024)
+def _weather_phrase(weather):
+    """Return a textual description of a single weather tuple."""
+    (inteni, desci, preci, obsci, otheri) = weather
+    text_parts = []
+    code_parts = []
+    if inteni:
+        code_parts.append(inteni)
+        text_parts.append(WEATHER_INT[inteni])
+    if desci:
+        code_parts.append(desci)
+        if desci != "SH" or not preci:
+            text_parts.append(WEATHER_DESC[desci[0:2]])
+            if len(desci) == 4:
+                text_parts.append(WEATHER_DESC[desci[2:]])
+    if preci:
+        code_parts.append(preci)
+        if len(preci) == 2:
+            precip_text = WEATHER_PREC[preci]
+        elif len(preci) == 4:
+            precip_text = WEATHER_PREC[preci[:2]] + " and "
+            precip_text += WEATHER_PREC[preci[2:]]
+        elif len(preci) == 6:
+            precip_text = WEATHER_PREC[preci[:2]] + ", "
+            precip_text += WEATHER_PREC[preci[2:4]] + " and "
+            precip_text += WEATHER_PREC[preci[4:]]
+        else:
+            precip_text = preci
+        if desci == "TS":
+            text_parts.append("with")
+        text_parts.append(precip_text)
+        if desci == "SH":
+            text_parts.append(WEATHER_DESC[desci])
+    if obsci:
+        code_parts.append(obsci)
+        text_parts.append(WEATHER_OBSC[obsci])
+
+    if otheri:
+        code_parts.append(otheri)
+        text_parts.append(WEATHER_OTHER[otheri])
+    code = " ".join(code_parts)
+    if code in WEATHER_SPECIAL:
+        return WEATHER_SPECIAL[code]
+    return " ".join(text_parts)
+
+
+class _DistanceKey(object):
+    """Hashable stand-in for a distance, used as a key of the phrase cache."""
+
+    __slots__ = ("distance", "_key")
+
+    def __init__(self, distance):
+        self.distance = distance
+        self._key = (
+            distance._value,
+            distance._units,
+            distance._gtlt,
+            distance._num,
+            distance._den,
+        )
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __eq__(self, other):
+        return self._key == other._key
+
+    def __str__(self):
+        return str(self.distance)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sky_phrase(cover, height, cloud):
+    """Return a textual description of a single sky condition."""
+    if cover in ["SKC", "CLR", "NSC"]:
+        return SKY_COVER[cover]
+    if cloud:
+        what = CLOUD_TYPE.get(cloud, "unknown CLOUD_TYPE of %s" % (cloud,))
+    elif SKY_COVER[cover].endswith(" "):
+        what = "clouds"
+    else:
+        what = ""
+    label = "%s %s" % (SKY_COVER[cover], what)
+    # HACK here to account for 'empty' entries with above format
+    label = " ".join(label.strip().split())
+    if cover == "VV":
+        label += ", vertical visibility to %s" % (str(height),)
+    else:
+        label += " at %s" % (str(height),)
+    return label
+
+
+# the renderer used by Metar.string()
+_DEFAULT_RENDERER = Renderer()
+
 # METAR report objects
+
+
+class _ListField(object):
+    """
+    A list attribute of a report, created the first time it's read, so that
+    a report doesn't allocate the lists of the groups it doesn't contain.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = []
+        return value
+
+
+def _reference_time(now):
+    """
+    Return a reference time as a naive UTC datetime (by default, the current
+    time).
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    if now.tzinfo is not None:
+        now = now.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return now
+
+
+# log each attempted match while parsing (read once at the start of a parse)
 debug = False
 
 
 class Metar(object):
-    """METAR (aviation meteorology report)"""
+    """
+    METAR (aviation meteorology report)
+
+    Metar objects can be created concurrently in several threads.  A
+    ParserStats object passed to the constructor mustn't be shared between
+    threads; give each thread its own, and merge them afterwards.
 
-    def __init__(self, metarcode, month=None, year=None, strict=True):
+    The decoded fields have class-level defaults, which a report overrides
+    only for the groups that it contains, and its lists are created when
+    they are first used.  So vars(report) (or report.__dict__) doesn't hold
+    every field, only those that were set; read the fields with getattr()
+    to serialize a report.
+    """
+
+    type = "METAR"  # METAR (routine) or SPECI (special)
+    correction = None  # COR (corrected - WMO spec)
+    mod = "AUTO"  # AUTO (automatic) or COR (corrected - US spec)
+    station_id = None  # 4-character ICAO station code
+    time = None  # observation time [datetime]
+    cycle = None  # observation cycle (0-23) [int]
+    wind_dir = None  # wind direction [direction]
+    wind_speed = None  # wind speed [speed]
+    wind_gust = None  # wind gust speed [speed]
+    wind_dir_from = None  # beginning of range for win dir [direction]
+    wind_dir_to = None  # end of range for wind dir [direction]
+    vis = None  # visibility [distance]
+    vis_dir = None  # visibility direction [direction]
+    max_vis = None  # visibility [distance]
+    max_vis_dir = None  # visibility direction [direction]
+    temp = None  # temperature (C) [temperature]
+    dewpt = None  # dew point (C) [temperature]
+    press = None  # barometric pressure [pressure]
+    runway = _ListField()  # runway visibility (list of tuples)
+    weather = _ListField()  # present weather (list of tuples)
+    recent = _ListField()  # recent weather (list of tuples)
+    sky = _ListField()  # sky conditions (list of tuples)
+    windshear = _ListField()  # runways w/ wind shear (list of strings)
+    wind_speed_peak = None  # peak wind speed in last hour
+    wind_dir_peak = None  # direction of peak wind speed in last hour
+    peak_wind_time = None  # time of peak wind observation [datetime]
+    wind_shift_time = None  # time of wind shift [datetime]
+    max_temp_6hr = None  # max temp in last 6 hours
+    min_temp_6hr = None  # min temp in last 6 hours
+    max_temp_24hr = None  # max temp in last 24 hours
+    min_temp_24hr = None  # min temp in last 24 hours
+    press_sea_level = None  # sea-level pressure
+    press_3hr = None  # pressure change over the last 3 hours [pressure]
+    press_tendency = None  # characteristic of the pressure tendency (0-8)
+    precip_1hr = None  # precipitation over the last hour
+    precip_3hr = None  # precipitation over the last 3 hours
+    precip_6hr = None  # precipitation over the last 6 hours
+    precip_24hr = None  # precipitation over the last 24 hours
+    snowdepth = None  # snow depth (distance)
+    ice_accretion_1hr = None  # ice accretion over the past hour
+    ice_accretion_3hr = None  # ice accretion over the past 3 hours
+    ice_accretion_6hr = None  # ice accretion over the past 6 hours
+    _trend = False  # trend groups present (bool)
+    _trend_groups = _ListField()  # trend forecast groups
+    _remarks = _ListField()  # remarks (list of strings)
+    _unparsed_groups = _ListField()
+    _unparsed_remarks = _ListField()
+    diagnostics = _ListField()  # problems found (if diagnostics is True)
+    dialect = None  # dialect used to parse the report [Dialect]
+    _month = None  # month of the report, if known
+    _year = None  # year of the report, if known
+
+    def __init__(
+        self,
+        metarcode,
+        month=None,
+        year=None,
+        strict=True,
+        now=None,
+        stats=None,
+        diagnostics=False,
+        max_length=None,
+        max_groups=None,
+        time_budget=None,
+        dialect=None,
+        cache=None,
+    ):
         """
         Parse raw METAR code.
 
@@ -367,126 +896,271 @@ class Metar(object):
           unparsable groups are found or an unexpected exception is encountered.
           Setting this to `False` will prevent exceptions from being raised and
           only generate warning messages.
-        """
+        now : datetime, optional
+          Reference time (UTC) used to guess the month and year of the report
+          when they are not provided.  Defaults to the current time.  Passing
+          a fixed value makes the decoding of archived reports reproducible.
+        stats : metar.Stats.ParserStats, optional
+          Collect per-handler attempt, match and timing counts for this report.
+        diagnostics : bool (default is False)
+          Record the problems found while parsing in the ``diagnostics``
+          attribute, as metar.Diagnostics.Diagnostic objects, instead of
+          raising a ``ParserError`` or generating warning messages.
+        max_length, max_groups : int, optional
+          Limits on the length (in characters) and on the number of groups
+          of the report.  A report that exceeds them is rejected with a
+          ``ParserError`` before it is parsed, or, if strict is False, is
+          truncated to the groups that lie within the limits.
+        time_budget : float, optional
+          Maximum time (in seconds) to spend parsing the report.  When it is
+          exceeded, parsing stops at the current group, and a ``ParserError``
+          is raised if strict is True.
+        dialect : str or Dialect, optional
+          Parse the report with the reduced handler tables of a regional
+          dialect: "US", "WMO" (or "ICAO"), "MIL", or "auto" to choose one
+          from the station id with station_dialect() (which lists the
+          groups that are then given up).  By default, all of the groups
+          are tried.  Reports that only contain groups of the dialect are
+          decoded as with the full tables.
+        cache : metar.Cache.GroupCache, optional
+          Reuse the decoded values of the groups that have been seen before.
+        """
+
+        self._parse(
+            metarcode,
+            month,
+            year,
+            strict,
+            _reference_time(now),
+            stats,
+            diagnostics,
+            max_length,
+            max_groups,
+            time_budget,
+            dialect,
+            cache,
+        )
 
+    def _parse(
+        self,
+        metarcode,
+        month,
+        year,
+        strict,
+        now,
+        stats,
+        diagnostics,
+        max_length,
+        max_groups,
+        time_budget,
+        dialect,
+        cache,
+    ):
+        """
+        Parse raw METAR code into this object, with the options of the
+        constructor.  The reference time must already be a naive UTC
+        datetime.
+        """
         self.code = metarcode  # original METAR code
-        self.type = "METAR"  # METAR (routine) or SPECI (special)
-        self.correction = None  # COR (corrected - WMO spec)
-        self.mod = "AUTO"  # AUTO (automatic) or COR (corrected - US spec)
-        self.station_id = None  # 4-character ICAO station code
-        self.time = None  # observation time [datetime]
-        self.cycle = None  # observation cycle (0-23) [int]
-        self.wind_dir = None  # wind direction [direction]
-        self.wind_speed = None  # wind speed [speed]
-        self.wind_gust = None  # wind gust speed [speed]
-        self.wind_dir_from = None  # beginning of range for win dir [direction]
-        self.wind_dir_to = None  # end of range for wind dir [direction]
-        self.vis = None  # visibility [distance]
-        self.vis_dir = None  # visibility direction [direction]
-        self.max_vis = None  # visibility [distance]
-        self.max_vis_dir = None  # visibility direction [direction]
-        self.temp = None  # temperature (C) [temperature]
-        self.dewpt = None  # dew point (C) [temperature]
-        self.press = None  # barometric pressure [pressure]
-        self.runway = []  # runway visibility (list of tuples)
-        self.weather = []  # present weather (list of tuples)
-        self.recent = []  # recent weather (list of tuples)
-        self.sky = []  # sky conditions (list of tuples)
-        self.windshear = []  # runways w/ wind shear (list of strings)
-        self.wind_speed_peak = None  # peak wind speed in last hour
-        self.wind_dir_peak = None  # direction of peak wind speed in last hour
-        self.peak_wind_time = None  # time of peak wind observation [datetime]
-        self.wind_shift_time = None  # time of wind shift [datetime]
-        self.max_temp_6hr = None  # max temp in last 6 hours
-        self.min_temp_6hr = None  # min temp in last 6 hours
-        self.max_temp_24hr = None  # max temp in last 24 hours
-        self.min_temp_24hr = None  # min temp in last 24 hours
-        self.press_sea_level = None  # sea-level pressure
-        self.precip_1hr = None  # precipitation over the last hour
-        self.precip_3hr = None  # precipitation over the last 3 hours
-        self.precip_6hr = None  # precipitation over the last 6 hours
-        self.precip_24hr = None  # precipitation over the last 24 hours
-        self.snowdepth = None  # snow depth (distance)
-        self.ice_accretion_1hr = None  # ice accretion over the past hour
-        self.ice_accretion_3hr = None  # ice accretion over the past 3 hours
-        self.ice_accretion_6hr = None  # ice accretion over the past 6 hours
-        self._trend = False  # trend groups present (bool)
-        self._trend_groups = []  # trend forecast groups
-        self._remarks = []  # remarks (list of strings)
-        self._unparsed_groups = []
-        self._unparsed_remarks = []
-
-        self._now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-
-        self._month = month
-        self._year = year
-
-        # Do some string prep before parsing
-        code = _sanitize(self.code)
+        self._now = now
+        if month is not None:
+            self._month = month
+        if year is not None:
+            self._year = year
+
+        # The parser reads no shared mutable state: the handler tables are
+        # tuples, and the module's debug flag is read once, so that reports
+        # can be parsed concurrently in several threads.
+        trace = debug
+        code = _sanitize(metarcode)
+        dialect = _dialect(dialect, code)
+        if dialect is None:
+            handlers = self.handlers
+            trend_handlers = self.trend_handlers
+            remark_handlers = self.remark_handlers
+        else:
+            self.dialect = dialect
+            handlers = dialect.handlers
+            trend_handlers = dialect.trend_handlers
+            remark_handlers = dialect.remark_handlers
+        unparsed = _UNPARSED_GROUP
+        if stats is not None:
+            handlers, trend_handlers, remark_handlers, unparsed = stats.instrument(
+                handlers, trend_handlers, remark_handlers, unparsed
+            )
+
+        # Do some string prep before parsing.  The groups are matched in
+        # place, at successive positions of the code, so the cost of parsing
+        # grows linearly with the length of the report.  Each group is tried
+        # against at most one pass through the handler table (plus the trend
+        # handlers and the catch-all handler for unparsed groups) before it
+        # is consumed; after an unparsed group, any further groups that no
+        # remaining handler can match are skipped with a single attempt each.
+        pos = 0
+        end = len(code)
+        if diagnostics:
+            # offsets are reported relative to the original code
+            lead = len(metarcode) - len(metarcode.lstrip())
+            problems = self.diagnostics
+            unparsed_remark = remark_handlers[-1][0]
+
+        # Apply the limits on the size of the report by truncating it to a
+        # whole number of groups, before any parsing is done.
+        limit = None
+        if max_length is not None and end - 1 > max_length:
+            limit = "max_length"
+            end = _truncate_length(code, max_length)
+        if max_groups is not None:
+            cut = _truncate_groups(code[:end], max_groups)
+            if cut is not None:
+                limit = "max_groups"
+                end = cut
+        if limit is not None:
+            if diagnostics:
+                problems.append(
+                    Diagnostic(LIMIT_EXCEEDED, None, lead + end, limit, None)
+                )
+            else:
+                message = "Report exceeds %s limit after '%s'" % (limit, code[:end])
+                if strict:
+                    raise ParserError(message)
+                warnings.warn(message, RuntimeWarning)
+            code = code[:end]
+        deadline = None
+        if time_budget is not None:
+            deadline = perf_counter() + time_budget
+
         try:
-            ngroup = len(self.handlers)
+            ngroup = len(handlers)
             igroup = 0
             ifailed = -1
-            while igroup < ngroup and code:
-                pattern, handler, repeatable = self.handlers[igroup]
-                if debug:
-                    _logger.debug("%s: %s", handler.__name__, code)
-                m = pattern.match(code)
+            while igroup < ngroup and pos < end:
+                pattern, handler, repeatable = handlers[igroup]
+                if trace:
+                    _logger.debug("%s: %s", handler.__name__, code[pos:])
+                m = pattern.match(code, pos)
                 while m:
                     ifailed = -1
-                    if debug:
+                    if trace:
                         _report_match(handler, m.group())
-                    handler(self, m.groupdict())
-                    code = code[m.end():]
+                    if cache is None:
+                        handler(self, m.groupdict())
+                    else:
+                        cache.apply(self, handler, m)
+                    pos = m.end()
+                    if deadline is not None and perf_counter() > deadline:
+                        raise _TimeBudgetExceeded()
                     if self._trend:
-                        code = self._do_trend_handlers(code)
+                        pos = self._do_trend_handlers(code, trend_handlers, pos, trace)
                     if not repeatable:
                         break
 
-                    if debug:
-                        _logger.debug("%s: %s", handler.__name__, code)
-                    m = pattern.match(code)
+                    if trace:
+                        _logger.debug("%s: %s", handler.__name__, code[pos:])
+                    m = pattern.match(code, pos)
                 if not m and ifailed < 0:
                     ifailed = igroup
                 igroup += 1
                 if igroup == ngroup and not m:
-                    pattern, handler = (UNPARSED_RE, _unparsedGroup)
-                    if debug:
-                        _logger.debug("%s: %s", handler.__name__, code)
-                    m = pattern.match(code)
-                    if debug:
+                    pattern, handler = unparsed
+                    if trace:
+                        _logger.debug("%s: %s", handler.__name__, code[pos:])
+                    m = pattern.match(code, pos)
+                    if trace:
                         _report_match(handler, m.group())
                     handler(self, m.groupdict())
-                    code = code[m.end():]
+                    if diagnostics:
+                        expected = handlers[ifailed][1].__name__
+                        problems.append(
+                            Diagnostic(
+                                UNPARSED_GROUP, expected, lead + pos, m.group(1), None
+                            )
+                        )
+                    pos = m.end()
+                    if deadline is not None and perf_counter() > deadline:
+                        raise _TimeBudgetExceeded()
                     igroup = ifailed
                     ifailed = -2  # if it's still -2 when we run out of main-body
                     #  groups, we'll try parsing this group as a remark
-            if pattern == REMARK_RE or self.press:
-                while code:
-                    for pattern, handler in self.remark_handlers:
-                        if debug:
-                            _logger.debug("%s: %s", handler.__name__, code)
-                        m = pattern.match(code)
-                        if m:
-                            if debug:
-                                _report_match(handler, m.group())
+                    recovery = _recovery_pattern(handlers, igroup)
+                    while pos < end and not recovery.match(code, pos):
+                        m = pattern.match(code, pos)
+                        if trace:
+                            _report_match(handler, m.group())
+                        handler(self, m.groupdict())
+                        if diagnostics:
+                            problems.append(
+                                Diagnostic(
+                                    UNPARSED_GROUP,
+                                    expected,
+                                    lead + pos,
+                                    m.group(1),
+                                    None,
+                                )
+                            )
+                        pos = m.end()
+                        if deadline is not None and perf_counter() > deadline:
+                            raise _TimeBudgetExceeded()
+            # the body loop only stops early once the remarks are reached
+            while pos < end:
+                for pattern, handler in remark_handlers:
+                    if trace:
+                        _logger.debug("%s: %s", handler.__name__, code[pos:])
+                    m = pattern.match(code, pos)
+                    if m:
+                        if trace:
+                            _report_match(handler, m.group())
+                        if cache is None:
                             handler(self, m.groupdict())
-                            code = pattern.sub("", code, 1)
-                            break
+                        else:
+                            cache.apply(self, handler, m)
+                        if diagnostics and pattern is unparsed_remark:
+                            problems.append(
+                                Diagnostic(
+                                    UNPARSED_REMARK, None, lead + pos, m.group(1), None
+                                )
+                            )
+                        pos = m.end()
+                        break
+                if deadline is not None and perf_counter() > deadline:
+                    raise _TimeBudgetExceeded()
 
-        except Exception as err:
-            message = ("%s failed while processing '%s'\n\t%s") % (
-                handler.__name__,
-                code,
-                "\n\t".join(err.args),
-            )
-            if strict:
-                raise ParserError(message)
+        except _TimeBudgetExceeded:
+            if diagnostics:
+                problems.append(
+                    Diagnostic(LIMIT_EXCEEDED, None, lead + pos, "time_budget", None)
+                )
             else:
+                message = "Time budget exceeded while processing '%s'" % (code[pos:],)
+                if strict:
+                    raise ParserError(message)
                 warnings.warn(message, RuntimeWarning)
+        except Exception as err:
+            if diagnostics:
+                problems.append(
+                    Diagnostic(
+                        HANDLER_ERROR,
+                        handler.__name__,
+                        lead + pos,
+                        m.group() if m else None,
+                        err,
+                    )
+                )
+            else:
+                message = ("%s failed while processing '%s'\n\t%s") % (
+                    handler.__name__,
+                    code[pos:],
+                    "\n\t".join(err.args),
+                )
+                if strict:
+                    raise ParserError(message)
+                else:
+                    warnings.warn(message, RuntimeWarning)
 
-        if self._unparsed_groups:
-            code = " ".join(self._unparsed_groups)
+        # read from the instance, so that the list isn't created when empty
+        unparsed_groups = self.__dict__.get("_unparsed_groups")
+        if unparsed_groups and not diagnostics:
+            code = " ".join(unparsed_groups)
             message = "Unparsed groups in body '%s' while processing '%s'" % (
                 code,
                 metarcode,
@@ -503,21 +1177,30 @@ class Metar(object):
         """
         return not self._unparsed_groups
 
-    def _do_trend_handlers(self, code):
-        for pattern, handler, repeatable in self.trend_handlers:
-            if debug:
-                print(handler.__name__, ":", code)
-            m = pattern.match(code)
+    def _do_trend_handlers(self, code, trend_handlers=None, pos=0, trace=None):
+        """
+        Parse any trend groups found at the given position of the code.
+
+        Returns the position following the last trend group.
+        """
+        if trend_handlers is None:
+            trend_handlers = self.trend_handlers
+        if trace is None:
+            trace = debug
+        for pattern, handler, repeatable in trend_handlers:
+            if trace:
+                _logger.debug("%s: %s", handler.__name__, code[pos:])
+            m = pattern.match(code, pos)
             while m:
-                if debug:
+                if trace:
                     _report_match(handler, m.group())
                 self._trend_groups.append(m.group().strip())
                 handler(self, m.groupdict())
-                code = code[m.end():]
+                pos = m.end()
                 if not repeatable:
                     break
-                m = pattern.match(code)
-        return code
+                m = pattern.match(code, pos)
+        return pos
 
     def __str__(self):
         return self.string()
@@ -575,23 +1258,18 @@ class Metar(object):
             _min   [int]
         """
         self._day = int(d["day"])
-        if not self._month:
-            self._month = self._now.month
-            if self._day > self._now.day:
-                if self._month == 1:
-                    self._month = 12
-                else:
-                    self._month = self._month - 1
-        if not self._year:
-            self._year = self._now.year
-            if self._month > self._now.month:
-                self._year = self._year - 1
-            elif self._month == self._now.month and self._day > self._now.day:
-                self._year = self._year - 1
         self._hour = int(d["hour"])
         self._min = int(d["min"])
-        self.time = datetime.datetime(
-            self._year, self._month, self._day, self._hour, self._min
+        now = self._now
+        self.time, self._month, self._year = _resolve_time(
+            self._day,
+            self._hour,
+            self._min,
+            self._month,
+            self._year,
+            now.year,
+            now.month,
+            now.day,
         )
         if self._min < 45:
             self.cycle = self._hour
@@ -626,13 +1304,13 @@ class Metar(object):
             units = "KT"
         if wind_speed.startswith("P"):
             self.wind_speed = speed(wind_speed[1:], units, ">")
-        elif not MISSING_RE.match(wind_speed):
+        elif not _MISSING_RE.match(wind_speed):
             self.wind_speed = speed(wind_speed, units)
         if d["gust"]:
             wind_gust = d["gust"]
             if wind_gust.startswith("P"):
                 self.wind_gust = speed(wind_gust[1:], units, ">")
-            elif not MISSING_RE.match(wind_gust):
+            elif not _MISSING_RE.match(wind_gust):
                 self.wind_gust = speed(wind_gust, units)
         if d["varfrom"]:
             self.wind_dir_from = direction(d["varfrom"])
@@ -922,7 +1600,15 @@ class Metar(object):
         Parse a pressure-tendency remark group.
         """
         value = float(d["press"]) / 10.0
-        descrip = PRESSURE_TENDENCY[d["tend"]]
+        tendency = d["tend"]
+        descrip = PRESSURE_TENDENCY[tendency]
+        # the pressure is lower than 3 hours ago (or the same) if the
+        # characteristic is 5-8, and higher (or the same) otherwise
+        if tendency >= "5":
+            self.press_3hr = pressure(-value, "HPA")
+        else:
+            self.press_3hr = pressure(value, "HPA")
+        self.press_tendency = int(tendency)
         self._remarks.append("3-hr pressure change %.1fhPa, %s" % (value, descrip))
 
     def _handlePeakWindRemark(self, d):
@@ -938,14 +1624,7 @@ class Metar(object):
             peak_hour = int(d["hour"])
         else:
             peak_hour = self._hour
-        self.peak_wind_time = datetime.datetime(
-            self._year, self._month, self._day, peak_hour, peak_min
-        )
-        if self.peak_wind_time > self.time:
-            if peak_hour > self._hour:
-                self.peak_wind_time -= datetime.timedelta(hours=24)
-            else:
-                self.peak_wind_time -= datetime.timedelta(hours=1)
+        self.peak_wind_time = _resolve_remark_time(self.time, peak_hour, peak_min)
         self._remarks.append(
             "peak wind %dkt from %d degrees at %d:%02d"
             % (peak_speed, peak_dir, peak_hour, peak_min)
@@ -960,14 +1639,7 @@ class Metar(object):
         else:
             wshft_hour = self._hour
         wshft_min = int(d["min"])
-        self.wind_shift_time = datetime.datetime(
-            self._year, self._month, self._day, wshft_hour, wshft_min
-        )
-        if self.wind_shift_time > self.time:
-            if wshft_hour > self._hour:
-                self.wind_shift_time -= datetime.timedelta(hours=24)
-            else:
-                self.wind_shift_time -= datetime.timedelta(hours=1)
+        self.wind_shift_time = _resolve_remark_time(self.time, wshft_hour, wshft_min)
         text = "wind shift at %d:%02d" % (wshft_hour, wshft_min)
         if d["front"]:
             text += " (front)"
@@ -1035,59 +1707,59 @@ class Metar(object):
 
     # the list of handler functions to use (in order) to process a METAR report
 
-    handlers = [
-        (TYPE_RE, _handleType, False),
-        (COR_RE, _handleCorrection, False),
-        (STATION_RE, _handleStation, False),
-        (TIME_RE, _handleTime, False),
-        (MODIFIER_RE, _handleModifier, False),
-        (WIND_RE, _handleWind, False),
-        (VISIBILITY_RE, _handleVisibility, True),
-        (RUNWAY_RE, _handleRunway, True),
-        (WEATHER_RE, _handleWeather, True),
-        (SKY_RE, _handleSky, True),
-        (WIND_RE, _handleWind, False),
-        (VISIBILITY_RE, _handleVisibility, True),
-        (TEMP_RE, _handleTemp, False),
-        (PRESS_RE, _handlePressure, True),
-        (SEALVL_PRESS_RE, _handleSealvlPressRemark, False),
-        (RECENT_RE, _handleRecent, True),
-        (WINDSHEAR_RE, _handleWindShear, True),
-        (COLOR_RE, _handleColor, True),
-        (RUNWAYSTATE_RE, _handleRunwayState, True),
-        (TREND_RE, _handleTrend, True),
-        (REMARK_RE, _startRemarks, False),
-    ]
-
-    trend_handlers = [
-        (TRENDTIME_RE, _handleTrend, True),
-        (WIND_RE, _handleTrend, True),
-        (VISIBILITY_RE, _handleTrend, True),
-        (WEATHER_RE, _handleTrend, True),
-        (SKY_RE, _handleTrend, True),
-        (COLOR_RE, _handleTrend, True),
-    ]
+    handlers = (
+        (_TYPE_RE, _handleType, False),
+        (_COR_RE, _handleCorrection, False),
+        (_STATION_RE, _handleStation, False),
+        (_TIME_RE, _handleTime, False),
+        (_MODIFIER_RE, _handleModifier, False),
+        (_WIND_RE, _handleWind, False),
+        (_VISIBILITY_RE, _handleVisibility, True),
+        (_RUNWAY_RE, _handleRunway, True),
+        (_WEATHER_RE, _handleWeather, True),
+        (_SKY_RE, _handleSky, True),
+        (_WIND_RE, _handleWind, False),
+        (_VISIBILITY_RE, _handleVisibility, True),
+        (_TEMP_RE, _handleTemp, False),
+        (_PRESS_RE, _handlePressure, True),
+        (_SEALVL_PRESS_RE, _handleSealvlPressRemark, False),
+        (_RECENT_RE, _handleRecent, True),
+        (_WINDSHEAR_RE, _handleWindShear, True),
+        (_COLOR_RE, _handleColor, True),
+        (_RUNWAYSTATE_RE, _handleRunwayState, True),
+        (_TREND_RE, _handleTrend, True),
+        (_REMARK_RE, _startRemarks, False),
+    )
+
+    trend_handlers = (
+        (_TRENDTIME_RE, _handleTrend, True),
+        (_WIND_RE, _handleTrend, True),
+        (_VISIBILITY_RE, _handleTrend, True),
+        (_WEATHER_RE, _handleTrend, True),
+        (_SKY_RE, _handleTrend, True),
+        (_COLOR_RE, _handleTrend, True),
+    )
 
     # the list of patterns for the various remark groups,
     # paired with the handler functions to use to record the decoded remark.
 
-    remark_handlers = [
-        (AUTO_RE, _handleAutoRemark),
-        (SEALVL_PRESS_RE, _handleSealvlPressRemark),
-        (PEAK_WIND_RE, _handlePeakWindRemark),
-        (WIND_SHIFT_RE, _handleWindShiftRemark),
-        (LIGHTNING_RE, _handleLightningRemark),
-        (TS_LOC_RE, _handleTSLocRemark),
-        (TEMP_1HR_RE, _handleTemp1hrRemark),
-        (PRECIP_1HR_RE, _handlePrecip1hrRemark),
-        (PRECIP_24HR_RE, _handlePrecip24hrRemark),
-        (PRESS_3HR_RE, _handlePress3hrRemark),
-        (TEMP_6HR_RE, _handleTemp6hrRemark),
-        (TEMP_24HR_RE, _handleTemp24hrRemark),
-        (SNOWDEPTH_RE, _handleSnowDepthRemark),
-        (ICE_ACCRETION_RE, _handleIceAccretionRemark),
-        (UNPARSED_RE, _unparsedRemark),
-    ]
+    remark_handlers = (
+        (_AUTO_RE, _handleAutoRemark),
+        (_SEALVL_PRESS_RE, _handleSealvlPressRemark),
+        (_PEAK_WIND_RE, _handlePeakWindRemark),
+        (_WIND_SHIFT_RE, _handleWindShiftRemark),
+        (_LIGHTNING_RE, _handleLightningRemark),
+        (_TS_LOC_RE, _handleTSLocRemark),
+        (_TEMP_1HR_RE, _handleTemp1hrRemark),
+        (_PRECIP_1HR_RE, _handlePrecip1hrRemark),
+        (_PRECIP_24HR_RE, _handlePrecip24hrRemark),
+        (_PRESS_3HR_RE, _handlePress3hrRemark),
+        (_TEMP_6HR_RE, _handleTemp6hrRemark),
+        (_TEMP_24HR_RE, _handleTemp24hrRemark),
+        (_SNOWDEPTH_RE, _handleSnowDepthRemark),
+        (_ICE_ACCRETION_RE, _handleIceAccretionRemark),
+        (_UNPARSED_RE, _unparsedRemark),
+    )
 
     # functions that return text representations of conditions for output
 
@@ -1095,63 +1767,7 @@ class Metar(object):
         """
         Return a human-readable version of the decoded report.
         """
-        lines = []
-        lines.append("station: %s" % self.station_id)
-        if self.type:
-            lines.append("type: %s" % self.report_type())
-        if self.time:
-            lines.append("time: %s" % self.time.ctime())
-        if self.temp:
-            lines.append("temperature: %s" % self.temp.string("C"))
-        if self.dewpt:
-            lines.append("dew point: %s" % self.dewpt.string("C"))
-        if self.wind_speed:
-            lines.append("wind: %s" % self.wind())
-        if self.wind_speed_peak:
-            lines.append("peak wind: %s" % self.peak_wind())
-        if self.wind_shift_time:
-            lines.append("wind shift: %s" % self.wind_shift())
-        if self.vis:
-            lines.append("visibility: %s" % self.visibility())
-        if self.runway:
-            lines.append("visual range: %s" % self.runway_visual_range())
-        if self.press:
-            lines.append("pressure: %s" % self.press.string("hPa"))
-        if self.weather:
-            lines.append("weather: %s" % self.present_weather())
-        if self.sky:
-            lines.append("sky: %s" % self.sky_conditions("\n     "))
-        if self.press_sea_level:
-            lines.append("sea-level pressure: %s" % self.press_sea_level.string("hPa"))
-        if self.max_temp_6hr:
-            lines.append("6-hour max temp: %s" % str(self.max_temp_6hr))
-        if self.max_temp_6hr:
-            lines.append("6-hour min temp: %s" % str(self.min_temp_6hr))
-        if self.max_temp_24hr:
-            lines.append("24-hour max temp: %s" % str(self.max_temp_24hr))
-        if self.max_temp_24hr:
-            lines.append("24-hour min temp: %s" % str(self.min_temp_24hr))
-        if self.precip_1hr:
-            lines.append("1-hour precipitation: %s" % str(self.precip_1hr))
-        if self.precip_3hr:
-            lines.append("3-hour precipitation: %s" % str(self.precip_3hr))
-        if self.precip_6hr:
-            lines.append("6-hour precipitation: %s" % str(self.precip_6hr))
-        if self.precip_24hr:
-            lines.append("24-hour precipitation: %s" % str(self.precip_24hr))
-        if self.ice_accretion_1hr:
-            lines.append("1-hour Ice Accretion: %s" % str(self.ice_accretion_1hr))
-        if self.ice_accretion_3hr:
-            lines.append("3-hour Ice Accretion: %s" % str(self.ice_accretion_3hr))
-        if self.ice_accretion_6hr:
-            lines.append("6-hour Ice Accretion: %s" % str(self.ice_accretion_6hr))
-        if self._remarks:
-            lines.append("remarks:")
-            lines.append("- " + self.remarks("\n- "))
-        if self._unparsed_remarks:
-            lines.append("- " + " ".join(self._unparsed_remarks))
-        lines.append("METAR: " + self.code)
-        return "\n".join(lines)
+        return _DEFAULT_RENDERER.render(self)
 
     def report_type(self):
         """
@@ -1285,77 +1901,18 @@ class Metar(object):
         """
         Return a textual description of weather.
         """
-        text_list = []
-        for weatheri in weather:
-            (inteni, desci, preci, obsci, otheri) = weatheri
-            text_parts = []
-            code_parts = []
-            if inteni:
-                code_parts.append(inteni)
-                text_parts.append(WEATHER_INT[inteni])
-            if desci:
-                code_parts.append(desci)
-                if desci != "SH" or not preci:
-                    text_parts.append(WEATHER_DESC[desci[0:2]])
-                    if len(desci) == 4:
-                        text_parts.append(WEATHER_DESC[desci[2:]])
-            if preci:
-                code_parts.append(preci)
-                if len(preci) == 2:
-                    precip_text = WEATHER_PREC[preci]
-                elif len(preci) == 4:
-                    precip_text = WEATHER_PREC[preci[:2]] + " and "
-                    precip_text += WEATHER_PREC[preci[2:]]
-                elif len(preci) == 6:
-                    precip_text = WEATHER_PREC[preci[:2]] + ", "
-                    precip_text += WEATHER_PREC[preci[2:4]] + " and "
-                    precip_text += WEATHER_PREC[preci[4:]]
-                else:
-                    precip_text = preci
-                if desci == "TS":
-                    text_parts.append("with")
-                text_parts.append(precip_text)
-                if desci == "SH":
-                    text_parts.append(WEATHER_DESC[desci])
-            if obsci:
-                code_parts.append(obsci)
-                text_parts.append(WEATHER_OBSC[obsci])
-
-            if otheri:
-                code_parts.append(otheri)
-                text_parts.append(WEATHER_OTHER[otheri])
-            code = " ".join(code_parts)
-            if code in WEATHER_SPECIAL:
-                text_list.append(WEATHER_SPECIAL[code])
-            else:
-                text_list.append(" ".join(text_parts))
-        return "; ".join(text_list)
+        return "; ".join([_weather_phrase(weatheri) for weatheri in weather])
 
     def sky_conditions(self, sep="; "):
         """
         Return a textual description of the sky conditions.
         """
-        text_list = []
-        for skyi in self.sky:
-            (cover, height, cloud) = skyi
-            if cover in ["SKC", "CLR", "NSC"]:
-                text_list.append(SKY_COVER[cover])
-            else:
-                if cloud:
-                    what = CLOUD_TYPE.get(cloud, "unknown CLOUD_TYPE of %s" % (cloud,))
-                elif SKY_COVER[cover].endswith(" "):
-                    what = "clouds"
-                else:
-                    what = ""
-                label = "%s %s" % (SKY_COVER[cover], what)
-                # HACK here to account for 'empty' entries with above format
-                label = " ".join(label.strip().split())
-                if cover == "VV":
-                    label += ", vertical visibility to %s" % (str(height),)
-                else:
-                    label += " at %s" % (str(height),)
-                text_list.append(label)
-        return sep.join(text_list)
+        return sep.join(
+            [
+                _sky_phrase(cover, height and _DistanceKey(height), cloud)
+                for cover, height, cloud in self.sky
+            ]
+        )
 
     def trend(self):
         """
@@ -1368,3 +1925,191 @@ class Metar(object):
         Return the decoded remarks.
         """
         return sep.join(self._remarks)
+
+
+# Regional dialects.  Each one parses reports with handler tables reduced to
+# the groups that its reports may contain, so that no time is spent trying
+# the groups of other regions.  Reports that only contain groups of the
+# dialect are decoded exactly as with the full tables.
+
+
+class Dialect(object):
+    """A regional profile of METAR, with reduced handler tables."""
+
+    def __init__(self, name, excluded=(), trends=True, remarks=True):
+        """
+        Parameters
+        ----------
+        name : str
+        excluded : iterable of patterns, optional
+          Patterns of the groups, in the body and in trends, that don't
+          occur in reports of this dialect.
+        trends : bool (default is True)
+          Whether reports of this dialect have trend forecasts.
+        remarks : bool (default is True)
+          Whether the remarks are decoded with the US (FMH-1) remark groups.
+          If not, every remark is left unparsed.
+        """
+        self.name = name
+        excluded = frozenset(excluded)
+        if not trends:
+            excluded |= {_TREND_RE}
+        self.handlers = _prune(Metar.handlers, excluded)
+        self.trend_handlers = ()
+        if trends:
+            self.trend_handlers = _prune(Metar.trend_handlers, excluded)
+        self.remark_handlers = Metar.remark_handlers
+        if not remarks:
+            # the catch-all handler is always last
+            self.remark_handlers = Metar.remark_handlers[-1:]
+
+    def __repr__(self):
+        return "Dialect(%r)" % (self.name,)
+
+
+def _unanchored_source(pattern):
+    """Return the source of a pattern, without an anchor at the start."""
+    source = pattern.pattern
+    if source.startswith("^"):
+        return source[1:]
+    return source
+
+
+def _prune(table, excluded):
+    """
+    Return a handler table without the entries for the excluded patterns,
+    which may be the parser's own patterns or the public ones.
+    """
+    excluded = frozenset(_unanchored_source(pattern) for pattern in excluded)
+    return tuple(entry for entry in table if entry[0].pattern not in excluded)
+
+
+# groups of the WMO (ICAO Annex 3) code that aren't used in the US
+_WMO_GROUPS = (_RECENT_RE, _WINDSHEAR_RE, _RUNWAYSTATE_RE)
+
+DIALECTS = {
+    # US (FMH-1): no recent weather, wind shear, runway state, colour state
+    # or trend groups, and the US remark groups
+    "US": Dialect("US", _WMO_GROUPS + (_COLOR_RE,), trends=False),
+    # WMO (ICAO Annex 3): no sea-level pressure in the body, no colour
+    # state, and no US remark groups
+    "WMO": Dialect("WMO", (_SEALVL_PRESS_RE, _COLOR_RE), remarks=False),
+    # military aerodromes outside the US: WMO groups, the colour state, and
+    # the US remark groups (used by US military and other FMH-1 stations
+    # abroad)
+    "MIL": Dialect("MIL", (_SEALVL_PRESS_RE,)),
+}
+DIALECTS["ICAO"] = DIALECTS["WMO"]
+
+# ICAO prefixes of the stations that report in the US dialect
+US_PREFIXES = ("K", "PA", "PF", "PO", "PP", "PH", "PG", "PW", "PM", "PJ", "TJ", "TI")
+# prefixes of the stations that mix US and WMO groups, which are decoded with
+# the full tables
+MIXED_PREFIXES = ("C", "MM")
+
+
+def station_dialect(station_id):
+    """
+    Return the Dialect of the reports from a station, guessed from the prefix
+    of its id, or None if they need the full handler tables.
+
+    Stations outside North America get the MIL dialect, since the colour
+    state of a military aerodrome, or the use of US remarks, can't be told
+    from its id.  With the dialect chosen this way, the groups that are
+    given up are the recent weather, wind shear, runway state, colour state
+    and trend groups of US stations, and a sea-level pressure group in the
+    body of the reports of other stations (in the remarks, it's decoded).
+    """
+    if not station_id:
+        return None
+    if station_id.startswith(US_PREFIXES):
+        return DIALECTS["US"]
+    if station_id.startswith(MIXED_PREFIXES):
+        return None
+    return DIALECTS["MIL"]
+
+
+def _dialect(dialect, code):
+    """Return the Dialect selected by the dialect argument of a Metar."""
+    if dialect is None or isinstance(dialect, Dialect):
+        return dialect
+    if dialect == "auto":
+        return station_dialect(_HEADER_RE.match(code).group("station"))
+    if dialect not in DIALECTS:
+        raise ValueError("unrecognized dialect: '" + dialect + "'")
+    return DIALECTS[dialect]
+
+
+class MetarParser(object):
+    """
+    A reusable parser of METAR reports, which holds the options of the
+    Metar constructor.
+
+        >>> parser = MetarParser(strict=False, dialect="auto")
+        >>> obs = parser.parse("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987")
+        >>> obs.temp.value()
+        22.0
+
+    The options are checked, and a fixed reference time and a named dialect
+    are resolved, once rather than for each report.
+    """
+
+    def __init__(
+        self,
+        month=None,
+        year=None,
+        strict=True,
+        now=None,
+        stats=None,
+        diagnostics=False,
+        max_length=None,
+        max_groups=None,
+        time_budget=None,
+        dialect=None,
+        cache=None,
+    ):
+        """
+        Parameters
+        ----------
+        month, year, strict, stats, diagnostics, max_length, max_groups,
+        time_budget, dialect, cache
+          Options of the Metar constructor, applied to every report.
+        now : datetime, optional
+          Reference time (UTC) for every report.  By default, the current
+          time when each report is parsed.
+        """
+        if dialect is not None and dialect != "auto":
+            dialect = _dialect(dialect, None)
+        self.month = month
+        self.year = year
+        self.strict = strict
+        self.now = None if now is None else _reference_time(now)
+        self.stats = stats
+        self.diagnostics = diagnostics
+        self.max_length = max_length
+        self.max_groups = max_groups
+        self.time_budget = time_budget
+        self.dialect = dialect
+        self.cache = cache
+
+    def parse(self, metarcode):
+        """Parse raw METAR code, and return a Metar object."""
+        now = self.now
+        if now is None:
+            now = _reference_time(None)
+        report = Metar.__new__(Metar)
+        report._parse(
+            metarcode,
+            self.month,
+            self.year,
+            self.strict,
+            now,
+            self.stats,
+            self.diagnostics,
+            self.max_length,
+            self.max_groups,
+            self.time_budget,
+            self.dialect,
+            self.cache,
+        )
+        return report
@@ -1,7 +1,20 @@
 from datetime import datetime, timedelta
-from re import Match
-from typing import Callable, List, Literal, Optional, Tuple, Union
+from re import Match, Pattern
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from metar.Datatypes import distance as _distance
 from metar.Datatypes import (
     direction,
     distance,
@@ -10,15 +23,93 @@ from metar.Datatypes import (
     speed,
     temperature,
 )
+from metar.Cache import GroupCache
+from metar.Diagnostics import Diagnostic
+from metar.Render import Renderer
+from metar.Stats import ParserStats
+
+class _LazyPattern:
+    pattern: str
+    flags: int
+    _compiled: Optional[Pattern]
+    def __init__(self, pattern: str, flags: int = ...) -> None: ...
+    def _compile(self) -> Pattern: ...
+    def match(
+        self, string: str, pos: int = ..., endpos: int = ...
+    ) -> Optional[Match]: ...
+    def __getattr__(self, name: str) -> Any: ...
+
+def __getattr__(name: str) -> Any: ...
+
+_PUBLIC_PATTERNS: FrozenSet[str]
+_UNANCHORED_PATTERNS: FrozenSet[str]
 
+def _public_pattern(name: str) -> Pattern: ...
 def xlate_loc(loc: str) -> str: ...
 def _sanitize(code: str) -> str: ...
+def _resolve_time(
+    day: int,
+    hour: int,
+    minute: int,
+    month: Optional[int],
+    year: Optional[int],
+    ref_year: int,
+    ref_month: int,
+    ref_day: int,
+) -> Tuple[datetime, int, int]: ...
+def _resolve_remark_time(time: datetime, hour: int, minute: int) -> datetime: ...
 def _report_match(handler: Callable[[dict], None], match: Match) -> None: ...
 def _unparsedGroup(self: "Metar", d: dict) -> None: ...
 
+_UNPARSED_GROUP: Tuple[Pattern, Callable[["Metar", dict], None]]
+
+_GROUP_RE: _LazyPattern
+_DEFAULT_RENDERER: Renderer
+
+def _truncate_length(code: str, max_length: int) -> int: ...
+def _truncate_groups(code: str, max_groups: int) -> Optional[int]: ...
+def _weather_phrase(weather: Tuple[str, str, str, str, str]) -> str: ...
+
+class _DistanceKey:
+    distance: _distance
+    def __init__(self, distance: _distance) -> None: ...
+
+def _sky_phrase(
+    cover: str, height: Optional[_DistanceKey], cloud: Optional[str]
+) -> str: ...
+def _recovery_pattern(handlers: tuple, start: int) -> Pattern: ...
+def _compile_recovery(patterns: Tuple[Tuple[str, int], ...]) -> Pattern: ...
+
+class Header(NamedTuple):
+    type: str
+    correction: Optional[str]
+    station_id: Optional[str]
+    day: Optional[int]
+    hour: Optional[int]
+    minute: Optional[int]
+    mod: str
+
+_HEADER_RE: _LazyPattern
+
+def _optional_sequence(*patterns: _LazyPattern) -> _LazyPattern: ...
+def scan_header(metarcode: str) -> Header: ...
+
 class ParserError(Exception): ...
+class _TimeBudgetExceeded(Exception): ...
+
+class _ListField:
+    name: str
+    def __set_name__(self, owner: type, name: str) -> None: ...
+    def __get__(self, obj: Any, owner: Optional[type] = ...) -> Any: ...
+
+def _reference_time(now: Optional[datetime]) -> datetime: ...
+
+debug: bool
 
 class Metar:
+    handlers: Tuple[Tuple[Pattern, Callable[["Metar", dict], None], bool], ...]
+    trend_handlers: Tuple[Tuple[Pattern, Callable[["Metar", dict], None], bool], ...]
+    remark_handlers: Tuple[Tuple[Pattern, Callable[["Metar", dict], None]], ...]
     code: str
     type: Literal["METAR", "SPECI"]
     correction: Optional[str]
@@ -52,6 +143,8 @@ class Metar:
     max_temp_24hr: Optional[temperature]
     min_temp_24hr: Optional[temperature]
     press_sea_level: Optional[pressure]
+    press_3hr: Optional[pressure]
+    press_tendency: Optional[int]
     precip_1hr: Optional[precipitation]
     precip_3hr: Optional[precipitation]
     precip_6hr: Optional[precipitation]
@@ -65,9 +158,11 @@ class Metar:
     _remarks: List[str]
     _unparsed_groups: List[str]
     _unparsed_remarks: List[str]
+    diagnostics: List[Diagnostic]
+    dialect: Optional["Dialect"]
     _now: datetime
-    month: int
-    year: int
+    _month: Optional[int]
+    _year: Optional[int]
 
     def __init__(
         self,
@@ -75,10 +170,39 @@ class Metar:
         month: Optional[int] = ...,
         year: Optional[int] = ...,
         strict: bool = ...,
+        now: Optional[datetime] = ...,
+        stats: Optional[ParserStats] = ...,
+        diagnostics: bool = ...,
+        max_length: Optional[int] = ...,
+        max_groups: Optional[int] = ...,
+        time_budget: Optional[float] = ...,
+        dialect: Union[str, "Dialect", None] = ...,
+        cache: Optional[GroupCache] = ...,
     ): ...
+    def _parse(
+        self,
+        metarcode: str,
+        month: Optional[int],
+        year: Optional[int],
+        strict: bool,
+        now: datetime,
+        stats: Optional[ParserStats],
+        diagnostics: bool,
+        max_length: Optional[int],
+        max_groups: Optional[int],
+        time_budget: Optional[float],
+        dialect: Union[str, "Dialect", None],
+        cache: Optional[GroupCache],
+    ) -> None: ...
     @property
     def decode_completed(self) -> bool: ...
-    def _do_trend_handlers(self, code: str) -> str: ...
+    def _do_trend_handlers(
+        self,
+        code: str,
+        trend_handlers: Optional[tuple] = ...,
+        pos: int = ...,
+        trace: Optional[bool] = ...,
+    ) -> int: ...
     def __str__(self) -> str: ...
     def _handleType(self, d: dict) -> None: ...
     def _handleCorrection(self, d: dict) -> None: ...
@@ -149,3 +273,57 @@ class Metar:
     def sky_conditions(self, sep: str = "; ") -> str: ...
     def trend(self) -> str: ...
     def remarks(self, sep: str = "; ") -> str: ...
+
+class Dialect:
+    name: str
+    handlers: Tuple[Tuple[Pattern, Callable[[Metar, dict], None], bool], ...]
+    trend_handlers: Tuple[Tuple[Pattern, Callable[[Metar, dict], None], bool], ...]
+    remark_handlers: Tuple[Tuple[Pattern, Callable[[Metar, dict], None]], ...]
+    def __init__(
+        self,
+        name: str,
+        excluded: Iterable[Union[_LazyPattern, Pattern]] = ...,
+        trends: bool = ...,
+        remarks: bool = ...,
+    ) -> None: ...
+
+def _unanchored_source(pattern: Union[_LazyPattern, Pattern]) -> str: ...
+def _prune(table: tuple, excluded: Iterable[Union[_LazyPattern, Pattern]]) -> tuple: ...
+
+_WMO_GROUPS: Tuple[_LazyPattern, ...]
+DIALECTS: Dict[str, Dialect]
+US_PREFIXES: Tuple[str, ...]
+MIXED_PREFIXES: Tuple[str, ...]
+
+def station_dialect(station_id: Optional[str]) -> Optional[Dialect]: ...
+def _dialect(
+    dialect: Union[str, Dialect, None], code: Optional[str]
+) -> Optional[Dialect]: ...
+
+class MetarParser:
+    month: Optional[int]
+    year: Optional[int]
+    strict: bool
+    now: Optional[datetime]
+    stats: Optional[ParserStats]
+    diagnostics: bool
+    max_length: Optional[int]
+    max_groups: Optional[int]
+    time_budget: Optional[float]
+    dialect: Union[Literal["auto"], Dialect, None]
+    cache: Optional[GroupCache]
+    def __init__(
+        self,
+        month: Optional[int] = ...,
+        year: Optional[int] = ...,
+        strict: bool = ...,
+        now: Optional[datetime] = ...,
+        stats: Optional[ParserStats] = ...,
+        diagnostics: bool = ...,
+        max_length: Optional[int] = ...,
+        max_groups: Optional[int] = ...,
+        time_budget: Optional[float] = ...,
+        dialect: Union[str, Dialect, None] = ...,
+        cache: Optional[GroupCache] = ...,
+    ) -> None: ...
+    def parse(self, metarcode: str) -> Metar: ...
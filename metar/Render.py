@@ -0,0 +1,269 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Render decoded METAR reports as text.
+
+A Renderer is compiled once, from a list of fields and a unit profile, into
+a single python function.  It can then be applied to any number of reports,
+and can write its output straight to a file.
+
+    >>> from metar import Metar, Render
+    >>> obs = Metar.Metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    >>> renderer = Render.Renderer(["station", "temp", "wind", "press"], "imperial")
+    >>> print(renderer.render(obs))
+    station: KEWR
+    temperature: 71.6 F
+    wind: WNW at 32 mph
+    pressure: 29.87 inches
+
+The default renderer produces the same text as Metar.string().
+"""
+from metar.Datatypes import (
+    UnitsError,
+    temperature,
+    pressure,
+    speed,
+    distance,
+    precipitation,
+)
+
+# units used for each kind of quantity; None means the units of the report
+UNIT_PROFILES = {
+    "default": {
+        "temperature": "C",
+        "pressure": "hPa",
+        "speed": "KT",
+        "distance": None,
+        "runway": None,
+        "precipitation": None,
+        "snowdepth": None,
+    },
+    "metric": {
+        "temperature": "C",
+        "pressure": "hPa",
+        "speed": "KMH",
+        "distance": "M",
+        "runway": "M",
+        "precipitation": "CM",
+        "snowdepth": "CM",
+    },
+    "imperial": {
+        "temperature": "F",
+        "pressure": "IN",
+        "speed": "MPH",
+        "distance": "SM",
+        "runway": "FT",
+        "precipitation": "IN",
+        "snowdepth": "IN",
+    },
+    "aviation": {
+        "temperature": "C",
+        "pressure": "IN",
+        "speed": "KT",
+        "distance": "SM",
+        "runway": "FT",
+        "precipitation": "IN",
+        "snowdepth": "IN",
+    },
+}
+
+_QUANTITIES = {
+    "temperature": temperature,
+    "pressure": pressure,
+    "speed": speed,
+    "distance": distance,
+    "runway": distance,
+    "precipitation": precipitation,
+    "snowdepth": distance,
+}
+
+
+# Templates for the fields.  Each is a snippet of python code that appends
+# the lines for one field of a report, with "{units[...]}" placeholders for
+# the units of the profile.  A renderer joins the snippets for its fields
+# into the body of a single function, so that rendering a report involves no
+# per-field dispatch and no unit lookups.
+
+
+def _value(label, attr, quantity, when=None):
+    """
+    Template for a Datatypes value, shown if it (or "when") is set.  A value
+    shown because "when" is set is rendered as "None" if it's missing.
+    """
+    append = "append(%r + report.%s.string({units[%s]!r}))" % (label, attr, quantity)
+    if when is None:
+        return "if report.%s:\n    %s" % (attr, append)
+    return (
+        "if report.%s:\n"
+        "    if report.%s is None:\n"
+        "        append(%r)\n"
+        "    else:\n"
+        "        %s" % (when, attr, label + "None", append)
+    )
+
+
+def _method(label, attr, call):
+    """Template for the result of a Metar method, shown if attr is set."""
+    return "if report.%s:\n    append(%r + report.%s)" % (attr, label, call)
+
+
+FIELDS = {
+    "station": 'append("station: %s" % (report.station_id,))',
+    "type": _method("type: ", "type", "report_type()"),
+    "time": _method("time: ", "time", "time.ctime()"),
+    "temp": _value("temperature: ", "temp", "temperature"),
+    "dewpt": _value("dew point: ", "dewpt", "temperature"),
+    "wind": _method("wind: ", "wind_speed", "wind({units[speed]!r})"),
+    "peak_wind": _method(
+        "peak wind: ", "wind_speed_peak", "peak_wind({units[speed]!r})"
+    ),
+    "wind_shift": _method("wind shift: ", "wind_shift_time", "wind_shift()"),
+    "vis": _method("visibility: ", "vis", "visibility({units[distance]!r})"),
+    "runway": _method(
+        "visual range: ", "runway", "runway_visual_range({units[runway]!r})"
+    ),
+    "press": _value("pressure: ", "press", "pressure"),
+    "weather": _method("weather: ", "weather", "present_weather()"),
+    "recent": _method("recent weather: ", "recent", "recent_weather()"),
+    "sky": _method("sky: ", "sky", 'sky_conditions("\\n     ")'),
+    "press_sea_level": _value("sea-level pressure: ", "press_sea_level", "pressure"),
+    "max_temp_6hr": _value("6-hour max temp: ", "max_temp_6hr", "temperature"),
+    # as in earlier versions, the minimum is only shown with the maximum
+    "min_temp_6hr": _value(
+        "6-hour min temp: ", "min_temp_6hr", "temperature", "max_temp_6hr"
+    ),
+    "max_temp_24hr": _value("24-hour max temp: ", "max_temp_24hr", "temperature"),
+    "min_temp_24hr": _value(
+        "24-hour min temp: ", "min_temp_24hr", "temperature", "max_temp_24hr"
+    ),
+    "precip_1hr": _value("1-hour precipitation: ", "precip_1hr", "precipitation"),
+    "precip_3hr": _value("3-hour precipitation: ", "precip_3hr", "precipitation"),
+    "precip_6hr": _value("6-hour precipitation: ", "precip_6hr", "precipitation"),
+    "precip_24hr": _value("24-hour precipitation: ", "precip_24hr", "precipitation"),
+    "ice_accretion_1hr": _value(
+        "1-hour Ice Accretion: ", "ice_accretion_1hr", "precipitation"
+    ),
+    "ice_accretion_3hr": _value(
+        "3-hour Ice Accretion: ", "ice_accretion_3hr", "precipitation"
+    ),
+    "ice_accretion_6hr": _value(
+        "6-hour Ice Accretion: ", "ice_accretion_6hr", "precipitation"
+    ),
+    "snowdepth": _value("snow depth: ", "snowdepth", "snowdepth"),
+    "trend": _method("trend: ", "_trend_groups", "trend()"),
+    "remarks": (
+        "if report._remarks:\n"
+        '    append("remarks:")\n'
+        '    append("- " + report.remarks("\\n- "))\n'
+        "if report._unparsed_remarks:\n"
+        '    append("- " + " ".join(report._unparsed_remarks))'
+    ),
+    "code": 'append("METAR: " + report.code)',
+}
+
+# the fields shown by Metar.string()
+DEFAULT_FIELDS = (
+    "station",
+    "type",
+    "time",
+    "temp",
+    "dewpt",
+    "wind",
+    "peak_wind",
+    "wind_shift",
+    "vis",
+    "runway",
+    "press",
+    "weather",
+    "sky",
+    "press_sea_level",
+    "max_temp_6hr",
+    "min_temp_6hr",
+    "max_temp_24hr",
+    "min_temp_24hr",
+    "precip_1hr",
+    "precip_3hr",
+    "precip_6hr",
+    "precip_24hr",
+    "ice_accretion_1hr",
+    "ice_accretion_3hr",
+    "ice_accretion_6hr",
+    "remarks",
+    "code",
+)
+
+
+_RENDER_SOURCE = """\
+def render(report):
+    lines = []
+    append = lines.append
+%s
+    return "\\n".join(lines)
+"""
+
+
+def _profile(units):
+    """Return the validated unit profile for a profile name or dictionary."""
+    if isinstance(units, str):
+        if units not in UNIT_PROFILES:
+            raise ValueError("unknown unit profile: '" + units + "'")
+        return UNIT_PROFILES[units]
+    profile = dict(UNIT_PROFILES["default"])
+    for quantity, unit in units.items():
+        if quantity not in _QUANTITIES:
+            raise ValueError("unknown quantity: '" + quantity + "'")
+        legal_units = _QUANTITIES[quantity].legal_units
+        if unit is not None and unit.upper() not in legal_units:
+            raise UnitsError("unrecognized " + quantity + " unit: '" + unit + "'")
+        profile[quantity] = unit
+    return profile
+
+
+class Renderer(object):
+    """
+    A text renderer for Metar objects.
+
+    renderer.render(report) returns the text for a single report.
+    """
+
+    def __init__(self, fields=DEFAULT_FIELDS, units="default"):
+        """
+        Compile a renderer.
+
+        Parameters
+        ----------
+        fields : sequence of str, optional
+          Names of the fields to show, in order (see FIELDS).  By default, the
+          fields shown by Metar.string().
+        units : str or dict, optional
+          Name of one of the UNIT_PROFILES, or a dictionary giving the units
+          of some of the quantities (with the others as in the default).
+        """
+        profile = _profile(units)
+        body = []
+        for name in fields:
+            if name not in FIELDS:
+                raise ValueError("unknown field: '" + name + "'")
+            for line in FIELDS[name].format(units=profile).split("\n"):
+                body.append("    " + line)
+        source = _RENDER_SOURCE % "\n".join(body)
+        namespace = {}
+        exec(compile(source, "<metar.Render>", "exec"), namespace)
+        self.fields = tuple(fields)
+        self.units = profile
+        self.source = source
+        self.render = namespace["render"]
+
+    def write(self, reports, file, separator="\n\n"):
+        """
+        Write the text for each of the given reports to a file, followed by
+        the separator.  Returns the number of reports written.
+        """
+        count = 0
+        write = file.write
+        render = self.render
+        for report in reports:
+            write(render(report))
+            write(separator)
+            count += 1
+        return count
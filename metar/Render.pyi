@@ -0,0 +1,22 @@
+from typing import Any, Callable, Dict, IO, Iterable, Optional, Sequence, Tuple, Union
+
+UNIT_PROFILES: Dict[str, Dict[str, Optional[str]]]
+FIELDS: Dict[str, str]
+DEFAULT_FIELDS: Tuple[str, ...]
+
+def _value(label: str, attr: str, quantity: str, when: Optional[str] = ...) -> str: ...
+def _method(label: str, attr: str, call: str) -> str: ...
+def _profile(units: Union[str, Dict[str, Optional[str]]]) -> Dict[str, Optional[str]]: ...
+
+class Renderer:
+    fields: Tuple[str, ...]
+    units: Dict[str, Optional[str]]
+    source: str
+    render: Callable[[Any], str]
+
+    def __init__(
+        self,
+        fields: Sequence[str] = ...,
+        units: Union[str, Dict[str, Optional[str]]] = ...,
+    ) -> None: ...
+    def write(self, reports: Iterable[Any], file: IO[str], separator: str = ...) -> int: ...
@@ -0,0 +1,328 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Rolling time series of the numeric fields of METAR reports.
+
+A StationSeries holds the most recent observations from one station in
+fixed-size circular arrays (one per field, plus the observation times), so
+that its memory use doesn't grow with the length of the feed.  Rolling
+queries look back from the most recent observation and cost time in
+proportion to the number of observations in the window.
+
+The fields held are listed in FIELDS, with the units in which they are
+stored.  Missing values are stored as NaN and are ignored by the queries.
+
+    >>> from datetime import datetime
+    >>> from metar import Metar, Series
+    >>> series = Series.StationSeries()
+    >>> for code in ["KEWR 111651Z 29028KT 10SM 20/12 A2983",
+    ...              "KEWR 111751Z 29028KT 10SM 23/12 A2985",
+    ...              "KEWR 111851Z 29028KT 10SM 22/12 A2987"]:
+    ...     series.add(Metar.Metar(code, now=datetime(2005, 1, 12)))
+    True
+    True
+    True
+    >>> series.maximum("temp", 6)
+    23.0
+"""
+import datetime
+from array import array
+from math import isnan
+
+from metar import Metar
+
+NAN = float("nan")
+
+# field name -> units in which it is stored
+FIELDS = {
+    "temp": "C",
+    "dewpt": "C",
+    "press": "HPA",
+    "wind_speed": "KT",
+    "wind_dir": None,  # degrees
+    "vis": "M",
+    "precip_1hr": "IN",
+}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_HOUR = 3600.0
+
+
+def _seconds(time):
+    """Return a (naive, UTC) datetime as seconds since the epoch."""
+    return (time - _EPOCH).total_seconds()
+
+
+def _field_value(report, field, units):
+    """Return the value of a field of a report in the given units, or NaN."""
+    value = getattr(report, field)
+    if value is None:
+        return NAN
+    if units is None:
+        return value.value()
+    return value.value(units)
+
+
+class StationSeries(object):
+    """Circular buffers of the recent observations from a single station."""
+
+    def __init__(self, capacity=96):
+        """
+        Parameters
+        ----------
+        capacity : int, optional
+          Number of observations to hold.  The default holds at least a day
+          of routine reports, plus any SPECI reports.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._times = array("d", [NAN]) * capacity
+        self._values = dict((field, array("d", [NAN]) * capacity) for field in FIELDS)
+        self._routine = bytearray(capacity)
+        self._count = 0
+        self._last = -1  # index of the most recent observation
+        self.dropped = 0  # number of reports ignored for arriving late
+
+    def __len__(self):
+        return self._count
+
+    def add(self, report):
+        """
+        Add a report to the series.
+
+        Reports must be added in order of observation time; an earlier report
+        than the most recent one is ignored, and counted in the dropped
+        attribute.  A report with the same time as
+        the most recent one is merged with it: the values of a routine report
+        take precedence over those of a SPECI (and, between reports of the
+        same kind, those of the later report), and values missing from one
+        are taken from the other.  Returns True if the report was added.
+        """
+        if report.time is None:
+            return False
+        time = _seconds(report.time)
+        routine = report.type != "SPECI"
+        last = self._last
+        if self._count:
+            newest = self._times[last]
+            if time < newest:
+                self.dropped += 1
+                return False
+            if time == newest:
+                self._merge(report, routine)
+                return True
+            last = (last + 1) % self.capacity
+        else:
+            last = 0
+        if last != self._last:
+            self._last = last
+            if self._count < self.capacity:
+                self._count += 1
+        self._times[last] = time
+        for field, units in FIELDS.items():
+            self._values[field][last] = _field_value(report, field, units)
+        self._routine[last] = routine
+        return True
+
+    def _merge(self, report, routine):
+        """Merge a report into the most recent observation, at the same time."""
+        last = self._last
+        replace = routine or not self._routine[last]
+        for field, units in FIELDS.items():
+            values = self._values[field]
+            value = _field_value(report, field, units)
+            if isnan(values[last]) or (replace and not isnan(value)):
+                values[last] = value
+        if routine:
+            self._routine[last] = True
+
+    def _window(self, hours, end=None):
+        """
+        Return the indexes of the observations within the given number of
+        hours up to (and including) the end time, most recent first.
+        """
+        if not self._count:
+            return []
+        times = self._times
+        if end is None:
+            end = times[self._last]
+        else:
+            end = _seconds(end)
+        start = end - hours * _HOUR
+        indexes = []
+        i = self._last
+        for _ in range(self._count):
+            time = times[i]
+            if time <= start:
+                break
+            if time <= end:
+                indexes.append(i)
+            i = (i - 1) % self.capacity
+        return indexes
+
+    def latest(self, field):
+        """Return the most recent value of a field (NaN if it is missing)."""
+        if not self._count:
+            return NAN
+        return self._values[field][self._last]
+
+    def values(self, field, hours, end=None):
+        """
+        Return the (time, value) pairs of a field over the given number of
+        hours, most recent first, skipping missing values.
+        """
+        times = self._times
+        values = self._values[field]
+        result = []
+        for i in self._window(hours, end):
+            if not isnan(values[i]):
+                time = _EPOCH + datetime.timedelta(seconds=times[i])
+                result.append((time, values[i]))
+        return result
+
+    def _defined(self, field, hours, end):
+        """Return the values of a field in a window, skipping missing ones."""
+        values = self._values[field]
+        return [values[i] for i in self._window(hours, end) if not isnan(values[i])]
+
+    def maximum(self, field, hours, end=None):
+        """Return the maximum of a field over the given number of hours."""
+        window = self._defined(field, hours, end)
+        return max(window) if window else None
+
+    def minimum(self, field, hours, end=None):
+        """Return the minimum of a field over the given number of hours."""
+        window = self._defined(field, hours, end)
+        return min(window) if window else None
+
+    def precipitation(self, hours, end=None):
+        """
+        Return the precipitation (inches) accumulated over the given number of
+        hours, from the hourly amounts of the routine reports.
+
+        SPECI reports are skipped, since their amounts are included in the
+        following routine report.
+        """
+        values = self._values["precip_1hr"]
+        routine = self._routine
+        total = 0.0
+        for i in self._window(hours, end):
+            if routine[i] and not isnan(values[i]):
+                total += values[i]
+        return total
+
+    def pressure_tendency(self, hours=3, end=None, tolerance=0.5):
+        """
+        Return the change in pressure (hPa) over the given number of hours.
+
+        The change is measured from the observation nearest the start of the
+        period, which must be within the tolerance (in hours) of it.  Returns
+        None if there is no such observation.
+        """
+        if not self._count:
+            return None
+        window = self._window(hours + tolerance, end)
+        if not window:
+            return None
+        times = self._times
+        values = self._values["press"]
+        latest = values[window[0]]
+        target = times[window[0]] - hours * _HOUR
+        best = None
+        for i in window:
+            offset = abs(times[i] - target)
+            if offset <= tolerance * _HOUR and not isnan(values[i]):
+                if best is None or offset < abs(times[best] - target):
+                    best = i
+        if best is None or isnan(latest):
+            return None
+        return latest - values[best]
+
+    def cross_check(self, report):
+        """
+        Compare the summary values in the remarks of a report with the values
+        computed from the series, up to the time of the report.
+
+        Returns a dictionary that maps the name of each summary attribute the
+        report has (such as "max_temp_6hr", "precip_3hr" or "press_3hr") to
+        a tuple of the reported and computed values.  The 3-hour pressure
+        change (hPa) is compared with pressure_tendency().
+        """
+        end = report.time
+        checks = {}
+        for attr, field, hours, func in (
+            ("max_temp_6hr", "temp", 6, self.maximum),
+            ("min_temp_6hr", "temp", 6, self.minimum),
+            ("max_temp_24hr", "temp", 24, self.maximum),
+            ("min_temp_24hr", "temp", 24, self.minimum),
+        ):
+            value = getattr(report, attr)
+            if value is not None:
+                checks[attr] = (value.value("C"), func(field, hours, end))
+        for attr, hours in (
+            ("precip_3hr", 3),
+            ("precip_6hr", 6),
+            ("precip_24hr", 24),
+        ):
+            value = getattr(report, attr)
+            if value is not None:
+                checks[attr] = (value.value("IN"), self.precipitation(hours, end))
+        if report.press_3hr is not None:
+            checks["press_3hr"] = (
+                report.press_3hr.value("HPA"),
+                self.pressure_tendency(3, end),
+            )
+        return checks
+
+
+class SeriesStore(object):
+    """A StationSeries for each station in a feed."""
+
+    def __init__(self, capacity=96, **kwargs):
+        """
+        Parameters
+        ----------
+        capacity : int, optional
+          Number of observations to hold for each station.
+        **kwargs
+          Arguments used to create Metar objects from raw reports passed to
+          add().  By default, problems in the reports are recorded as
+          diagnostics rather than raised or warned about.
+        """
+        self.capacity = capacity
+        kwargs.setdefault("diagnostics", True)
+        self._parser = Metar.MetarParser(**kwargs)
+        self._series = {}
+
+    def add(self, report):
+        """
+        Add a report, given as a Metar object or as raw METAR code, to the
+        series for its station.  Returns True if the report was added.
+        """
+        if isinstance(report, str):
+            report = self._parser.parse(report)
+        station_id = report.station_id
+        if station_id is None:
+            return False
+        series = self._series.get(station_id)
+        if series is None:
+            series = self._series[station_id] = StationSeries(self.capacity)
+        return series.add(report)
+
+    def __getitem__(self, station_id):
+        return self._series[station_id]
+
+    def __contains__(self, station_id):
+        return station_id in self._series
+
+    def __len__(self):
+        return len(self._series)
+
+    @property
+    def dropped(self):
+        """Return the number of reports ignored for arriving late."""
+        return sum(series.dropped for series in self._series.values())
+
+    def __iter__(self):
+        return iter(self._series)
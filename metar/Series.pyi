@@ -0,0 +1,65 @@
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from metar.Metar import Metar, MetarParser
+
+NAN: float
+FIELDS: Dict[str, Optional[str]]
+_EPOCH: datetime
+_HOUR: float
+
+def _seconds(time: datetime) -> float: ...
+def _field_value(report: Metar, field: str, units: Optional[str]) -> float: ...
+
+class StationSeries:
+    capacity: int
+    _times: array
+    _values: Dict[str, array]
+    _routine: bytearray
+    _count: int
+    _last: int
+    dropped: int
+
+    def __init__(self, capacity: int = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def add(self, report: Metar) -> bool: ...
+    def _merge(self, report: Metar, routine: bool) -> None: ...
+    def _window(self, hours: float, end: Optional[datetime] = ...) -> List[int]: ...
+    def latest(self, field: str) -> float: ...
+    def values(
+        self, field: str, hours: float, end: Optional[datetime] = ...
+    ) -> List[Tuple[datetime, float]]: ...
+    def _defined(
+        self, field: str, hours: float, end: Optional[datetime]
+    ) -> List[float]: ...
+    def maximum(
+        self, field: str, hours: float, end: Optional[datetime] = ...
+    ) -> Optional[float]: ...
+    def minimum(
+        self, field: str, hours: float, end: Optional[datetime] = ...
+    ) -> Optional[float]: ...
+    def precipitation(self, hours: float, end: Optional[datetime] = ...) -> float: ...
+    def pressure_tendency(
+        self,
+        hours: float = ...,
+        end: Optional[datetime] = ...,
+        tolerance: float = ...,
+    ) -> Optional[float]: ...
+    def cross_check(
+        self, report: Metar
+    ) -> Dict[str, Tuple[float, Optional[float]]]: ...
+
+class SeriesStore:
+    capacity: int
+    _parser: MetarParser
+    _series: Dict[str, StationSeries]
+
+    def __init__(self, capacity: int = ..., **kwargs: Any) -> None: ...
+    def add(self, report: Union[Metar, str]) -> bool: ...
+    def __getitem__(self, station_id: str) -> StationSeries: ...
+    def __contains__(self, station_id: object) -> bool: ...
+    def __len__(self) -> int: ...
+    @property
+    def dropped(self) -> int: ...
+    def __iter__(self) -> Iterator[str]: ...
@@ -10,12 +10,20 @@ class station:
     """An object representing a weather station."""
 
     def __init__(
-        self, id, city=None, state=None, country=None, latitude=None, longitude=None
+        self,
+        id,
+        city=None,
+        state=None,
+        country=None,
+        latitude=None,
+        longitude=None,
+        wmo_block=None,
     ):
         self.id = id
         self.city = city
         self.state = state
         self.country = country
+        self.wmo_block = wmo_block
         self.position = position(latitude, longitude)
         if self.state:
             self.name = "%s, %s" % (self.city, self.state)
@@ -32,9 +40,92 @@ stations = {}
 fh = open(station_file_name, "r")
 for line in fh:
     f = line.strip().split(";")
-    stations[f[0]] = station(f[0], f[3], f[4], f[5], f[7], f[8])
+    stations[f[0]] = station(f[0], f[3], f[4], f[5], f[7], f[8], f[1])
 fh.close()
 
+# secondary indexes on the stations table, built on first use
+
+_indexes = None
+
+
+def _build_indexes():
+    """Build the country, state, ICAO prefix and WMO block indexes."""
+    by_country = {}
+    by_state = {}
+    by_prefix = {}
+    by_wmo_block = {}
+    for id in sorted(stations):
+        st = stations[id]
+        if st.country:
+            by_country.setdefault(st.country, []).append(id)
+        if st.state:
+            by_state.setdefault(st.state, []).append(id)
+        if st.wmo_block:
+            by_wmo_block.setdefault(st.wmo_block, []).append(id)
+        for n in range(1, len(id) + 1):
+            by_prefix.setdefault(id[:n], []).append(id)
+    return {
+        "country": {k: tuple(v) for k, v in by_country.items()},
+        "state": {k: tuple(v) for k, v in by_state.items()},
+        "prefix": {k: tuple(v) for k, v in by_prefix.items()},
+        "wmo_block": {k: tuple(v) for k, v in by_wmo_block.items()},
+    }
+
+
+def _lookup(index, key):
+    """Return the ids stored under the given key of the named index."""
+    global _indexes
+    if _indexes is None:
+        _indexes = _build_indexes()
+    return _indexes[index].get(key, ())
+
+
+def by_country(country):
+    """Return the ids of all stations in the given country (e.g., "Germany")."""
+    return _lookup("country", country)
+
+
+def by_state(state):
+    """Return the ids of all stations in the given state (e.g., "TX")."""
+    return _lookup("state", state)
+
+
+def by_prefix(prefix):
+    """Return the ids of all stations whose ICAO id starts with the given prefix."""
+    return _lookup("prefix", prefix)
+
+
+def by_wmo_block(block):
+    """Return the ids of all stations in the given WMO block (e.g., "72")."""
+    return _lookup("wmo_block", block)
+
+
+def find(country=None, state=None, prefix=None, wmo_block=None):
+    """
+    Return the ids of the stations matching all of the given criteria.
+
+    The ids are returned in sorted order.  Queries on a single criterion
+    return the prebuilt index entry directly.
+    """
+    results = []
+    if country is not None:
+        results.append(by_country(country))
+    if state is not None:
+        results.append(by_state(state))
+    if prefix is not None:
+        results.append(by_prefix(prefix))
+    if wmo_block is not None:
+        results.append(by_wmo_block(wmo_block))
+    if not results:
+        return tuple(sorted(stations))
+    if len(results) == 1:
+        return results[0]
+    results.sort(key=len)
+    wanted = set(results[0])
+    for ids in results[1:]:
+        wanted.intersection_update(ids)
+    return tuple(id for id in results[0] if id in wanted)
+
 if __name__ == "__main__":
     for id in ["KEWR", "KIAD", "KIWI", "EKRK"]:
         print(id, stations[id].name, stations[id].country)
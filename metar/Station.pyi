@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from metar.Datatypes import position
 
@@ -9,6 +9,7 @@ class station:
     state: Optional[str]
     country: Optional[str]
     position: position
+    wmo_block: Optional[str]
 
     def __init__(
         self,
@@ -18,6 +19,18 @@ class station:
         country: Optional[str] = None,
         latitude: Optional[str] = None,
         longitude: Optional[str] = None,
+        wmo_block: Optional[str] = None,
     ): ...
 
 stations: Dict[str, station]
+
+def by_country(country: str) -> Tuple[str, ...]: ...
+def by_state(state: str) -> Tuple[str, ...]: ...
+def by_prefix(prefix: str) -> Tuple[str, ...]: ...
+def by_wmo_block(block: str) -> Tuple[str, ...]: ...
+def find(
+    country: Optional[str] = None,
+    state: Optional[str] = None,
+    prefix: Optional[str] = None,
+    wmo_block: Optional[str] = None,
+) -> Tuple[str, ...]: ...
@@ -0,0 +1,203 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Optional instrumentation of the METAR parser.
+
+A ParserStats object passed to the Metar constructor collects, for every
+entry of the body, trend and remark handler tables, the number of times its
+pattern was tried, the number of times it matched and the cumulative time
+spent matching and decoding.  One object can be shared by many reports to
+aggregate the counts over a whole feed.
+
+    >>> from metar import Metar, Stats
+    >>> stats = Stats.ParserStats()
+    >>> obs = Metar.Metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987", stats=stats)
+    >>> stats.snapshot()["reports"]
+    1
+
+When no ParserStats object is given, the parser runs the plain handler
+tables and the instrumentation costs nothing.
+"""
+from time import perf_counter
+
+from metar import Metar
+
+
+_pattern_names = {}
+
+
+def _pattern_name(pattern):
+    """Return the name of a regular expression defined in metar.Metar."""
+    if not _pattern_names:
+        for name, value in vars(Metar).items():
+            if name.endswith("_RE") and hasattr(value, "match"):
+                # the parser's patterns are named after the public ones
+                _pattern_names.setdefault(id(value), name.lstrip("_"))
+    return _pattern_names.get(id(pattern), pattern.pattern)
+
+
+class _Counter(object):
+    """Counts for a single (section, pattern, handler) entry."""
+
+    __slots__ = ("attempts", "matches", "seconds")
+
+    def __init__(self):
+        self.attempts = 0
+        self.matches = 0
+        self.seconds = 0.0
+
+
+class _InstrumentedPattern(object):
+    """Wrap a compiled pattern, counting and timing its match attempts."""
+
+    __slots__ = ("_pattern", "_counter")
+
+    def __init__(self, pattern, counter):
+        self._pattern = pattern
+        self._counter = counter
+
+    @property
+    def pattern(self):
+        return self._pattern.pattern
+
+    @property
+    def flags(self):
+        return self._pattern.flags
+
+    def match(self, string, *args):
+        counter = self._counter
+        start = perf_counter()
+        m = self._pattern.match(string, *args)
+        counter.seconds += perf_counter() - start
+        counter.attempts += 1
+        return m
+
+    def sub(self, *args):
+        return self._pattern.sub(*args)
+
+
+def _instrument_handler(handler, counter):
+    """Wrap a handler function, counting and timing its calls."""
+
+    def instrumented(self, d):
+        start = perf_counter()
+        try:
+            handler(self, d)
+        finally:
+            counter.seconds += perf_counter() - start
+            counter.matches += 1
+
+    instrumented.__name__ = handler.__name__
+    instrumented.__doc__ = handler.__doc__
+    return instrumented
+
+
+class ParserStats(object):
+    """Per-handler attempt, match and timing counters for the METAR parser."""
+
+    def __init__(self):
+        self.reports = 0
+        self._counters = {}
+        self._tables = {}
+
+    def _counter(self, section, pattern, handler):
+        """Return the counter for the given table entry, creating it if needed."""
+        key = (section, _pattern_name(pattern), handler.__name__)
+        if key not in self._counters:
+            self._counters[key] = _Counter()
+        return self._counters[key]
+
+    def _wrap(self, section, pattern, handler):
+        counter = self._counter(section, pattern, handler)
+        return (
+            _InstrumentedPattern(pattern, counter),
+            _instrument_handler(handler, counter),
+        )
+
+    def _wrap_table(self, section, table):
+        """Return an instrumented copy of a handler table (cached)."""
+        cached = self._tables.get((section, id(table)))
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        wrapped = []
+        for entry in table:
+            pattern, handler = self._wrap(section, entry[0], entry[1])
+            wrapped.append((pattern, handler) + tuple(entry[2:]))
+        wrapped = tuple(wrapped)
+        self._tables[(section, id(table))] = (table, wrapped)
+        return wrapped
+
+    def _wrap_entry(self, section, entry):
+        """Return an instrumented copy of a single (pattern, handler) entry."""
+        cached = self._tables.get((section, id(entry)))
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+        wrapped = self._wrap(section, entry[0], entry[1])
+        self._tables[(section, id(entry))] = (entry, wrapped)
+        return wrapped
+
+    def instrument(self, handlers, trend_handlers, remark_handlers, unparsed):
+        """
+        Return instrumented versions of the parser's handler tables.
+
+        This is called by the Metar constructor once per report.
+        """
+        self.reports += 1
+        return (
+            self._wrap_table("body", handlers),
+            self._wrap_table("trend", trend_handlers),
+            self._wrap_table("remark", remark_handlers),
+            self._wrap_entry("body", unparsed),
+        )
+
+    def merge(self, other):
+        """Add the counts collected by another ParserStats object to this one."""
+        self.reports += other.reports
+        for key, theirs in other._counters.items():
+            ours = self._counters.get(key)
+            if ours is None:
+                ours = self._counters[key] = _Counter()
+            ours.attempts += theirs.attempts
+            ours.matches += theirs.matches
+            ours.seconds += theirs.seconds
+
+    def reset(self):
+        """Clear all of the counters."""
+        self.reports = 0
+        self._counters.clear()
+        self._tables.clear()
+
+    def snapshot(self):
+        """
+        Return a copy of the counters, as a dictionary of the number of
+        "reports" parsed and a "handlers" list with the attempts, matches
+        and seconds of each (section, pattern, handler) combination.
+
+        "unparsed_groups" and "unparsed_remarks" count the groups that fell
+        through to the catch-all handlers.  Only plain values are used, so
+        that the result can be written with json.dump().
+        """
+        entries = []
+        unparsed_groups = 0
+        unparsed_remarks = 0
+        for (section, pattern, handler), counter in self._counters.items():
+            entries.append(
+                {
+                    "section": section,
+                    "pattern": pattern,
+                    "handler": handler,
+                    "attempts": counter.attempts,
+                    "matches": counter.matches,
+                    "seconds": counter.seconds,
+                }
+            )
+            if handler == "_unparsedGroup":
+                unparsed_groups += counter.matches
+            elif handler == "_unparsedRemark":
+                unparsed_remarks += counter.matches
+        return {
+            "reports": self.reports,
+            "unparsed_groups": unparsed_groups,
+            "unparsed_remarks": unparsed_remarks,
+            "handlers": entries,
+        }
@@ -0,0 +1,38 @@
+from re import Match, Pattern
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+def _pattern_name(pattern: Pattern) -> str: ...
+
+class _Counter:
+    attempts: int
+    matches: int
+    seconds: float
+
+class _InstrumentedPattern:
+    def __init__(self, pattern: Pattern, counter: _Counter) -> None: ...
+    @property
+    def pattern(self) -> str: ...
+    @property
+    def flags(self) -> int: ...
+    def match(self, string: str, *args: int) -> Optional[Match]: ...
+    def sub(self, *args: Any) -> str: ...
+
+def _instrument_handler(
+    handler: Callable[[Any, dict], None], counter: _Counter
+) -> Callable[[Any, dict], None]: ...
+
+class ParserStats:
+    reports: int
+    _counters: Dict[Tuple[str, str, str], _Counter]
+
+    def __init__(self) -> None: ...
+    def instrument(
+        self,
+        handlers: tuple,
+        trend_handlers: tuple,
+        remark_handlers: tuple,
+        unparsed: tuple,
+    ) -> Tuple[tuple, tuple, tuple, tuple]: ...
+    def merge(self, other: "ParserStats") -> None: ...
+    def reset(self) -> None: ...
+    def snapshot(self) -> Dict[str, Any]: ...
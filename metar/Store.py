@@ -0,0 +1,214 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""An in-memory store of the latest observation from each station.
+
+An ObservationStore keeps one decoded report per station, and applies each
+incoming report in constant time.  A report replaces the current one for its
+station if it is more recent, using these rules:
+
+- a later observation time always wins;
+- for the same observation time, a SPECI report replaces a routine METAR;
+- for the same time and type, a corrected report (COR, or CCA, CCB, ...)
+  replaces the original or an earlier correction.
+
+    >>> from metar import Store
+    >>> store = Store.ObservationStore()
+    >>> store.update("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    True
+    >>> store.update("METAR KEWR 111751Z 29028KT 10SM 21/21 A2985")
+    False
+    >>> store["KEWR"].temp.value()
+    22.0
+
+With max_age set, observations older than that are treated as missing, and
+are dropped from the store by expire().  Their age is measured from the time
+passed to the methods or, by default, from the time given by the clock of
+the store: the system clock, or, when archived reports are replayed, the
+latest observation time applied.
+
+    >>> store = Store.ObservationStore(max_age=3600, clock="latest")
+    >>> store.update_many(["METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    ...                    "METAR KJFK 112051Z 29028KT 10SM 22/22 A2987"])
+    2
+    >>> "KEWR" in store, "KJFK" in store
+    (False, True)
+"""
+import datetime
+
+from metar import Metar
+
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _precedence(report):
+    """
+    Return the key used to decide whether a report replaces another one for
+    the same station.
+    """
+    mod = report.mod or ""
+    if mod.startswith("CC"):
+        correction = ord(mod[2]) - ord("A") + 1
+    elif report.correction or mod.startswith("COR"):
+        correction = 1
+    else:
+        correction = 0
+    return (report.time, report.type == "SPECI", correction)
+
+
+class ObservationStore(object):
+    """The latest decoded observation for each station."""
+
+    def __init__(self, max_age=None, clock=None, **kwargs):
+        """
+        Parameters
+        ----------
+        max_age : datetime.timedelta or float, optional
+          Age (in seconds, if a number) after which an observation is stale.
+          By default, observations never expire.
+        clock : callable or str, optional
+          The current time, used to tell which observations are stale when
+          no time is passed to the methods (and by the mapping protocol).
+          Either a function that returns a naive UTC datetime, or "latest",
+          for the latest observation time applied to the store (to replay
+          archived reports).  By default, the system clock.
+        **kwargs
+          Arguments used to create Metar objects from raw reports passed to
+          update().  By default, problems in the reports are recorded as
+          diagnostics (see metar.Diagnostics) rather than raised or warned
+          about.
+        """
+        if max_age is not None and not isinstance(max_age, datetime.timedelta):
+            max_age = datetime.timedelta(seconds=max_age)
+        self.max_age = max_age
+        if clock is None:
+            clock = _utcnow
+        elif clock == "latest":
+            clock = self._latest_time
+        elif not callable(clock):
+            raise ValueError("unrecognized clock: '" + str(clock) + "'")
+        self.clock = clock
+        # the latest observation time applied
+        self.latest_time = None
+        kwargs.setdefault("diagnostics", True)
+        self._parser = Metar.MetarParser(**kwargs)
+        # station id -> (precedence, report), in order of the last update
+        self._latest = {}
+
+    def update(self, report):
+        """
+        Apply a report, given as a Metar object or as raw METAR code.
+
+        Returns True if the report became the current observation for its
+        station, and False if it was ignored (because the station already
+        has a more recent report, or because the report has no station id or
+        observation time).
+        """
+        if isinstance(report, str):
+            report = self._parser.parse(report)
+        station_id = report.station_id
+        if station_id is None or report.time is None:
+            return False
+        key = _precedence(report)
+        latest = self._latest
+        current = latest.get(station_id)
+        if current is not None:
+            if key < current[0]:
+                return False
+            # move the station to the end of the update order
+            del latest[station_id]
+        latest[station_id] = (key, report)
+        if self.latest_time is None or report.time > self.latest_time:
+            self.latest_time = report.time
+        return True
+
+    def update_many(self, reports):
+        """Apply each of the given reports.  Returns the number applied."""
+        update = self.update
+        count = 0
+        for report in reports:
+            if update(report):
+                count += 1
+        return count
+
+    def _latest_time(self):
+        return self.latest_time
+
+    def _cutoff(self, now):
+        """Return the oldest observation time that isn't stale (or None)."""
+        if self.max_age is None:
+            return None
+        if now is None:
+            now = self.clock()
+            if now is None:
+                # nothing has been applied to a store with the "latest" clock
+                return None
+        return now - self.max_age
+
+    def get(self, station_id, default=None, now=None):
+        """Return the current observation for a station, if it isn't stale."""
+        current = self._latest.get(station_id)
+        if current is None:
+            return default
+        cutoff = self._cutoff(now)
+        if cutoff is not None and current[1].time < cutoff:
+            return default
+        return current[1]
+
+    def __getitem__(self, station_id):
+        report = self.get(station_id)
+        if report is None:
+            raise KeyError(station_id)
+        return report
+
+    def __contains__(self, station_id):
+        return self.get(station_id) is not None
+
+    def __len__(self):
+        """Return the number of stations held, including stale entries."""
+        return len(self._latest)
+
+    def __iter__(self):
+        return self.reports()
+
+    def reports(self, now=None):
+        """
+        Iterate over the current observations that aren't stale.
+
+        The table isn't copied, so the store must not be updated while the
+        iteration is in progress.
+        """
+        cutoff = self._cutoff(now)
+        for key, report in self._latest.values():
+            if cutoff is None or report.time >= cutoff:
+                yield report
+
+    def expire(self, now=None):
+        """
+        Remove stale observations, and return the number removed.
+
+        The stations are checked in the order in which they were last
+        updated, stopping at the first that isn't stale, so that each call
+        costs time in proportion to the number of entries removed.  A stale
+        observation that was received after a fresher one stays in the table
+        until a later call, but is hidden by get() and reports().
+        """
+        cutoff = self._cutoff(now)
+        if cutoff is None:
+            return 0
+        latest = self._latest
+        stale = []
+        for station_id, (key, report) in latest.items():
+            if report.time >= cutoff:
+                break
+            stale.append(station_id)
+        for station_id in stale:
+            del latest[station_id]
+        return len(stale)
+
+    def clear(self):
+        """Remove all of the observations."""
+        self._latest.clear()
+        self.latest_time = None
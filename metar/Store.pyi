@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from metar.Metar import Metar, MetarParser
+
+def _utcnow() -> datetime: ...
+def _precedence(report: Metar) -> Tuple[datetime, bool, int]: ...
+
+class ObservationStore:
+    max_age: Optional[timedelta]
+    clock: Callable[[], Optional[datetime]]
+    latest_time: Optional[datetime]
+    _parser: MetarParser
+    _latest: Dict[str, Tuple[Tuple[datetime, bool, int], Metar]]
+
+    def __init__(
+        self,
+        max_age: Union[timedelta, float, None] = ...,
+        clock: Union[Callable[[], datetime], str, None] = ...,
+        **kwargs: Any,
+    ) -> None: ...
+    def update(self, report: Union[Metar, str]) -> bool: ...
+    def update_many(self, reports: Iterable[Union[Metar, str]]) -> int: ...
+    def _latest_time(self) -> Optional[datetime]: ...
+    def _cutoff(self, now: Optional[datetime]) -> Optional[datetime]: ...
+    def get(
+        self,
+        station_id: str,
+        default: Optional[Metar] = ...,
+        now: Optional[datetime] = ...,
+    ) -> Optional[Metar]: ...
+    def __getitem__(self, station_id: str) -> Metar: ...
+    def __contains__(self, station_id: object) -> bool: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Metar]: ...
+    def reports(self, now: Optional[datetime] = ...) -> Iterator[Metar]: ...
+    def expire(self, now: Optional[datetime] = ...) -> int: ...
+    def clear(self) -> None: ...
@@ -0,0 +1,339 @@
+# Copyright (c) 2004,2018 Python-Metar Developers.
+# Distributed under the terms of the BSD 2-Clause License.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Generate synthetic METAR and SPECI reports for load and scaling tests.
+
+The reports are built from the groups recognized by the handler tables in
+metar.Metar, so that every generated report can be fully decoded.  The
+output depends only on the seed and the mix ratios, so two runs with the
+same arguments produce exactly the same reports.
+
+    >>> from metar import Synthetic
+    >>> reports = Synthetic.generate(1000, seed=42, mix={"us": 0.8})
+"""
+import random
+
+# Probability of each optional feature of a generated report.
+DEFAULT_MIX = {
+    "us": 0.5,  # US (FMH-1) style report, otherwise WMO style
+    "speci": 0.1,  # SPECI rather than METAR
+    "cor": 0.03,  # corrected report
+    "auto": 0.3,  # automated station
+    "nil": 0.01,  # missing report (NIL)
+    "gust": 0.25,  # wind gusts
+    "variable": 0.15,  # variable wind direction range
+    "calm": 0.05,  # calm wind
+    "fraction": 0.15,  # fractional statute-mile visibility (US)
+    "cavok": 0.2,  # CAVOK (WMO)
+    "rvr": 0.08,  # runway visual range
+    "weather": 0.35,  # present weather
+    "convective": 0.15,  # CB or TCU cloud layer
+    "recent": 0.05,  # recent weather (WMO)
+    "windshear": 0.03,  # wind shear (WMO)
+    "runway_state": 0.03,  # runway state (WMO)
+    "color": 0.03,  # military colour state (WMO)
+    "trend": 0.4,  # trend forecast (WMO)
+    "remarks": 0.9,  # remarks section (US)
+    "peak_wind": 0.1,  # peak wind remark (US)
+    "wind_shift": 0.05,  # wind shift remark (US)
+    "lightning": 0.05,  # lightning and thunderstorm location remarks (US)
+    "precip": 0.3,  # precipitation remarks (US)
+    "synoptic": 0.25,  # 3- and 6-hourly remark groups (US)
+    "snowdepth": 0.05,  # snow depth remark (US)
+    "ice": 0.03,  # ice accretion remark (US)
+}
+
+US_PREFIXES = ["K", "K", "K", "K", "PA", "PH", "TJ"]
+WMO_PREFIXES = ["EG", "ED", "LF", "LO", "EK", "LI", "RJ", "WS", "YS", "ZB", "SB"]
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+WEATHER = [
+    "-RA",
+    "RA",
+    "+RA",
+    "-SN",
+    "SN",
+    "+SN",
+    "-DZ",
+    "FZDZ",
+    "-FZRA",
+    "-SHRA",
+    "SHRA",
+    "+SHRA",
+    "SHSN",
+    "TS",
+    "TSRA",
+    "+TSRA",
+    "-TSRAGR",
+    "VCTS",
+    "VCSH",
+    "-RASN",
+    "BR",
+    "FG",
+    "HZ",
+    "FU",
+    "BLSN",
+    "DRSN",
+    "MIFG",
+    "BCFG",
+    "SQ",
+    "UP",
+]
+OBSCURATION = ["BR", "FG", "HZ"]
+RECENT = ["RERA", "RETSRA", "RESN", "RESHRA", "REFZRA"]
+FRACTIONS = ["M1/4", "1/4", "1/2", "3/4", "1", "1 1/4", "1 1/2", "2", "2 1/2", "3"]
+WMO_VIS = ["0800", "1500", "2500", "4000", "6000", "8000", "9999", "9999", "9999"]
+COVER = ["FEW", "SCT", "BKN", "OVC"]
+CONVECTIVE = ["CB", "TCU"]
+COLORS = ["BLU", "WHT", "GRN", "RED", "BLU+", "BLACKRED"]
+LIGHTNING_FREQ = ["", "OCNL ", "FRQ ", "CONS "]
+LIGHTNING_TYPE = ["IC", "CG", "ICCG", "ICCCCG", "CC", ""]
+LOCATIONS = ["OHD", "VC", "DSNT NE", "DSNT W", "NW", "N-E", "OHD AND SE"]
+COMPASS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+
+
+class ReportGenerator(object):
+    """A seeded source of synthetic METAR/SPECI reports."""
+
+    def __init__(self, seed=0, mix=None):
+        """
+        Parameters
+        ----------
+        seed : int
+          Seed for the random number generator.
+        mix : dict, optional
+          Probabilities (0..1) overriding the entries of DEFAULT_MIX.
+        """
+        self.random = random.Random(seed)
+        self.mix = dict(DEFAULT_MIX)
+        if mix:
+            for key, value in mix.items():
+                if key not in DEFAULT_MIX:
+                    raise ValueError("unrecognized mix ratio: '" + key + "'")
+                if not 0.0 <= value <= 1.0:
+                    raise ValueError("mix ratio must be 0..1: '" + key + "'")
+                self.mix[key] = value
+
+    def _chance(self, key):
+        return self.random.random() < self.mix[key]
+
+    def _choice(self, seq):
+        return self.random.choice(seq)
+
+    def _int(self, low, high):
+        return self.random.randint(low, high)
+
+    def _signed(self, value):
+        """Encode a value in tenths as a sign digit and three digits."""
+        return "%d%03d" % (value < 0, abs(value))
+
+    def _temp(self, value):
+        """Encode a whole-degree temperature for the body of the report."""
+        if value < 0:
+            return "M%02d" % -value
+        return "%02d" % value
+
+    def _station(self, us):
+        prefix = self._choice(US_PREFIXES if us else WMO_PREFIXES)
+        while len(prefix) < 4:
+            prefix += self._choice(LETTERS)
+        return prefix
+
+    def _wind(self, units):
+        if self._chance("calm"):
+            return "00000" + units
+        speed = self._int(3, 35)
+        if speed < 7 and self.random.random() < 0.3:
+            direction = "VRB"
+        else:
+            direction = "%03d" % (self._int(1, 36) * 10)
+        text = "%s%02d" % (direction, speed)
+        if self._chance("gust"):
+            text += "G%02d" % (speed + self._int(8, 25))
+        text += units
+        if direction != "VRB" and self._chance("variable"):
+            start = self._int(0, 35) * 10
+            end = (start + self._int(6, 15) * 10) % 360
+            text += " %03dV%03d" % (start, end)
+        return text
+
+    def _weather(self):
+        groups = [self._choice(WEATHER)]
+        if self.random.random() < 0.3 and groups[0] not in OBSCURATION:
+            groups.append(self._choice(OBSCURATION))
+        return groups
+
+    def _sky(self, us):
+        if us and self.random.random() < 0.25:
+            return ["CLR"]
+        if not us and self.random.random() < 0.1:
+            return ["NSC"]
+        if self.random.random() < 0.03:
+            return ["VV%03d" % self._int(1, 5)]
+        groups = []
+        height = 0
+        for cover in COVER[: self._int(1, 4)]:
+            if self.random.random() < 0.4 and groups:
+                continue
+            height += self._int(2, 40)
+            group = "%s%03d" % (cover, height)
+            if self._chance("convective"):
+                group += self._choice(CONVECTIVE)
+            groups.append(group)
+        return groups
+
+    def _trend(self):
+        if self.random.random() < 0.4:
+            return ["NOSIG"]
+        groups = [self._choice(["BECMG", "TEMPO"])]
+        if self.random.random() < 0.5:
+            start = self._int(0, 22)
+            groups.append("FM%02d00" % start)
+            groups.append("TL%02d00" % (start + 1))
+        if self.random.random() < 0.3:
+            groups.append(self._wind("KT"))
+        if self.random.random() < 0.6:
+            groups.append(self._choice(WMO_VIS))
+        if self.random.random() < 0.5:
+            groups.append(self._choice(WEATHER + ["NSW"]))
+        if self.random.random() < 0.6:
+            groups.extend(self._sky(False))
+        if self._chance("color"):
+            groups.append(self._choice(COLORS))
+        return groups
+
+    def _remarks(self, temp, dewpt, hour, minute):
+        groups = ["RMK", self._choice(["AO1", "AO2", "AO2"])]
+        if self._chance("peak_wind"):
+            groups.append(
+                "PK WND %03d%02d/%02d%02d"
+                % (self._int(1, 36) * 10, self._int(26, 60), hour, self._int(0, minute))
+            )
+        if self._chance("wind_shift"):
+            groups.append("WSHFT %02d" % self._int(0, minute))
+            if self.random.random() < 0.5:
+                groups.append("FROPA")
+        if self._chance("lightning"):
+            text = "%sLTG%s" % (
+                self._choice(LIGHTNING_FREQ),
+                self._choice(LIGHTNING_TYPE),
+            )
+            groups.append(text + " " + self._choice(LOCATIONS))
+            text = "TS " + self._choice(LOCATIONS)
+            if self.random.random() < 0.5:
+                text += " MOV " + self._choice(COMPASS)
+            groups.append(text)
+        groups.append("SLP%03d" % self._int(0, 999))
+        if self._chance("precip"):
+            groups.append("P%04d" % self._int(0, 120))
+            if self.random.random() < 0.5:
+                groups.append("6%04d" % self._int(0, 300))
+            if self.random.random() < 0.2:
+                groups.append("7%04d" % self._int(0, 500))
+        if self._chance("snowdepth"):
+            groups.append("4/%03d" % self._int(1, 40))
+        if self._chance("ice"):
+            groups.append("I%d%03d" % (self._choice([1, 3, 6]), self._int(1, 25)))
+        tenths = temp * 10 + self._int(-4, 4)
+        dew_tenths = min(tenths, dewpt * 10 + self._int(-4, 4))
+        groups.append("T" + self._signed(tenths) + self._signed(dew_tenths))
+        if self._chance("synoptic"):
+            groups.append("1" + self._signed(tenths + self._int(0, 40)))
+            groups.append("2" + self._signed(tenths - self._int(0, 40)))
+            groups.append("5%d%03d" % (self._int(0, 8), self._int(0, 60)))
+            if self.random.random() < 0.2:
+                groups.append(
+                    "4"
+                    + self._signed(tenths + self._int(20, 80))
+                    + self._signed(tenths - self._int(20, 80))
+                )
+        return groups
+
+    def report(self):
+        """Return a single synthetic report."""
+        us = self._chance("us")
+        groups = []
+        if self._chance("speci"):
+            groups.append("SPECI")
+        elif self.random.random() < 0.8:
+            groups.append("METAR")
+        cor = self._chance("cor")
+        if cor and not us and groups:
+            groups.append("COR")
+        groups.append(self._station(us))
+        day = self._int(1, 28)
+        hour = self._int(0, 23)
+        minute = self._int(50, 56) if us else self._choice([0, 20, 30, 50])
+        groups.append("%02d%02d%02dZ" % (day, hour, minute))
+        if self._chance("nil"):
+            groups.append("NIL")
+            return " ".join(groups)
+        if cor and us:
+            groups.append("COR")
+        elif self._chance("auto"):
+            groups.append("AUTO")
+
+        groups.append(self._wind("KT" if us or self.random.random() < 0.9 else "MPS"))
+        cavok = not us and self._chance("cavok")
+        if cavok:
+            groups.append("CAVOK")
+        elif us:
+            if self._chance("fraction"):
+                groups.append(self._choice(FRACTIONS) + "SM")
+            else:
+                groups.append("%dSM" % self._choice([4, 5, 6, 7, 8, 9, 10, 10, 10]))
+        else:
+            groups.append(self._choice(WMO_VIS))
+        if not cavok:
+            if self._chance("rvr"):
+                name = "%02d%s" % (self._int(1, 36), self._choice(["", "L", "R", "C"]))
+                low = self._int(3, 19) * 100
+                if us:
+                    high = low + self._int(2, 20) * 100
+                    groups.append("R%s/%04dV%04dFT" % (name, low, high))
+                else:
+                    groups.append("R%s/%04d%s" % (name, low, self._choice("UDN")))
+            if self._chance("weather"):
+                groups.extend(self._weather())
+            groups.extend(self._sky(us))
+
+        temp = self._int(-25, 35)
+        dewpt = temp - self._int(0, 12)
+        groups.append("%s/%s" % (self._temp(temp), self._temp(dewpt)))
+        if us:
+            groups.append("A%04d" % self._int(2890, 3090))
+        else:
+            groups.append("Q%04d" % self._int(980, 1040))
+            if self._chance("recent"):
+                groups.append(self._choice(RECENT))
+            if self._chance("windshear"):
+                runway = "WS R%02dL" % self._int(1, 36)
+                groups.append(self._choice([runway, "WS ALL RWY"]))
+            if self._chance("color"):
+                groups.append(self._choice(COLORS))
+            if self._chance("runway_state"):
+                groups.append(
+                    "R%02d/%d%d%02d%02d"
+                    % (
+                        self._int(1, 36),
+                        self._int(0, 9),
+                        self._choice([1, 2, 5, 9]),
+                        self._int(0, 20),
+                        self._int(20, 95),
+                    )
+                )
+            if self._chance("trend"):
+                groups.extend(self._trend())
+        if us and self._chance("remarks"):
+            groups.extend(self._remarks(temp, dewpt, hour, minute))
+        return " ".join(groups)
+
+    def reports(self, count):
+        """Generate the given number of synthetic reports."""
+        for _ in range(count):
+            yield self.report()
+
+
+def generate(count, seed=0, mix=None):
+    """Return a list of count synthetic reports."""
+    return list(ReportGenerator(seed, mix).reports(count))
@@ -0,0 +1,16 @@
+import random
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_MIX: Dict[str, float]
+
+class ReportGenerator:
+    random: random.Random
+    mix: Dict[str, float]
+
+    def __init__(self, seed: int = 0, mix: Optional[Dict[str, float]] = None): ...
+    def report(self) -> str: ...
+    def reports(self, count: int) -> Iterator[str]: ...
+
+def generate(
+    count: int, seed: int = 0, mix: Optional[Dict[str, float]] = None
+) -> List[str]: ...
@@ -28,23 +28,35 @@ __author__ = "Tom Pollard"
 
 __email__ = "pollard@alum.mit.edu"
 
-__version__ = "0.0.0"  # Default
 try:
     # Exists after installation via scm write_to
     from ._version import version as __version__
 except ImportError:
-    from importlib.metadata import version, PackageNotFoundError
-    try:
-        __version__ = version("metar")
-    except PackageNotFoundError:
-        pass
+    # Looked up in the package metadata when it's first used (see
+    # __getattr__), since importing importlib.metadata is slow.
+    pass
 
-__doc__ = """metar v%s (c) 2009, %s
+
+def __getattr__(name):
+    global __version__
+    if name == "__version__":
+        from importlib.metadata import version, PackageNotFoundError
+
+        try:
+            __version__ = version("metar")
+        except PackageNotFoundError:
+            __version__ = "0.0.0"  # Default
+        return __version__
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+# the version isn't part of the docstring, since it's only looked up when
+# it's used
+__doc__ = """metar (c) 2009, %s
 
 Metar is a python package that interprets coded METAR and SPECI weather reports.
 
 Please e-mail bug reports to: %s""" % (
-    __version__,
     __author__,
     __email__,
 )
@@ -7,10 +7,7 @@ from __future__ import print_function
 import sys
 import os
 from metar import Metar
-import string
 import getopt
-import profile
-import pstats
 
 
 def usage():
@@ -80,7 +77,9 @@ def process_files(files):
 
 if files:
     if prof:
-        profile.run("process_files(files)")
+        import cProfile
+
+        cProfile.run("process_files(files)", "metar.prof")
     else:
         process_files(files)
 else:
@@ -94,6 +93,8 @@ else:
         except KeyboardInterrupt:
             break
 
-if prof:
-    ps = pstats.load("metar.prof")
-    print(ps.strip_dirs().sort_stats("time").print_stats())
+if prof and files:
+    import pstats
+
+    ps = pstats.Stats("metar.prof")
+    ps.strip_dirs().sort_stats("time").print_stats(20)
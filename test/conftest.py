@@ -0,0 +1,20 @@
+"""Fixtures shared by the tests."""
+import pytest
+
+from metar import Backend
+
+
+@pytest.fixture(
+    params=[
+        False,
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(
+                Backend.np is None, reason="NumPy is not installed"
+            ),
+        ),
+    ]
+)
+def use_numpy(request):
+    """Run a test with the pure-python and (if installed) NumPy backends."""
+    return request.param
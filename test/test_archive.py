@@ -0,0 +1,204 @@
+"""Test metar/Archive.py."""
+import os
+
+import pytest
+
+from metar import Archive, Synthetic
+
+REPORTS = [
+    "2005/01/11 18:51",
+    "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    "KJFK 111851Z 29028KT 10SM 22/22 A2987",
+    "",
+    "SPECI KEWR 111912Z 29028KT 2SM BR 22/22 A2987",
+    "KLGA NIL",
+]
+
+
+def _write(path, lines, mode="w"):
+    with open(path, mode) as fh:
+        for line in lines:
+            fh.write(line + "\n")
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "reports.txt")
+    _write(path, REPORTS)
+    return path
+
+
+def test_build_and_read(archive):
+    """The index maps stations and times to the offsets of their lines."""
+    index = Archive.ArchiveIndex(archive)
+    assert index.update() == 4
+    assert os.path.exists(archive + ".idx")
+    assert index.stations() == ["KEWR", "KJFK", "KLGA"]
+    assert len(index) == 4
+    assert list(index.lines("KEWR")) == [REPORTS[1], REPORTS[4]]
+    assert [time for time, offset in index.entries("KEWR")] == [
+        (11, 18, 51),
+        (11, 19, 12),
+    ]
+    assert index.entries("KLGA")[0][0] is None
+    assert list(index.lines("KXYZ")) == []
+    [report] = index.reports("KJFK")
+    assert report.temp.value() == 22
+
+    # a new object reads the sidecar instead of scanning the archive
+    reopened = Archive.ArchiveIndex(archive)
+    reopened.load()
+    assert reopened.size == os.path.getsize(archive)
+    assert reopened.entries("KEWR") == index.entries("KEWR")
+    assert reopened.update() == 0
+
+
+def test_incremental_update(archive):
+    """Appended lines are indexed without rescanning the archive."""
+    index = Archive.ArchiveIndex(archive)
+    index.update()
+    size = os.path.getsize(archive + ".idx.dat")
+    _write(archive, ["KEWR 111951Z 29028KT 10SM 22/22 A2987"], "a")
+    # a line that is still being written is left for the next update
+    with open(archive, "a") as fh:
+        fh.write("KJFK 1119")
+    assert Archive.ArchiveIndex(archive).update() == 1
+    assert os.path.getsize(archive + ".idx.dat") > size
+    with open(archive, "a") as fh:
+        fh.write("51Z 29028KT 10SM 22/22 A2987\n")
+
+    index = Archive.ArchiveIndex(archive)
+    assert index.update() == 1
+    assert len(index) == 6
+    assert list(index.lines("KJFK"))[-1].startswith("KJFK 111951Z")
+    assert len(list(index.lines("KEWR"))) == 3
+
+
+def test_rewritten_archive(archive):
+    """The index is rebuilt if the archive is truncated."""
+    index = Archive.ArchiveIndex(archive)
+    index.update()
+    _write(archive, REPORTS[2:3])
+    assert index.update() == 1
+    assert index.stations() == ["KJFK"]
+    assert Archive.ArchiveIndex(archive).update() == 0
+
+
+@pytest.mark.parametrize(
+    "lines, stations",
+    [
+        # the same size, with a different first report
+        (
+            [REPORTS[0], REPORTS[1].replace("KEWR", "KTEB")] + REPORTS[2:],
+            ["KEWR", "KJFK", "KLGA", "KTEB"],
+        ),
+        # rotated: a new archive, longer than the indexed one
+        ([REPORTS[2].replace("KJFK", "KBOS")] * 6, ["KBOS"]),
+    ],
+)
+def test_replaced_archive(archive, lines, stations):
+    """The index is rebuilt if the archive is rewritten at the same size."""
+    index = Archive.ArchiveIndex(archive)
+    index.update()
+    size = os.path.getsize(archive)
+    _write(archive, lines)
+    assert os.path.getsize(archive) >= size
+    index = Archive.ArchiveIndex(archive)
+    assert index.update() == len(index)
+    assert index.stations() == stations
+    read = [line for station in stations for line in index.lines(station)]
+    assert sorted(read) == sorted(line for line in lines if line[:1].isalpha())
+
+
+def test_reads_one_station(archive, monkeypatch):
+    """Reading a station reads its own entries, and only the station
+    directory is loaded."""
+    index = Archive.ArchiveIndex(archive)
+    index.update()
+    assert os.path.getsize(archive + ".idx.dat") == 4 * Archive._ENTRY_SIZE
+    read = []
+    read_entry = Archive._read_entry
+
+    def counting(fh):
+        read.append(fh.tell())
+        return read_entry(fh)
+
+    monkeypatch.setattr(Archive, "_read_entry", counting)
+    reopened = Archive.ArchiveIndex(archive)
+    reopened.load()
+    assert read == []
+    assert list(reopened.lines("KEWR")) == [REPORTS[1], REPORTS[4]]
+    assert len(read) == 2
+
+
+def test_interrupted_update(archive):
+    """Entries written by an interrupted update are dropped."""
+    index = Archive.ArchiveIndex(archive)
+    index.update()
+    with open(archive + ".idx.dat", "ab") as fh:
+        fh.write(b"\x01" * (Archive._ENTRY_SIZE + 5))
+    index = Archive.ArchiveIndex(archive)
+    index.load()
+    assert len(index) == 4
+    _write(archive, ["KEWR 111951Z 29028KT 10SM 22/22 A2987"], "a")
+    assert index.update() == 1
+    reopened = Archive.ArchiveIndex(archive)
+    reopened.load()
+    assert len(reopened) == 5
+    assert len(list(reopened.lines("KEWR"))) == 3
+    assert os.path.getsize(archive + ".idx.dat") == 5 * Archive._ENTRY_SIZE
+
+
+def test_interrupted_first_update(archive, monkeypatch):
+    """An index interrupted before it was written is rebuilt."""
+
+    def fsync(fd):
+        raise OSError("interrupted")
+
+    monkeypatch.setattr(Archive.os, "fsync", fsync)
+    with pytest.raises(OSError):
+        Archive.ArchiveIndex(archive).update()
+    monkeypatch.undo()
+    assert os.path.getsize(archive + ".idx.dat") > 0
+    assert not os.path.exists(archive + ".idx")
+    index = Archive.ArchiveIndex(archive)
+    assert index.update() == 4
+    assert list(index.lines("KEWR")) == [REPORTS[1], REPORTS[4]]
+
+
+@pytest.mark.parametrize("length", [0, 1, 20, 60, -4, None])
+def test_truncated_index(archive, length):
+    """An index truncated while it was written is rebuilt."""
+    Archive.ArchiveIndex(archive).update()
+    with open(archive + ".idx", "r+b") as fh:
+        data = fh.read()
+        if length is None:
+            # at the end of a line
+            length = data.index(b"\n") + 1
+        fh.truncate(length % len(data))
+    index = Archive.ArchiveIndex(archive)
+    assert index.update() == 4
+    reopened = Archive.ArchiveIndex(archive)
+    reopened.load()
+    assert reopened.entries("KEWR") == index.entries("KEWR")
+    with open(archive + ".idx", "rb") as fh:
+        assert fh.read() == data
+
+
+def test_not_an_index(archive):
+    """A sidecar that isn't an index is left alone."""
+    with open(archive + ".idx", "w") as fh:
+        fh.write("something else\n")
+    with pytest.raises(ValueError):
+        Archive.ArchiveIndex(archive).load()
+
+
+def test_many_reports(tmp_path):
+    """Every report of a larger archive can be read back by station."""
+    path = str(tmp_path / "synthetic.txt")
+    lines = Synthetic.generate(2000, seed=4)
+    _write(path, lines)
+    index = Archive.ArchiveIndex(path)
+    assert index.update() == len(lines)
+    read = sorted(line for station in index.stations() for line in index.lines(station))
+    assert read == sorted(lines)
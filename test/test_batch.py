@@ -0,0 +1,100 @@
+"""Test metar/Batch.py, and the thread safety of the parser."""
+import datetime
+import threading
+
+import pytest
+
+from metar import Batch, Metar, Synthetic
+from metar.Stats import ParserStats
+
+NOW = datetime.datetime(2005, 1, 31, 12, 0)
+LINES = Synthetic.generate(1000, seed=9)
+
+
+def _summary(report):
+    """Return everything decoded from a report, as text."""
+    return (
+        report.string(),
+        report._unparsed_groups,
+        report._unparsed_remarks,
+        [(d.kind, d.handler, d.offset, d.text) for d in report.diagnostics],
+    )
+
+
+SEQUENTIAL = [
+    _summary(Metar.Metar(line, now=NOW, diagnostics=True)) for line in LINES
+]
+
+
+@pytest.mark.parametrize("workers,chunk_size", [(1, 1000), (4, 7), (8, 64)])
+def test_parse_many(workers, chunk_size):
+    """Batches give the same reports, in the same order, as a sequential run."""
+    reports = Batch.parse_many(
+        LINES, workers=workers, chunk_size=chunk_size, now=NOW, diagnostics=True
+    )
+    assert [_summary(report) for report in reports] == SEQUENTIAL
+
+
+def test_iter_parse_options():
+    """Limits and stats are passed on; errors are raised in order."""
+    stats = ParserStats()
+    reports = list(
+        Batch.iter_parse(
+            iter(LINES[:100]),
+            workers=3,
+            chunk_size=9,
+            diagnostics=True,
+            max_groups=5,
+            stats=stats,
+        )
+    )
+    assert len(reports) == 100
+    assert any(report.diagnostics for report in reports)
+    assert stats.reports == 100
+
+    lines = ["KEWR 111851Z 29028KT 10SM 22/22 A2987", "KEWR 111851Z 00000KT FOO"]
+    with pytest.raises(Metar.ParserError):
+        Batch.parse_many(lines * 10, workers=2, chunk_size=3)
+    with pytest.raises(ValueError):
+        Batch.parse_many(lines, chunk_size=0)
+
+
+def test_concurrent_stress(monkeypatch):
+    """Threads parsing at once, while the debug flag changes, agree with a
+    sequential run."""
+    nthreads = 8
+    barrier = threading.Barrier(nthreads + 1)
+    results = [None] * nthreads
+    errors = []
+
+    def rotated(items, index):
+        """Start each thread at a different report."""
+        start = index * len(items) // nthreads
+        return items[start:] + items[:start]
+
+    def work(index):
+        try:
+            barrier.wait()
+            results[index] = [
+                _summary(Metar.Metar(line, now=NOW, diagnostics=True))
+                for line in rotated(LINES, index)
+            ]
+        except Exception as exc:  # pragma: no cover
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(nthreads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    for _ in range(50):
+        monkeypatch.setattr(Metar, "debug", not Metar.debug)
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    for index, result in enumerate(results):
+        assert result == rotated(SEQUENTIAL, index)
+
+
+def test_free_threaded():
+    """The build is detected without error."""
+    assert Batch.free_threaded() in (True, False)
@@ -0,0 +1,150 @@
+"""Test metar/Cache.py."""
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+from metar import Batch, Metar, Synthetic
+from metar.Cache import HANDLERS, GroupCache
+from metar.Stats import ParserStats
+
+NOW = datetime(2005, 1, 31)
+
+
+def _plain(value):
+    """A decoded value, with the Datatypes objects as strings."""
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool, datetime)):
+        return value
+    return type(value).__name__, str(value)
+
+
+def _decoded(report):
+    """The decoded fields of a report, as comparable values."""
+    fields = {}
+    for name in dir(Metar.Metar):
+        if name.startswith("__") or name.endswith("handlers"):
+            continue
+        value = getattr(report, name)
+        if not callable(value):
+            fields[name] = _plain(value)
+    fields["string"] = report.string()
+    return fields
+
+
+def _corpus():
+    """Synthetic reports, and copies with groups inserted at random."""
+    rng = random.Random(5)
+    codes = Synthetic.generate(600, seed=11)
+    words = ["FOO", "////", "9999", "RMK", "A29", "BKN", "R12/", "M1/2SM", "12/"]
+    for code in codes[:300]:
+        groups = code.split()
+        for _ in range(rng.randint(1, 3)):
+            groups.insert(rng.randint(1, len(groups)), rng.choice(words + groups))
+        codes.append(" ".join(groups))
+    return codes
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("maxsize", [4, 2048])
+def test_results_unchanged(maxsize):
+    """Reports are decoded as without the cache."""
+    cache = GroupCache(maxsize)
+    for code in _corpus():
+        plain = Metar.Metar(code, strict=False, now=NOW, diagnostics=True)
+        cached = Metar.Metar(code, strict=False, now=NOW, diagnostics=True, cache=cache)
+        assert _decoded(cached) == _decoded(plain)
+    assert cache.snapshot()["hits"] > 0
+    assert all(len(entries.groups) <= maxsize for entries in cache._entries.values())
+
+
+def test_hit_rates():
+    """The hits and misses are counted for each handler."""
+    cache = GroupCache()
+    parser = Metar.MetarParser(now=NOW, cache=cache)
+    for code in Synthetic.generate(200, seed=1, mix={"us": 1.0}):
+        parser.parse(code)
+    rates = cache.hit_rates()
+    assert set(rates) == set(HANDLERS)
+    assert rates["_handleVisibility"] > 0.5
+    assert rates["_handleRecent"] == 0.0
+    snapshot = cache.snapshot()
+    assert snapshot["groups"] == len(cache) > 0
+    assert snapshot["hits"] == sum(entry["hits"] for entry in snapshot["handlers"])
+    json.dumps(snapshot)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.snapshot()["hits"] == cache.snapshot()["misses"] == 0
+
+
+def test_shared_values():
+    """Cached values are shared, but the lists of the reports aren't."""
+    cache = GroupCache()
+    code = "KEWR 111851Z 00000KT 10SM FEW020 22/12 A3002"
+    first, second, third = [Metar.Metar(code, now=NOW, cache=cache) for _ in "abc"]
+    assert third.temp is second.temp and third.temp is not first.temp
+    assert third.sky == second.sky
+    assert third.sky is not second.sky
+    third.sky.append(("OVC", None, ""))
+    assert len(second.sky) == 1
+
+
+def test_context():
+    """Groups whose decoding depends on the report are cached separately."""
+    cache = GroupCache()
+    for _ in range(3):
+        # wind speeds without units are in knots at US stations
+        us = Metar.Metar("KEWR 111851Z 27010 10SM 22/12 A3002", now=NOW, cache=cache)
+        other = Metar.Metar("EDDF 111850Z 27010 9999 22/12 Q1012", now=NOW, cache=cache)
+        assert us.wind_speed.string() == "10 knots"
+        assert other.wind_speed.string() == "10 mps"
+
+        # a second visibility group is the maximum visibility
+        report = Metar.Metar(
+            "EDDF 111850Z 27010KT 4000 9999 22/12 Q1012", now=NOW, cache=cache
+        )
+        assert report.vis.value() == 4000
+        assert report.max_vis.value() == 10000
+
+
+def test_handlers():
+    """The cached handlers can be chosen."""
+    cache = GroupCache(handlers=["_handleTemp"])
+    for _ in range(3):
+        Metar.Metar("KEWR 111851Z 00000KT 10SM CLR 22/12 A3002", now=NOW, cache=cache)
+    assert cache.hit_rates() == {"_handleTemp": 1 / 3}
+    with pytest.raises(ValueError):
+        GroupCache(handlers=["_handleTime"])
+    with pytest.raises(ValueError):
+        GroupCache(maxsize=0)
+
+
+def test_with_stats_and_threads():
+    """A cache can be shared by instrumented parsers in several threads."""
+    cache = GroupCache()
+    stats = ParserStats()
+    codes = Synthetic.generate(200, seed=2)
+    expected = [Metar.Metar(code, now=NOW).string() for code in codes]
+    reports = [Metar.Metar(code, now=NOW, stats=stats, cache=cache) for code in codes]
+    assert [report.string() for report in reports] == expected
+    reports = Batch.parse_many(
+        codes, workers=4, chunk_size=8, now=NOW, stats=stats, cache=cache
+    )
+    assert [report.string() for report in reports] == expected
+    # the handlers wrapped by each ParserStats share the cached groups
+    assert len(cache._entries) == len(HANDLERS)
+    assert cache.hit_rates()["_handleSky"] > 0.3
+
+
+def test_handler_error():
+    """A group that can't be decoded is decoded as far as without the cache."""
+    cache = GroupCache()
+    code = "KEWR 111851Z 99910KT 10SM 22/12 A3002"
+    plain = Metar.Metar(code, now=NOW, diagnostics=True)
+    assert plain.diagnostics[0].handler == "_handleWind"
+    for _ in range(3):
+        cached = Metar.Metar(code, now=NOW, diagnostics=True, cache=cache)
+        assert _decoded(cached) == _decoded(plain)
@@ -0,0 +1,92 @@
+"""Test metar/Dedup.py."""
+import pytest
+
+from metar import Dedup, Synthetic
+
+REPORT = "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987"
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize(
+    "other,same",
+    [
+        ("KEWR 111851Z 29028KT 10SM 22/22 A2987", True),
+        ("  METAR  KEWR 111851Z 29028KT 10SM 22/22 A2987 =", True),
+        ("SPECI KEWR 111851Z 29028KT 10SM 22/22 A2987", False),
+        ("METAR COR KEWR 111851Z 29028KT 10SM 22/22 A2987", False),
+        ("METAR KEWR 111851Z AUTO 29028KT 10SM 22/22 A2987", False),
+        ("METAR KEWR 111852Z 29028KT 10SM 22/22 A2987", False),
+        ("METAR KJFK 111851Z 29028KT 10SM 22/22 A2987", False),
+        ("METAR KEWR 111851Z 29028KT 10SM 22/21 A2987", False),
+    ],
+)
+def test_fingerprint(other, same):
+    """Fingerprints ignore formatting, but not the content of the report."""
+    assert (Dedup.fingerprint(REPORT) == Dedup.fingerprint(other)) == same
+
+
+def test_filter_counts():
+    """Duplicates are dropped and counted."""
+    lines = Synthetic.generate(200, seed=6)
+    dedup = Dedup.Deduplicator()
+    assert list(dedup.filter(lines + lines[:50] + lines)) == lines
+    assert dedup.seen == 450
+    assert dedup.duplicates == 250
+    assert dedup.duplicate_rate == pytest.approx(250.0 / 450.0)
+    assert len(dedup) == 200
+    dedup.reset_counts()
+    assert dedup.duplicate_rate == 0.0
+
+
+def test_window():
+    """Fingerprints are forgotten after the window, or beyond the maximum."""
+    clock = Clock()
+    dedup = Dedup.Deduplicator(window=60, clock=clock)
+    assert dedup.check(REPORT)
+    clock.now = 50
+    assert not dedup.check(REPORT)  # seen again: held for another minute
+    clock.now = 100
+    assert not dedup.check(REPORT)
+    clock.now = 200
+    assert dedup.check("KJFK 111851Z 29028KT 10SM 22/22 A2987")
+    assert len(dedup) == 1
+    assert dedup.check(REPORT)
+
+    small = Dedup.Deduplicator(max_entries=10)
+    lines = Synthetic.generate(20, seed=7)
+    assert list(small.filter(lines)) == lines
+    assert len(small) == 10
+    assert small.check(lines[0])
+    assert not small.check(lines[-1])
+
+
+def test_bloom_horizon():
+    """The Bloom filter recognizes repeats after the exact set forgets them."""
+    lines = Synthetic.generate(500, seed=8)
+    dedup = Dedup.Deduplicator(max_entries=10, bloom_capacity=1000)
+    assert list(dedup.filter(lines)) == lines
+    assert list(dedup.filter(lines)) == []
+    assert dedup.bloom_duplicates == 500
+
+
+def test_bloom_filter():
+    """False positives are rare, and old generations are dropped."""
+    bloom = Dedup.BloomFilter(1000, 0.01)
+    digests = [Dedup.fingerprint("KEWR 11%04dZ" % i) for i in range(3000)]
+    for digest in digests[:1000]:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests[:1000])
+    false_positives = sum(digest in bloom for digest in digests[1000:])
+    assert false_positives < 0.03 * 2000
+    for digest in digests[1000:]:
+        bloom.add(digest)
+    assert sum(digest in bloom for digest in digests[:1000]) < 100
+    with pytest.raises(ValueError):
+        Dedup.BloomFilter(0)
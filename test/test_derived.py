@@ -0,0 +1,104 @@
+"""Test metar/Derived.py."""
+import math
+
+import pytest
+
+from metar import Backend, Derived, Metar
+
+REPORTS = [
+    "KEWR 111851Z 27010KT 10SM 30/20 A2987",
+    "KEWR 111951Z VRB03KT 10SM 29/M01 A2987",
+    "KEWR 112051Z 36015KT 10SM M18/M20 A2987",
+    "KEWR 112151Z 09005KT 10SM A2987",
+]
+
+
+def _c(f):
+    return (f - 32.0) / 1.8
+
+
+def _values(column):
+    """Return a result column as a list, with None for missing values."""
+    np = Backend.np
+    if np is not None and isinstance(column, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(column)
+        return [None if m else v for v, m in zip(column.data.tolist(), mask)]
+    return list(column)
+
+
+def test_relative_humidity(use_numpy):
+    """Relative humidity and dew point depression, with missing values."""
+    temps = [20.0, 30.0, None, float("nan"), -10.0]
+    dewpts = [20.0, 20.0, 10.0, 10.0, -20.0]
+    rh = _values(Derived.relative_humidity(temps, dewpts, use_numpy))
+    assert rh[0] == pytest.approx(100.0)
+    assert rh[1] == pytest.approx(55.1, abs=0.1)
+    assert rh[2:4] == [None, None]
+    assert rh[4] == pytest.approx(43.9, abs=0.1)
+    depression = _values(Derived.dewpoint_depression(temps, dewpts, use_numpy))
+    assert depression == [0.0, 10.0, None, None, 10.0]
+
+
+def test_heat_index(use_numpy):
+    """Heat index agrees with the NWS table."""
+    # 90 F at 70% and 80 F at 40% relative humidity; dew points in C
+    temps = [_c(90.0), _c(80.0), _c(60.0)]
+    dewpts = [_c(79.0), _c(54.0), _c(50.0)]
+    hi = _values(Derived.heat_index(temps, dewpts, use_numpy))
+    assert hi[0] * 1.8 + 32.0 == pytest.approx(105.5, abs=1.0)
+    assert hi[1] * 1.8 + 32.0 == pytest.approx(80.0, abs=1.0)
+    # below 80 F the heat index is close to the temperature
+    assert hi[2] * 1.8 + 32.0 == pytest.approx(59.0, abs=1.0)
+
+
+def test_wind_chill(use_numpy):
+    """Wind chill agrees with the NWS table, and is limited to its range."""
+    temps = [_c(0.0), _c(-20.0), _c(60.0), 0.0, None]
+    speeds = [15.0 / 1.150779, 30.0 / 1.150779, 20.0, 2.0, 10.0]
+    wc = _values(Derived.wind_chill(temps, speeds, use_numpy))
+    assert wc[0] * 1.8 + 32.0 == pytest.approx(-19.0, abs=0.5)
+    assert wc[1] * 1.8 + 32.0 == pytest.approx(-53.0, abs=0.5)
+    assert wc[2:] == [temps[2], 0.0, None]
+
+
+def test_wind_components(use_numpy):
+    """Components point downwind, and variable winds are missing."""
+    u, v = Derived.wind_components(
+        [10.0, 10.0, 0.0, 5.0], [360.0, 90.0, 0.0, None], use_numpy
+    )
+    u = _values(u)
+    v = _values(v)
+    assert u[:3] == pytest.approx([0.0, -10.0, 0.0], abs=1e-9)
+    assert v[:3] == pytest.approx([-10.0, 0.0, 0.0], abs=1e-9)
+    assert u[3] is None and v[3] is None
+
+
+def test_derive(use_numpy):
+    """derive() computes every quantity from decoded reports."""
+    reports = [Metar.Metar(code) for code in REPORTS]
+    data = Derived.columns(reports, use_numpy)
+    assert len(data["temp"]) == len(REPORTS)
+    wind_dir = data["wind_dir"][1]
+    assert math.isnan(wind_dir) if use_numpy else wind_dir is None
+    derived = Derived.derive(reports, use_numpy)
+    assert sorted(derived) == [
+        "dewpoint_depression",
+        "heat_index",
+        "relative_humidity",
+        "wind_chill",
+        "wind_u",
+        "wind_v",
+    ]
+    rh = _values(derived["relative_humidity"])
+    assert rh[0] == pytest.approx(55.1, abs=0.1)
+    assert rh[3] is None
+    assert _values(derived["wind_u"])[:2] == [pytest.approx(10.0), None]
+    assert _values(derived["wind_chill"])[2] < -18.0
+
+
+def test_numpy_unavailable(monkeypatch):
+    """Requesting NumPy when it is not installed is an error."""
+    monkeypatch.setattr(Backend, "np", None)
+    with pytest.raises(ImportError):
+        Derived.relative_humidity([20.0], [10.0], use_numpy=True)
+    assert len(Derived.relative_humidity([20.0], [10.0])) == 1
@@ -0,0 +1,155 @@
+"""Test metar/Diagnostics.py."""
+import json
+import warnings
+
+import pytest
+
+from metar import Metar
+from metar.Diagnostics import (
+    Diagnostic,
+    DiagnosticCounts,
+    HANDLER_ERROR,
+    LIMIT_EXCEEDED,
+    UNPARSED_GROUP,
+    UNPARSED_REMARK,
+)
+
+
+def _parse(code, **kwargs):
+    """Parse a report in diagnostics mode, failing on any warning."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        return Metar.Metar(code, diagnostics=True, **kwargs)
+
+
+def test_clean_report():
+    """A report that decodes completely has no diagnostics."""
+    report = _parse("METAR KEWR 111851Z 29028KT 10SM FEW015 22/22 A2987 RMK AO2")
+    assert report.diagnostics == []
+    assert report.decode_completed
+
+
+def test_unparsed_groups():
+    """Unparsed body groups are recorded with their offsets."""
+    code = "  METAR KEWR 111851Z 29028KT FOO BAR 10SM 22/22 A2987"
+    report = _parse(code)
+    assert report.diagnostics == [
+        Diagnostic(UNPARSED_GROUP, "_handleVisibility", 29, "FOO", None),
+        Diagnostic(UNPARSED_GROUP, "_handleVisibility", 33, "BAR", None),
+    ]
+    for diagnostic in report.diagnostics:
+        assert code[diagnostic.offset :].startswith(diagnostic.text)
+    assert not report.decode_completed
+    assert report.vis.value() == 10
+
+
+def test_unparsed_remarks():
+    """Unparsed remarks are recorded without a handler."""
+    code = "METAR KEWR 111851Z 29028KT 10SM RMK AO2 ZZZ SLP114"
+    report = _parse(code)
+    assert report.diagnostics == [
+        Diagnostic(UNPARSED_REMARK, None, code.index("ZZZ"), "ZZZ", None)
+    ]
+    assert report.press_sea_level.value() == 1011.4
+
+
+def test_handler_error():
+    """Exceptions raised by handlers are recorded instead of raised."""
+    code = "KEWR 101651Z 00000KT 10SM CLR 10/M02 A3002 RMK WSHFT 2599"
+    report = _parse(code)
+    [diagnostic] = report.diagnostics
+    assert diagnostic.kind == HANDLER_ERROR
+    assert diagnostic.handler == "_handleWindShiftRemark"
+    assert diagnostic.offset == code.index("WSHFT")
+    assert diagnostic.text == "WSHFT 2599 "
+    assert isinstance(diagnostic.error, ValueError)
+    assert report.press.value() == 30.02
+
+
+def test_counts():
+    """DiagnosticCounts tallies the diagnostics of many reports."""
+    counts = DiagnosticCounts()
+    for code in [
+        "METAR KEWR 111851Z 29028KT FOO BAR 10SM 22/22 A2987",
+        "METAR KEWR 111851Z 29028KT 10SM RMK AO2 ZZZ",
+        "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    ]:
+        counts.add(_parse(code))
+    assert counts.reports == 3
+    assert counts.failed_reports == 2
+    assert counts.count(UNPARSED_GROUP) == 2
+    assert counts.count(UNPARSED_GROUP, "_handleVisibility") == 2
+    assert counts.count(UNPARSED_REMARK) == 1
+    assert counts.count(HANDLER_ERROR) == 0
+
+    other = DiagnosticCounts()
+    other.add(_parse("METAR KEWR 111851Z 29028KT FOO"))
+    counts.merge(other)
+    snapshot = json.loads(json.dumps(counts.snapshot()))
+    assert snapshot["reports"] == 4
+    assert snapshot["failed_reports"] == 3
+    assert snapshot["kinds"] == {UNPARSED_GROUP: 3, UNPARSED_REMARK: 1}
+    assert {"kind": UNPARSED_REMARK, "handler": None, "count": 1} in snapshot[
+        "handlers"
+    ]
+
+    counts.reset()
+    assert counts.snapshot()["handlers"] == []
+
+
+LIMITED_REPORT = "METAR KEWR 111851Z 29028KT 10SM FEW015 22/22 A2987 RMK AO2 SLP114"
+
+
+@pytest.mark.parametrize(
+    "limits,offset",
+    [
+        ({"max_length": 30}, 27),
+        ({"max_length": 31}, 32),
+        ({"max_groups": 4}, 27),
+        ({"max_groups": 5, "max_length": 200}, 32),
+    ],
+)
+def test_size_limits(limits, offset):
+    """Reports that exceed the size limits are truncated to whole groups."""
+    report = _parse(LIMITED_REPORT, **limits)
+    [diagnostic] = report.diagnostics
+    assert diagnostic.kind == LIMIT_EXCEEDED
+    assert diagnostic.offset == offset
+    assert diagnostic.text in limits
+    assert report.wind_speed.value() == 28
+    assert report.temp is None
+
+    with pytest.raises(Metar.ParserError):
+        Metar.Metar(LIMITED_REPORT, **limits)
+    with pytest.warns(RuntimeWarning):
+        report = Metar.Metar(LIMITED_REPORT, strict=False, **limits)
+    assert report.wind_speed.value() == 28
+
+
+def test_within_limits():
+    """Reports within the limits are parsed as usual."""
+    report = _parse(
+        LIMITED_REPORT, max_length=len(LIMITED_REPORT), max_groups=12, time_budget=10
+    )
+    assert report.diagnostics == []
+    assert report.press_sea_level.value() == 1011.4
+
+
+def test_long_garbage_rejected_quickly():
+    """A megabyte-scale line is truncated without being scanned."""
+    code = "METAR KEWR 111851Z 29028KT " + "X" * 5000000
+    report = _parse(code, max_length=1000, max_groups=100)
+    assert [d.kind for d in report.diagnostics] == [LIMIT_EXCEEDED]
+    assert report.wind_speed.value() == 28
+
+
+def test_time_budget():
+    """Parsing stops once the time budget is exhausted."""
+    code = "METAR KEWR 111851Z 29028KT 10SM " + "BKN010 " * 200000 + "22/22"
+    report = _parse(code, time_budget=0.01)
+    [diagnostic] = report.diagnostics
+    assert diagnostic.kind == LIMIT_EXCEEDED
+    assert diagnostic.text == "time_budget"
+    assert 0 < len(report.sky) < 200000
+    assert code[diagnostic.offset :].startswith("BKN010")
+    assert report.temp is None
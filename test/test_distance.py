@@ -73,10 +73,14 @@ def test_conversions():
 
     assert abs(distance("10.5", "IN").value("M") - 0.27) < 0.01
     assert abs(distance("0.066", "KM").value("IN") - 2598.43) < 0.01
+    assert abs(distance("12", "IN").value("CM") - 30.48) < 0.01
+    assert abs(distance("50", "CM").value("IN") - 19.69) < 0.01
+    assert distance("250", "CM").value("M") == 2.5
 
     assert distance("1 1/2", "SM").string("SM") == "1 1/2 miles"
     assert distance("3/16", "SM").string("SM") == "3/16 miles"
     assert distance("1/4", "SM").string("FT") == "1320 feet"
     assert distance("1/4", "SM", "<").string("SM") == "less than 1/4 miles"
     assert distance("5280", "FT").string("KM") == "1.6 km"
+    assert distance("12", "IN").string("CM") == "30 cm"
     assert distance("10000", "M", ">").string("M") == "greater than 10000 meters"
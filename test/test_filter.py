@@ -0,0 +1,77 @@
+"""Test metar/Filter.py."""
+import datetime
+
+import pytest
+
+from metar import Filter, Metar, Synthetic
+from metar.Store import ObservationStore
+
+LINES = [
+    "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+    "SPECI KEWR 111912Z 29028KT 2SM BR 22/22 A2987",
+    "KJFK 112351Z 29028KT 10SM 22/22 A2987",
+    "METAR COR EGLL 120020Z 24015KT 9999 FEW030 12/05 Q1018",
+    "  LFPG 312350Z 27008KT 4000 -RA BKN008 08/07 Q1006",
+    "EDDF NIL",
+    "not a report",
+]
+
+
+@pytest.mark.parametrize(
+    "line,header",
+    [
+        (LINES[0], ("METAR", "KEWR", (11, 18, 51))),
+        (LINES[1], ("SPECI", "KEWR", (11, 19, 12))),
+        (LINES[2], ("METAR", "KJFK", (11, 23, 51))),
+        (LINES[3], ("METAR", "EGLL", (12, 0, 20))),
+        (LINES[4], ("METAR", "LFPG", (31, 23, 50))),
+        (LINES[5], ("METAR", "EDDF", None)),
+        (LINES[6], None),
+    ],
+)
+def test_read_header(line, header):
+    """Headers are read by slicing or by Metar.scan_header()."""
+    assert Filter.read_header(line) == header
+
+
+def test_headers_agree_with_parser():
+    """The header read by the filter agrees with the full parse."""
+    for line in Synthetic.generate(500, seed=3):
+        obs = Metar.Metar(line, strict=False, diagnostics=True)
+        rtype, station, time = Filter.read_header(line)
+        assert (rtype, station) == (obs.type, obs.station_id)
+        assert time == (obs._day, obs._hour, obs._min)
+
+
+def test_stations_and_types():
+    """Lines are selected by station and report type."""
+    wanted = Filter.ReportFilter(stations=["KEWR", "EGLL"])
+    assert list(wanted.filter(LINES)) == [LINES[0], LINES[1], LINES[3]]
+    assert wanted.seen == len(LINES)
+    assert wanted.passed == 3
+    assert wanted.skip_rate == pytest.approx(4.0 / 7.0)
+    wanted.reset()
+    assert wanted.skip_rate == 0.0
+
+    specials = Filter.ReportFilter(types=["SPECI"])
+    assert list(specials.filter(LINES)) == [LINES[1]]
+
+
+def test_time_window():
+    """Lines are selected by observation time, with wrapping windows."""
+    window = Filter.ReportFilter(start=(11, 19, 0), end=(12, 0, 20))
+    assert list(window.filter(LINES)) == LINES[1:4]
+    start = datetime.datetime(2005, 1, 31, 23, 0)
+    wrapped = Filter.ReportFilter(start=start, end=(11, 19, 0))
+    assert list(wrapped.filter(LINES)) == [LINES[0], LINES[4]]
+    open_ended = Filter.ReportFilter(start=(12, 0, 0))
+    assert list(open_ended.filter(LINES)) == [LINES[3], LINES[4]]
+
+
+def test_compose_with_store():
+    """The filter can feed raw lines to a reader."""
+    store = ObservationStore()
+    wanted = Filter.ReportFilter(stations=["KEWR"])
+    assert store.update_many(wanted.filter(LINES)) == 2
+    assert store["KEWR"].type == "SPECI"
+    assert "KJFK" not in store
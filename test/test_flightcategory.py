@@ -0,0 +1,68 @@
+"""Test metar/FlightCategory.py."""
+import pytest
+
+from metar import FlightCategory, Metar
+from metar.Backend import np
+
+# (report body, ceiling, category)
+CASES = [
+    ("10SM SKC", None, "VFR"),
+    ("P6SM FEW010 SCT020", None, "VFR"),
+    ("10SM BKN030", 3000.0, "MVFR"),
+    ("10SM BKN031", 3100.0, "VFR"),
+    ("5SM SCT005 OVC040", 4000.0, "MVFR"),
+    ("3SM BKN020", 2000.0, "MVFR"),
+    ("2 1/2SM OVC040", 4000.0, "IFR"),
+    ("10SM OVC009", 900.0, "IFR"),
+    ("10SM BKN010 OVC004", 400.0, "LIFR"),
+    ("M1/4SM FG VV002", 200.0, "LIFR"),
+    ("3/4SM BR OVC015", 1500.0, "LIFR"),
+    ("9999 BKN050", 5000.0, "VFR"),
+    ("4000 BKN050", 5000.0, "IFR"),
+    ("CAVOK", None, "VFR"),
+    ("VV///", None, None),
+    # no visibility: classified by a ceiling that isn't VFR
+    ("OVC004", 400.0, "LIFR"),
+    ("BKN020", 2000.0, "MVFR"),
+    ("BKN050", 5000.0, None),
+]
+
+
+def _values(column):
+    """Return a masked array of categories as a list, with None if masked."""
+    mask = np.ma.getmaskarray(column)
+    return [None if m else v for v, m in zip(column.data.tolist(), mask)]
+
+
+def _report(body):
+    return Metar.Metar("METAR KEWR 111851Z 29010KT " + body + " 22/20 A2987")
+
+
+@pytest.mark.parametrize("body,ceiling,category", CASES)
+def test_category(body, ceiling, category):
+    """Ceilings and categories of single reports."""
+    report = _report(body)
+    assert FlightCategory.ceiling(report) == ceiling
+    assert FlightCategory.category(report) == category
+
+
+def test_categories(use_numpy):
+    """Batch classification agrees with the per-report classification."""
+    reports = [_report(body) for body, ceiling, category in CASES]
+    result = FlightCategory.categories(reports, use_numpy)
+    if use_numpy:
+        result = _values(result)
+    assert result == [category for body, ceiling, category in CASES]
+
+
+def test_classify_columns(use_numpy):
+    """Missing ceilings are unlimited, and missing visibilities ignored."""
+    nan = float("nan")
+    result = FlightCategory.classify_columns(
+        [None, nan, 800.0, 800.0, 4000.0, None],
+        [10.0, 0.5, None, nan, nan, None],
+        use_numpy,
+    )
+    if use_numpy:
+        result = _values(result)
+    assert result == ["VFR", "LIFR", "IFR", "IFR", None, None]
@@ -0,0 +1,70 @@
+"""Test metar/Geodesy.py."""
+from math import radians
+
+import pytest
+from metar import Backend, Geodesy
+from metar.Datatypes import position
+
+# (latitude, longitude) in degrees
+KEWR = (40.69, -74.17)
+KIAD = (38.94, -77.46)
+EKRK = (55.59, 12.13)
+NZCH = (-43.49, 172.53)
+POINTS = [KEWR, KIAD, EKRK, NZCH]
+LATS = [p[0] for p in POINTS]
+LONGS = [p[1] for p in POINTS]
+
+
+def _position(point):
+    """Build a position object, which works in radians."""
+    return position(radians(point[0]), radians(point[1]))
+
+
+def test_position_getdistance():
+    """Test the scalar distance calculation."""
+    d = _position(KEWR).getdistance(_position(KIAD))
+    assert abs(d.value("KM") - 341.5) < 1.0
+    assert _position(KEWR).getdistance(_position(KEWR)).value() == 0.0
+
+
+def test_pairwise(use_numpy):
+    """Pairwise results agree with the scalar implementation."""
+    dists = Geodesy.distances(LATS, LONGS, LATS[::-1], LONGS[::-1], use_numpy)
+    dirs = Geodesy.bearings(LATS, LONGS, LATS[::-1], LONGS[::-1], use_numpy)
+    for i, (p1, p2) in enumerate(zip(POINTS, POINTS[::-1])):
+        pos1 = _position(p1)
+        pos2 = _position(p2)
+        assert abs(dists[i] - pos1.getdistance(pos2).value()) < 1e-3
+        assert abs(dirs[i] - pos1.getdirection(pos2).value()) < 1e-9
+
+
+def test_one_to_many(use_numpy):
+    """One-to-many results agree with the scalar implementation."""
+    dists = Geodesy.distances_from(KEWR[0], KEWR[1], LATS, LONGS, use_numpy)
+    dirs = Geodesy.bearings_from(KEWR[0], KEWR[1], LATS, LONGS, use_numpy)
+    origin = _position(KEWR)
+    for i, point in enumerate(POINTS):
+        assert abs(dists[i] - origin.getdistance(_position(point)).value()) < 1e-3
+        if i:
+            assert abs(dirs[i] - origin.getdirection(_position(point)).value()) < 1e-9
+
+
+def test_matrix(use_numpy):
+    """Matrix results are consistent with the pairwise functions."""
+    dists = Geodesy.distance_matrix(LATS, LONGS, use_numpy)
+    dirs = Geodesy.bearing_matrix(LATS, LONGS, use_numpy)
+    for i, p1 in enumerate(POINTS):
+        assert dists[i][i] == 0.0
+        for j, p2 in enumerate(POINTS):
+            assert abs(dists[i][j] - dists[j][i]) < 1e-3
+            if i != j:
+                expected = _position(p1).getdirection(_position(p2)).value()
+                assert abs(dirs[i][j] - expected) < 1e-9
+
+
+def test_numpy_unavailable(monkeypatch):
+    """Requesting NumPy when it is not installed is an error."""
+    monkeypatch.setattr(Backend, "np", None)
+    with pytest.raises(ImportError):
+        Geodesy.distances(LATS, LONGS, LATS, LONGS, use_numpy=True)
+    assert len(Geodesy.distances(LATS, LONGS, LATS, LONGS)) == len(LATS)
@@ -1,10 +1,15 @@
 """Test the main Metar Library."""
+import os
+import re
+import subprocess
+import sys
+import time
 import warnings
 from datetime import datetime, timedelta, timezone
 
 import pytest
 import metar
-from metar import Metar
+from metar import Metar, Stats, Synthetic
 
 # METAR fragments used in tests, below
 sta_time = "KEWR 101651Z "
@@ -21,9 +26,9 @@ def raisesParserError(code):
         Metar.Metar(code)
 
 
-def test_xlate_loc():
+def test_xlate_loc(monkeypatch):
     """Test that xlate_loc does the right thing."""
-    Metar.debug = True
+    monkeypatch.setattr(Metar, "debug", True)
     report = Metar.Metar(
         "METAR KEWR 111851Z VRB03G19KT 2SM R04R/3000VP6000FT TSRA BR FEW015 "
         "BKN040CB BKN065 OVC200 22/22 A2987 RMK AO2 PK WND 29028/1817 WSHFT "
@@ -243,6 +248,36 @@ def test_035_parseTime_suppress_auto_month():
             assert report.time.year == last_year
 
 
+def test_036_parseTime_reference_time():
+    """Check that a reference time makes the date resolution reproducible."""
+    now = datetime(2024, 1, 5, 12, 0)
+    report = Metar.Metar("KEWR 101651Z", now=now)
+    assert report.time == datetime(2023, 12, 10, 16, 51)
+    report = Metar.Metar("KEWR 041651Z", now=now)
+    assert report.time == datetime(2024, 1, 4, 16, 51)
+    report = Metar.Metar("KEWR 291651Z", now=datetime(2024, 3, 1, tzinfo=timezone.utc))
+    assert report.time == datetime(2024, 2, 29, 16, 51)
+    report = Metar.Metar("KEWR 041651Z", month=6, now=now)
+    assert report.time == datetime(2023, 6, 4, 16, 51)
+
+
+def test_037_remark_times():
+    """Check the resolution of peak wind and wind shift times."""
+    now = datetime(2024, 1, 5, 12, 0)
+    report = Metar.Metar(
+        "KEWR 050005Z 29028KT 10SM 22/22 A2987 RMK PK WND 29028/2355 WSHFT 0002",
+        now=now,
+    )
+    assert report.peak_wind_time == datetime(2024, 1, 4, 23, 55)
+    assert report.wind_shift_time == datetime(2024, 1, 5, 0, 2)
+    report = Metar.Metar(
+        "KEWR 051651Z 29028KT 10SM 22/22 A2987 RMK PK WND 29028/55 WSHFT 52",
+        now=now,
+    )
+    assert report.peak_wind_time == datetime(2024, 1, 5, 15, 55)
+    assert report.wind_shift_time == datetime(2024, 1, 5, 15, 52)
+
+
 def test_040_parseModifier_default():
     """Check default 'modifier' value."""
     assert Metar.Metar("KEWR").mod == "AUTO"
@@ -597,6 +632,18 @@ def test_snowdepth():
     assert m.snowdepth.value() == 1
 
 
+@pytest.mark.parametrize(
+    "group, change, tendency",
+    [("52010", 1.0, 2), ("55016", -1.6, 5), ("58033", -3.3, 8), ("54000", 0.0, 4)],
+)
+def test_press_3hr(group, change, tendency):
+    """The 3-hour pressure change is signed by its characteristic."""
+    m = Metar.Metar("KEWR 111851Z 29028KT 10SM 22/22 A2987 RMK " + group)
+    assert m.press_3hr.value("HPA") == pytest.approx(change)
+    assert m.press_tendency == tendency
+    assert Metar.Metar("KEWR 111851Z 29028KT 10SM 22/22 A2987").press_3hr is None
+
+
 def test_310_parse_sky_conditions():
     """Check parsing of sky conditions."""
 
@@ -730,3 +777,389 @@ def test_present_weather_others():
     code = "VEIM 301200Z 16007KT 7000 NSW SCT018 31/27 Q1007 NOSIG"
     m = Metar.Metar(code, month=8, year=2023)
     assert m.present_weather() == 'no significant weather'
+
+
+def _unparsed_report(ngarbage):
+    """Build a report with the given number of unparseable body groups."""
+    garbage = " ".join("X%dY" % i for i in range(ngarbage))
+    return "METAR KEWR 111851Z 29028KT %s 10SM FEW015 %s 22/22 A2987" % (
+        garbage,
+        garbage,
+    )
+
+
+def test_unparsed_group_recovery():
+    """Groups after unparseable groups are still decoded."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        report = Metar.Metar(_unparsed_report(5), strict=False)
+    clean = Metar.Metar("METAR KEWR 111851Z 29028KT 10SM FEW015 22/22 A2987")
+    assert len(report._unparsed_groups) == 10
+    assert report.vis.value() == clean.vis.value()
+    assert report.sky_conditions() == clean.sky_conditions()
+    assert report.temp.value() == clean.temp.value()
+    assert report.press.value() == clean.press.value()
+
+
+@pytest.mark.parametrize("ngarbage", [10, 100, 1000])
+def test_unparsed_group_attempts_bounded(ngarbage):
+    """The number of pattern match attempts is bounded for each group."""
+    from metar.Stats import ParserStats
+
+    stats = ParserStats()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        Metar.Metar(_unparsed_report(ngarbage), strict=False, stats=stats)
+    attempts = sum(entry["attempts"] for entry in stats.snapshot()["handlers"])
+    # each unparsed group costs one recovery check plus the catch-all handler,
+    # and each of the two runs of garbage costs at most one pass through the
+    # handler table
+    ngroups = 2 * ngarbage + 8
+    assert attempts <= 2 * ngroups + 2 * len(Metar.Metar.handlers)
+
+
+def test_recovery_pattern_shared():
+    """Handler tables that wrap the same patterns share a recovery pattern."""
+    from metar.Stats import ParserStats
+
+    Metar._compile_recovery.cache_clear()
+    for _ in range(20):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            Metar.Metar(_unparsed_report(2), strict=False, stats=ParserStats())
+    assert 0 < Metar._compile_recovery.cache_info().currsize <= 2
+
+
+def _match_time(pattern, text, repeat=3):
+    """Return the best time taken to try a pattern against the given text."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pattern.match(text)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+# pathological inputs for the patterns with nested repetition: each is a long
+# run of text that almost matches, followed by a character that makes the
+# match fail
+pathological_groups = [
+    ("LIGHTNING_RE", lambda n: "LTG " + "NE" * n + "X "),
+    ("LIGHTNING_RE", lambda n: "LTG " + "N-E" * n + "X "),
+    ("LIGHTNING_RE", lambda n: "LTG DSNT" + "  AND" * n + "X "),
+    ("LIGHTNING_RE", lambda n: "LTG OHD" + " AND OHD" * n + "-X "),
+    ("TS_LOC_RE", lambda n: "TS " + "NE" * n + "X "),
+    ("TS_LOC_RE", lambda n: "TS DSNT " + "VC DSNT  " * n + "MOV X "),
+    ("WEATHER_RE", lambda n: "/" * n + "X "),
+    ("WEATHER_RE", lambda n: "RA/" * n + "X "),
+    ("COLOR_RE", lambda n: "BLU/" * n + "X "),
+    ("RUNWAY_RE", lambda n: "R01/" + "1" * n + "X "),
+]
+
+
+@pytest.mark.parametrize("name,build", pathological_groups)
+def test_pattern_time_linear(name, build):
+    """Failing matches take time roughly proportional to the input length."""
+    pattern = getattr(Metar, name)
+    small = _match_time(pattern, build(2000))
+    large = _match_time(pattern, build(16000))
+    # 8 times the input should take about 8 times as long; quadratic
+    # backtracking would take 64 times as long
+    assert large < 25 * small + 0.005
+
+
+def test_pathological_remark():
+    """A corrupted remark does not stall the parser."""
+    code = "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987 RMK LTG " + "NE" * 50
+    start = time.perf_counter()
+    report = Metar.Metar(code + "X SLP114")
+    assert time.perf_counter() - start < 1.0
+    assert report.press_sea_level.value() == 1011.4
+
+
+def test_phrase_cache():
+    """Weather and sky phrases are rendered once and shared by reports."""
+    code = "METAR KEWR 111851Z 29028KT 2SM -RA BR BKN040CB OVC200 22/22 A2987"
+    first = Metar.Metar(code)
+    second = Metar.Metar(code.replace("KEWR", "KJFK"))
+    sky = first.sky_conditions()
+    weather = first.present_weather()
+    assert sky == "broken cumulonimbus at 4000 feet; overcast at 20000 feet"
+    assert weather == "light rain; mist"
+
+    sky_hits = Metar._sky_phrase.cache_info().hits
+    weather_hits = Metar._weather_phrase.cache_info().hits
+    assert second.sky_conditions() == sky
+    assert second.present_weather() == weather
+    assert Metar._sky_phrase.cache_info().hits == sky_hits + 2
+    assert Metar._weather_phrase.cache_info().hits == weather_hits + 2
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "METAR KEWR 111851Z 29028KT 10SM 22/22 A2987",
+        "SPECI COR KEWR 111851Z AUTO 29028KT",
+        "KEWR 111851Z CORR 29028KT 10SM",
+        "METAR LOXZ 141420Z CCA 08006KT 20KM",
+        "KEWR 101651Z NIL",
+        "  METAR KEWR 29028KT 10SM=",
+        "KEWR",
+        "",
+    ],
+)
+def test_scan_header(code):
+    """The header scan agrees with the full parse."""
+    header = Metar.scan_header(code)
+    report = Metar.Metar(code, strict=False)
+    assert header.type == report.type
+    assert header.correction == report.correction
+    assert header.station_id == report.station_id
+    assert header.mod == report.mod
+    if report.time is None:
+        assert header.day is None and header.hour is None
+    else:
+        assert (header.day, header.hour, header.minute) == (
+            report._day,
+            report._hour,
+            report._min,
+        )
+
+
+def test_scan_header_decodes_nothing(monkeypatch):
+    """The header scan doesn't build Metar or Datatypes objects."""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("object constructed")
+
+    monkeypatch.setattr(Metar.Metar, "__init__", fail)
+    monkeypatch.setattr(Metar, "distance", fail)
+    header = Metar.scan_header("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    assert header == ("METAR", None, "KEWR", 11, 18, 51, "AUTO")
+
+
+def _import_times(statement):
+    """
+    Run a statement in a fresh interpreter with -X importtime, and return its
+    output and a dict of the modules imported (self time, cumulative time in
+    microseconds).
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        if self_time.strip().isdigit():
+            times[name.strip()] = (int(self_time), int(cumulative))
+    return proc.stdout, times
+
+
+def test_import_time():
+    """Importing the parser doesn't compile its patterns or read metadata."""
+    out, times = _import_times(
+        "import metar.Metar as M; "
+        "print(sum(p._compiled is not None for p in vars(M).values() "
+        "if isinstance(p, M._LazyPattern)))"
+    )
+    assert "metar.Metar" in times
+    assert int(out) == 0
+    # the version is only looked up in the package metadata when it's used
+    assert "importlib.metadata" not in times
+    # generous, so that slow machines (and imports without bytecode) pass
+    assert times["metar.Metar"][1] < 1000000
+
+
+def test_lazy_version():
+    """The version is looked up when it's first read, from either module."""
+    assert metar.__version__ == Metar.__version__
+    assert isinstance(metar.__version__, str)
+    with pytest.raises(AttributeError):
+        Metar.no_such_attribute
+    assert metar.__doc__.startswith("metar (c) 2009")
+
+
+def test_public_patterns():
+    """The public patterns are compiled and anchored as they always were."""
+    assert isinstance(Metar.WIND_RE, re.Pattern)
+    assert Metar.WIND_RE is Metar.WIND_RE
+    assert Metar.WIND_RE.search("KEWR 111851Z 29028KT ") is None
+    assert Metar.WIND_RE.match("29028KT ").group("speed") == "28"
+    assert Metar.TRENDTIME_RE.search("TEMPO FM1200 ").group("hour") == "12"
+    assert Metar.HEADER_RE.match("METAR KEWR ").group("station") == "KEWR"
+    # the parser matches its own, unanchored, copies
+    assert Metar._WIND_RE.pattern == Metar.WIND_RE.pattern[1:]
+    with pytest.raises(AttributeError):
+        Metar.GROUP_RE
+    # a dialect can exclude groups by their public patterns
+    custom = Metar.Dialect("no colour", (Metar.COLOR_RE,))
+    assert Metar._COLOR_RE not in [entry[0] for entry in custom.handlers]
+    assert len(custom.handlers) == len(Metar.Metar.handlers) - 1
+
+
+@pytest.mark.parametrize(
+    "mix, dialect",
+    [({"us": 1.0}, "US"), ({"us": 0.0, "color": 0.0}, "WMO"), ({"us": 0.0}, "MIL")],
+)
+def test_dialect_decodes_conforming_reports(mix, dialect):
+    """Reports of a dialect are decoded as with the full handler tables."""
+
+    def decoded(obs):
+        return (
+            obs.string(),
+            obs._unparsed_groups,
+            obs._unparsed_remarks,
+            obs._trend_groups,
+            str(obs.press_sea_level),
+        )
+
+    now = datetime(2005, 1, 31)
+    for code in Synthetic.generate(300, seed=7, mix=mix):
+        expected = decoded(Metar.Metar(code, now=now))
+        assert decoded(Metar.Metar(code, now=now, dialect=dialect)) == expected
+        assert decoded(Metar.Metar(code, now=now, dialect="auto")) == expected
+
+
+def test_dialect_tables():
+    """The dialects drop the handlers of the groups they don't use."""
+    us = Metar.DIALECTS["US"]
+    wmo = Metar.DIALECTS["WMO"]
+    assert Metar.DIALECTS["ICAO"] is wmo
+    assert us.trend_handlers == ()
+    assert Metar._COLOR_RE not in [entry[0] for entry in us.handlers]
+    assert Metar._COLOR_RE not in [entry[0] for entry in wmo.handlers]
+    assert Metar._COLOR_RE in [entry[0] for entry in Metar.DIALECTS["MIL"].handlers]
+    assert us.remark_handlers == Metar.Metar.remark_handlers
+    assert Metar.DIALECTS["MIL"].remark_handlers == Metar.Metar.remark_handlers
+    assert wmo.remark_handlers == ((Metar._UNPARSED_RE, Metar.Metar._unparsedRemark),)
+
+
+@pytest.mark.parametrize(
+    "station_id, dialect",
+    [
+        ("KEWR", "US"),
+        ("PHNL", "US"),
+        ("TJSJ", "US"),
+        ("EGLL", "MIL"),
+        ("RJTT", "MIL"),
+        ("CYYZ", None),
+        ("MMMX", None),
+        (None, None),
+    ],
+)
+def test_station_dialect(station_id, dialect):
+    """The dialect of a station is guessed from the prefix of its id."""
+    found = Metar.station_dialect(station_id)
+    assert (found and found.name) == dialect
+
+
+def test_dialect_option():
+    """The dialect is chosen by name, as a Dialect, or from the station."""
+    code = "METAR EGLL 111850Z 29010KT 9999 FEW030 12/08 Q1012 NOSIG RMK AO2 SLP123"
+    report = Metar.Metar(code, dialect="WMO")
+    assert report.dialect is Metar.DIALECTS["WMO"]
+    assert report.press_sea_level is None
+    assert report._unparsed_remarks == ["AO2", "SLP123"]
+    report = Metar.Metar(code, dialect="auto")
+    assert report.dialect is Metar.DIALECTS["MIL"]
+    assert report.press_sea_level.value() == 1012.3
+    assert Metar.Metar(code).dialect is None
+    assert Metar.Metar(code).press_sea_level.value() == 1012.3
+    custom = Metar.Dialect("no trends", trends=False)
+    assert Metar.Metar(code, dialect=custom).dialect is custom
+
+    # US remark groups are reported as unparsed remarks
+    report = Metar.Metar(code, dialect="WMO", diagnostics=True)
+    assert [d.text for d in report.diagnostics] == ["AO2", "SLP123"]
+
+    with pytest.raises(ValueError):
+        Metar.Metar(code, dialect="UK")
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "METAR RODN 111858Z 03012KT 9999 FEW020 SCT100 24/19 A2998 RMK AO2 "
+        "SLP152 T02390189 10245 20221 58012",
+        "METAR ETAR 111855Z 24008KT 9999 BKN035 09/04 A2990 RMK AO2A SLP127 "
+        "T00890044 $",
+        "METAR RKSO 111900Z 32004KT 8000 HZ SCT040 18/11 A2992 RMK SLP135 "
+        "60001 T01800110 GRN",
+    ],
+)
+def test_dialect_us_remarks_abroad(code):
+    """Stations abroad that use the US remarks have them decoded by "auto"."""
+    expected = Metar.Metar(code)
+    report = Metar.Metar(code, dialect="auto")
+    assert report.dialect is Metar.DIALECTS["MIL"]
+    assert report.press_sea_level is not None
+    assert report.temp.value() == expected.temp.value()
+    assert report.string() == expected.string()
+    assert report._unparsed_remarks == expected._unparsed_remarks
+
+
+def test_parser_matches_constructor():
+    """A reused MetarParser decodes reports as the Metar constructor does."""
+    now = datetime(2005, 1, 31)
+    options = dict(strict=False, now=now, diagnostics=True, dialect="auto")
+    parser = Metar.MetarParser(**options)
+    for code in Synthetic.generate(300, seed=3):
+        expected = Metar.Metar(code, **options)
+        report = parser.parse(code)
+        assert report.string() == expected.string()
+        assert report.time == expected.time
+        assert report.dialect is expected.dialect
+        assert report.diagnostics == expected.diagnostics
+        assert report._unparsed_remarks == expected._unparsed_remarks
+
+
+def test_parser_options():
+    """A MetarParser checks its options once, and applies them to each report."""
+    stats = Stats.ParserStats()
+    parser = Metar.MetarParser(
+        now=datetime(2005, 1, 31, tzinfo=timezone.utc), stats=stats, dialect="US"
+    )
+    assert parser.now.tzinfo is None
+    assert parser.dialect is Metar.DIALECTS["US"]
+    report = parser.parse("KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    assert report.time == datetime(2005, 1, 11, 18, 51)
+    parser.parse("KEWR 111951Z 29028KT 10SM 22/22 A2987")
+    assert stats.reports == 2
+    with pytest.raises(Metar.ParserError):
+        parser.parse("KEWR 111851Z FOO")
+
+    # without a reference time, the current time is used for each report
+    report = Metar.MetarParser().parse("KEWR 011851Z 29028KT 10SM 22/22 A2987")
+    assert datetime.now() - report.time < timedelta(days=32)
+
+    with pytest.raises(ValueError):
+        Metar.MetarParser(dialect="UK")
+
+
+def test_class_level_defaults():
+    """A report only holds the fields and lists of the groups it contains."""
+    report = Metar.Metar("KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    assert "press_sea_level" not in vars(report)
+    assert "runway" not in vars(report) and "_unparsed_groups" not in vars(report)
+    assert report.press_sea_level is None
+    assert report.runway == [] and report.diagnostics == []
+    other = Metar.Metar("KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    assert other.runway is not report.runway
+    report.runway.append("R04")
+    assert other.runway == [] and Metar.Metar.runway is not report.runway
+
+    # vars() only holds the fields that were set; getattr() reads them all
+    fields = vars(report)
+    assert {"station_id", "temp", "press", "runway"} <= set(fields)
+    assert not {"press_sea_level", "max_temp_6hr", "weather"} & set(fields)
+    assert getattr(report, "max_temp_6hr") is None
+    assert getattr(report, "weather") == []
@@ -0,0 +1,98 @@
+"""Test metar/Render.py."""
+import io
+
+import pytest
+
+from metar import Metar
+from metar.Datatypes import UnitsError
+from metar.Render import DEFAULT_FIELDS, FIELDS, Renderer
+
+REPORTS = [
+    "METAR KEWR 111851Z VRB03G19KT 2SM R04R/3000VP6000FT TSRA BR FEW015 "
+    "BKN040CB BKN065 OVC200 22/22 A2987 RMK AO2 PK WND 29028/1817 WSHFT "
+    "1812 TSB05RAB22 SLP114 FRQ LTGICCCCG TS OHD AND NW-N-E MOV NE "
+    "P0013 T02270215 10242 20200 401110006 60021 70125 I1001 FOO",
+    "METAR WSSS 280900Z 26009KT 180V350 0600 R20R/1900D +TSRA FEW008 "
+    "SCT013CB 24/23 Q1010 BECMG FM0920 TL0930 3000 TSRA",
+    "KEWR 101651Z 00000KT 10SM CLR 10/M02 A3002",
+    "METAR KMSE 071851Z 26011KT 8SM M11/M20 A2932 RMK AO1 T11101203 11105",
+]
+
+
+@pytest.mark.parametrize("code", REPORTS)
+def test_default_matches_string(code):
+    """The default renderer gives the same text as Metar.string()."""
+    report = Metar.Metar(code, strict=False)
+    assert Renderer().render(report) == report.string()
+
+
+def test_missing_minimum():
+    """A 6-hour maximum without a minimum is shown as in earlier versions."""
+    report = Metar.Metar(REPORTS[3])
+    lines = Renderer().render(report).split("\n")
+    assert "6-hour max temp: -10.5 C" in lines
+    assert "6-hour min temp: None" in lines
+    imperial = Renderer(["max_temp_6hr", "min_temp_6hr"], "imperial")
+    assert imperial.render(report) == "6-hour max temp: 13.1 F\n6-hour min temp: None"
+
+
+@pytest.mark.parametrize(
+    "units, text",
+    [
+        ("default", "12 inches"),
+        ("metric", "30 cm"),
+        ("imperial", "12 inches"),
+        ("aviation", "12 inches"),
+        ({"snowdepth": "M"}, "0 meters"),
+    ],
+)
+def test_snow_depth(units, text):
+    """Snow depth has its own units, apart from those of the visibility."""
+    report = Metar.Metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987 RMK 4/012")
+    assert Renderer(["snowdepth"], units).render(report) == "snow depth: " + text
+
+
+def test_fields_and_units():
+    """The fields and units can be chosen."""
+    report = Metar.Metar(REPORTS[0])
+    metric = Renderer(["temp", "wind", "vis", "runway", "precip_1hr"], "metric")
+    assert metric.render(report).split("\n") == [
+        "temperature: 22.7 C",
+        "wind: variable at 6 km/h, gusting to 35 km/h",
+        "visibility: 3219 meters",
+        "visual range: on runway 04R, from 914 to greater than 1829 meters",
+        "1-hour precipitation: 0.33cm",
+    ]
+    imperial = Renderer(["temp", "press"], "imperial")
+    assert imperial.render(report) == "temperature: 72.9 F\npressure: 29.87 inches"
+    custom = Renderer(["press", "snowdepth", "trend"], {"pressure": "mb"})
+    assert custom.render(report) == "pressure: 1011.5 mb"
+
+
+def test_write():
+    """A renderer streams its output to a file."""
+    reports = [Metar.Metar(code, strict=False) for code in REPORTS]
+    renderer = Renderer(["station", "code"])
+    out = io.StringIO()
+    assert renderer.write(reports, out) == len(REPORTS)
+    assert out.getvalue() == "".join(
+        "station: %s\nMETAR: %s\n\n" % (report.station_id, report.code)
+        for report in reports
+    )
+
+
+def test_errors():
+    """Unknown fields, profiles and units are rejected when compiling."""
+    with pytest.raises(ValueError):
+        Renderer(["station", "humidity"])
+    with pytest.raises(ValueError):
+        Renderer(units="nautical")
+    with pytest.raises(ValueError):
+        Renderer(units={"altitude": "FT"})
+    with pytest.raises(UnitsError):
+        Renderer(units={"speed": "FPS"})
+
+
+def test_field_names():
+    """All the default fields are defined."""
+    assert set(DEFAULT_FIELDS) <= set(FIELDS)
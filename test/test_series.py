@@ -0,0 +1,123 @@
+"""Test metar/Series.py."""
+import math
+from datetime import datetime
+
+import pytest
+
+from metar import Metar
+from metar.Series import SeriesStore, StationSeries
+
+NOW = datetime(2005, 1, 12)
+
+
+def _report(hour, temp, press, precip=None, type="METAR", remarks=""):
+    code = "%s KEWR 11%02d51Z 29010KT 10SM %02d/05 A%04d" % (type, hour, temp, press)
+    rmk = []
+    if precip is not None:
+        rmk.append("P%04d" % precip)
+    if remarks:
+        rmk.append(remarks)
+    if rmk:
+        code += " RMK " + " ".join(rmk)
+    return Metar.Metar(code, now=NOW)
+
+
+def _day(series):
+    """Add a day of hourly reports (temps 0..23, rising pressure)."""
+    for hour in range(18):
+        assert series.add(_report(hour, hour, 2980 + hour, precip=hour % 3))
+
+
+def test_rolling_queries():
+    """Maxima, minima and totals over rolling windows."""
+    series = StationSeries()
+    _day(series)
+    assert len(series) == 18
+    assert series.latest("temp") == 17
+    assert series.maximum("temp", 6) == 17
+    assert series.minimum("temp", 6) == 12
+    assert series.minimum("temp", 24) == 0
+    assert series.maximum("temp", 6, datetime(2005, 1, 11, 10)) == 9
+    assert series.maximum("vis", 6) == pytest.approx(16093.44)
+    # hourly amounts 2, 0, 1 for hours 15, 16, 17
+    assert series.precipitation(3) == pytest.approx(0.03)
+    # 0.03 inches of mercury
+    assert series.pressure_tendency(3) == pytest.approx(1.016, abs=0.001)
+    assert series.pressure_tendency(30) is None
+    assert [value for time, value in series.values("temp", 2)] == [17, 16]
+    assert series.minimum("temp", 1, datetime(2004, 1, 1)) is None
+
+
+def test_order_and_speci():
+    """Out-of-order reports are ignored, and SPECI precipitation is skipped."""
+    series = StationSeries()
+    _day(series)
+    assert not series.add(_report(3, 30, 2990))
+    assert series.dropped == 1
+    speci = Metar.Metar(
+        "SPECI KEWR 111812Z 29010KT 10SM 30/05 A2990 RMK P0005", now=NOW
+    )
+    assert series.add(speci)
+    assert len(series) == 19
+    assert series.maximum("temp", 6) == 30
+    assert series.precipitation(3) == pytest.approx(0.03)
+
+
+def test_same_time():
+    """Reports with the same time are merged, preferring the routine report."""
+    series = StationSeries()
+    _day(series)
+    # a SPECI at the time of the routine report doesn't drop its values
+    assert series.add(_report(17, 30, 2990, precip=5, type="SPECI"))
+    assert len(series) == 18
+    assert series.maximum("temp", 6) == 17
+    assert series.precipitation(3) == pytest.approx(0.03)
+    checks = series.cross_check(_report(17, 17, 2997, remarks="60004"))
+    assert checks["precip_6hr"] == (0.04, pytest.approx(0.06))
+
+    # a routine report replaces a SPECI, and takes its missing values from it
+    series.add(Metar.Metar("SPECI KEWR 111951Z 29010KT 10SM 18/05 A2990", now=NOW))
+    series.add(Metar.Metar("METAR KEWR 111951Z 29010KT 19/05 A2990 RMK P0002", now=NOW))
+    assert series.latest("temp") == 19
+    assert series.latest("vis") == pytest.approx(16093.44)
+    assert series.precipitation(1) == pytest.approx(0.02)
+
+
+def test_capacity():
+    """Only the most recent observations are kept."""
+    series = StationSeries(capacity=4)
+    _day(series)
+    assert len(series) == 4
+    assert series.minimum("temp", 24) == 14
+    with pytest.raises(ValueError):
+        StationSeries(capacity=0)
+
+
+def test_cross_check():
+    """Summary remark values are compared with the series."""
+    series = StationSeries()
+    _day(series)
+    report = _report(17, 17, 2997, remarks="10175 20120 60004")
+    checks = series.cross_check(report)
+    assert checks["max_temp_6hr"] == (17.5, 17)
+    assert checks["min_temp_6hr"] == (12.0, 12)
+    assert checks["precip_6hr"] == (0.04, pytest.approx(0.06))
+    assert "precip_24hr" not in checks
+    assert "press_3hr" not in checks
+    # the pressure rose by 0.03 inches (1.02 hPa) over the last 3 hours
+    checks = series.cross_check(_report(17, 17, 2997, remarks="52010"))
+    assert checks["press_3hr"] == (1.0, pytest.approx(1.01592))
+
+
+def test_store():
+    """A SeriesStore keeps a series per station."""
+    store = SeriesStore(capacity=8, now=NOW)
+    assert store.add("METAR KEWR 111851Z 29010KT 10SM 22/05 A2987")
+    assert store.add("METAR KJFK 111851Z 29010KT 10SM 21/05 A2987")
+    assert not store.add("FOO")
+    assert not store.add("METAR KJFK 111751Z 29010KT 10SM 21/05 A2987")
+    assert store.dropped == 1
+    assert sorted(store) == ["KEWR", "KJFK"]
+    assert store["KJFK"].latest("temp") == 21
+    assert store["KJFK"].capacity == 8
+    assert math.isnan(store["KJFK"].latest("precip_1hr"))
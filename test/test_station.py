@@ -6,3 +6,26 @@ def test_station():
     """Can we build a station object."""
     st = Station.station("KDSM")
     assert st.id == "KDSM"
+
+
+def test_indexes():
+    """Test the secondary station indexes."""
+    german = Station.by_country("Germany")
+    assert "EDDF" in german
+    assert all(Station.stations[id].country == "Germany" for id in german)
+    assert "KDSM" in Station.by_state("IA")
+    assert Station.by_wmo_block("72") == Station.find(wmo_block="72")
+    assert all(id.startswith("ED") for id in Station.by_prefix("ED"))
+    assert Station.by_prefix("KDSM") == ("KDSM",)
+    assert Station.by_country("Atlantis") == ()
+
+
+def test_find():
+    """Test combined station queries."""
+    ids = Station.find(state="TX", prefix="K")
+    assert "KDFW" in ids
+    assert list(ids) == sorted(ids)
+    for id in ids:
+        assert id.startswith("K")
+        assert Station.stations[id].state == "TX"
+    assert len(Station.find()) == len(Station.stations)
@@ -0,0 +1,74 @@
+"""Test metar/Stats.py."""
+import json
+
+import pytest
+
+from metar import Metar
+from metar.Stats import ParserStats
+
+REPORTS = [
+    "METAR KEWR 111851Z VRB03G19KT 2SM R04R/3000VP6000FT TSRA BR FEW015 "
+    "BKN040CB BKN065 OVC200 22/22 A2987 RMK AO2 PK WND 29028/1817 WSHFT "
+    "1812 TSB05RAB22 SLP114 FRQ LTGICCCCG TS OHD AND NW-N-E MOV NE "
+    "P0013 T02270215",
+    "METAR WSSS 280900Z 26009KT 180V350 0600 R20R/1900D +TSRA FEW008 "
+    "SCT013CB 24/23 Q1010 BECMG FM0920 TL0930 3000 TSRA",
+    "KEWR 101651Z 00000KT 10SM FOO CLR 10/M02 A3002",
+]
+
+
+def _entry(snapshot, section, handler, pattern=None):
+    """Find the counters for a handler in a snapshot."""
+    for entry in snapshot["handlers"]:
+        if entry["section"] == section and entry["handler"] == handler:
+            if pattern is None or entry["pattern"] == pattern:
+                return entry
+    return None
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_counts():
+    """Counters are aggregated over many reports."""
+    stats = ParserStats()
+    for code in REPORTS:
+        Metar.Metar(code, strict=False, stats=stats)
+    snapshot = stats.snapshot()
+    assert snapshot["reports"] == 3
+    assert snapshot["unparsed_groups"] == 1
+    station = _entry(snapshot, "body", "_handleStation")
+    assert station["attempts"] == 3
+    assert station["matches"] == 3
+    assert station["seconds"] > 0.0
+    trend = _entry(snapshot, "trend", "_handleTrend", "TRENDTIME_RE")
+    assert trend["matches"] == 2
+    assert _entry(snapshot, "remark", "_handleLightningRemark")["matches"] == 1
+    json.dumps(snapshot)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_results_unchanged():
+    """Instrumentation doesn't change the decoded report."""
+    stats = ParserStats()
+    for code in REPORTS:
+        plain = Metar.Metar(code, strict=False)
+        instrumented = Metar.Metar(code, strict=False, stats=stats)
+        assert plain.string() == instrumented.string()
+
+
+def test_merge_and_reset():
+    """Counters from several objects can be merged."""
+    stats1 = ParserStats()
+    stats2 = ParserStats()
+    Metar.Metar(REPORTS[0], stats=stats1)
+    Metar.Metar(REPORTS[1], stats=stats2)
+    stats1.merge(stats2)
+    snapshot = stats1.snapshot()
+    assert snapshot["reports"] == 2
+    assert _entry(snapshot, "body", "_handleStation")["matches"] == 2
+    stats1.reset()
+    assert stats1.snapshot() == {
+        "reports": 0,
+        "unparsed_groups": 0,
+        "unparsed_remarks": 0,
+        "handlers": [],
+    }
@@ -0,0 +1,113 @@
+"""Test metar/Store.py."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from metar import Metar
+from metar.Store import ObservationStore
+
+NOW = datetime(2005, 1, 11, 20, 0)
+
+
+def _metar(code):
+    return Metar.Metar(code, now=NOW)
+
+
+def test_newer_replaces_older():
+    """Later observations replace earlier ones, in any order of arrival."""
+    store = ObservationStore(now=NOW)
+    assert store.update("METAR KEWR 111751Z 29028KT 10SM 21/21 A2985")
+    assert store.update("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987")
+    assert not store.update("METAR KEWR 111651Z 29028KT 10SM 20/20 A2983")
+    assert store.update("METAR KJFK 111851Z 29028KT 10SM 23/22 A2987")
+    assert len(store) == 2
+    assert store["KEWR"].temp.value() == 22
+    assert store["KJFK"].temp.value() == 23
+    assert "KLGA" not in store
+    assert store.get("KLGA") is None
+
+
+def test_speci_and_corrections():
+    """SPECI reports and corrections replace reports for the same time."""
+    store = ObservationStore()
+    assert store.update(_metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987"))
+    assert store.update(_metar("SPECI KEWR 111851Z 29028KT 2SM 22/22 A2987"))
+    assert store["KEWR"].type == "SPECI"
+    # a routine report doesn't replace the SPECI for the same time
+    assert not store.update(_metar("METAR KEWR 111851Z 29028KT 5SM 22/22 A2987"))
+    assert store.update(_metar("SPECI KEWR 111851Z COR 29028KT 3SM 22/22 A2987"))
+    assert store["KEWR"].vis.value() == 3
+    assert store.update(_metar("SPECI KEWR 111851Z CCB 29028KT 4SM 22/22 A2987"))
+    assert not store.update(
+        _metar("SPECI KEWR 111851Z CCA 29028KT 1SM 22/22 A2987")
+    )
+    assert store["KEWR"].vis.value() == 4
+    # but a later routine report does
+    assert store.update(_metar("METAR KEWR 111951Z 29028KT 6SM 22/22 A2987"))
+    assert store["KEWR"].vis.value() == 6
+
+
+def test_incomplete_reports_ignored():
+    """Reports without a station or time are ignored."""
+    store = ObservationStore()
+    assert not store.update("FOO")
+    assert not store.update("METAR KEWR 29028KT 10SM")
+    assert len(store) == 0
+
+
+def test_expiry():
+    """Stale observations are hidden and can be removed."""
+    store = ObservationStore(max_age=timedelta(hours=2, minutes=30))
+    assert ObservationStore(max_age=9000).max_age == store.max_age
+    store.update_many(
+        [
+            _metar("METAR KEWR 111651Z 29028KT 10SM 22/22 A2987"),
+            _metar("METAR KJFK 111751Z 29028KT 10SM 22/22 A2987"),
+            _metar("METAR KLGA 111851Z 29028KT 10SM 22/22 A2987"),
+        ]
+    )
+    assert [r.station_id for r in store.reports(now=NOW)] == ["KJFK", "KLGA"]
+    assert store.get("KEWR", now=NOW) is None
+    assert store.get("KJFK", now=NOW).station_id == "KJFK"
+    assert store.expire(now=NOW) == 1
+    assert len(store) == 2
+    assert store.expire(now=NOW + timedelta(hours=1)) == 1
+    assert [r.station_id for r in store.reports(now=NOW)] == ["KLGA"]
+    store.clear()
+    assert list(store) == []
+
+
+def test_replay_clock():
+    """A replayed archive is aged by the latest observation time applied."""
+    store = ObservationStore(max_age=timedelta(hours=1), clock="latest")
+    assert store.latest_time is None and list(store) == []
+    store.update(_metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987"))
+    assert store["KEWR"].station_id == "KEWR"
+    store.update(_metar("METAR KJFK 111921Z 29028KT 10SM 22/22 A2987"))
+    assert "KEWR" in store
+    store.update(_metar("METAR KLGA 112051Z 29028KT 10SM 22/22 A2987"))
+    assert store.latest_time == datetime(2005, 1, 11, 20, 51)
+    assert "KEWR" not in store
+    assert [r.station_id for r in store] == ["KLGA"]
+    assert store.expire() == 2
+    # a late report doesn't move the clock back
+    store.update(_metar("METAR KEWR 111951Z 29028KT 10SM 22/22 A2987"))
+    assert store.latest_time == datetime(2005, 1, 11, 20, 51)
+    assert store.get("KEWR").station_id == "KEWR"
+
+
+def test_clock():
+    """The clock of the store is used when no time is passed."""
+    now = [NOW]
+    store = ObservationStore(max_age=7200, clock=lambda: now[0])
+    store.update(_metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987"))
+    assert "KEWR" in store
+    now[0] = NOW + timedelta(hours=1)
+    assert "KEWR" not in store
+    assert store.get("KEWR", now=NOW) is not None
+    # by default, the system clock, which is far past the reports of 2005
+    store = ObservationStore(max_age=3600)
+    store.update(_metar("METAR KEWR 111851Z 29028KT 10SM 22/22 A2987"))
+    assert "KEWR" not in store
+    with pytest.raises(ValueError):
+        ObservationStore(clock="wall")
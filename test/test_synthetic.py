@@ -0,0 +1,49 @@
+"""Test metar/Synthetic.py."""
+import pytest
+from metar import Metar, Synthetic
+from metar.Stats import ParserStats
+
+
+def test_reproducible():
+    """The same seed and mix produce the same reports."""
+    assert Synthetic.generate(200, seed=7) == Synthetic.generate(200, seed=7)
+    assert Synthetic.generate(200, seed=7) != Synthetic.generate(200, seed=8)
+    mix = {"us": 1.0, "trend": 0.0}
+    assert Synthetic.generate(50, 3, mix) == Synthetic.generate(50, 3, mix)
+
+
+def test_decodable():
+    """All generated reports decode completely."""
+    for code in Synthetic.generate(2000, seed=1):
+        report = Metar.Metar(code)
+        assert report.decode_completed
+        assert not report._unparsed_remarks, code
+
+
+def test_coverage():
+    """The generated reports exercise the handler tables."""
+    stats = ParserStats()
+    for code in Synthetic.generate(5000, seed=2):
+        Metar.Metar(code, stats=stats)
+    unused = [
+        (entry["section"], entry["pattern"])
+        for entry in stats.snapshot()["handlers"]
+        if not entry["matches"]
+    ]
+    assert sorted(unused) == [
+        ("body", "SEALVL_PRESS_RE"),
+        ("body", "UNPARSED_RE"),
+        ("remark", "UNPARSED_RE"),
+    ]
+
+
+def test_mix():
+    """Mix ratios control the style of report."""
+    for code in Synthetic.generate(100, mix={"us": 0.0, "nil": 0.0}):
+        assert "RMK" not in code
+    for code in Synthetic.generate(100, mix={"us": 1.0, "nil": 0.0}):
+        assert "SM " in code
+    with pytest.raises(ValueError):
+        Synthetic.ReportGenerator(mix={"bogus": 0.5})
+    with pytest.raises(ValueError):
+        Synthetic.ReportGenerator(mix={"us": 2.0})